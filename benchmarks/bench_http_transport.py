@@ -0,0 +1,93 @@
+"""Benchmark connection reuse of the shared HTTP transport against a local stand-in server.
+
+Runs the same mix of page fetches and image downloads twice: once with a bare
+requests.get() per request (the old behaviour) and once through fetch_html_from_url()
+and download_from_url(), which share the pooled keep-alive session. The server counts
+the TCP connections it accepts, so reused connections = requests - connections.
+
+Usage:
+    python -m benchmarks.bench_http_transport [--pages 20] [--images 40] [--json]
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import requests
+from benchmarks.local_server import StandInServer
+from src.fetch_html_from_url import fetch_html_from_url, get_browser_headers
+from src.image_handler import download_from_url
+from src.image_store import ImageStore
+from src.http_transport import configure_transport
+
+PAGE_BODY = b"<html><body><div class='training-module'>" + b"<p>Lorem ipsum</p>" * 500 + b"</div></body></html>"
+IMAGE_BODY = bytes(range(256)) * 64
+
+def build_routes(pages, images):
+    """Register the page and image paths served by the stand-in server"""
+    routes = {}
+    for i in range(pages):
+        routes[f"/module/section/{i}"] = (PAGE_BODY, 'text/html')
+    for i in range(images):
+        routes[f"/images/{i}.png"] = (IMAGE_BODY, 'image/png')
+    return routes
+
+def run_bare_requests(base_url, pages, images, image_dir):
+    """Fetch pages and images with a new requests.get() call each time"""
+    for i in range(pages):
+        requests.get(f"{base_url}/module/section/{i}", headers=get_browser_headers(), timeout=30).text
+    for i in range(images):
+        response = requests.get(f"{base_url}/images/{i}.png", stream=True, timeout=10)
+        with open(os.path.join(image_dir, f"bare_{i}.png"), 'wb') as f:
+            for chunk in response.iter_content(chunk_size=8192):
+                f.write(chunk)
+
+def run_shared_transport(base_url, pages, images, image_dir):
+    """Fetch pages and images through the modules that use the shared transport"""
+    store = ImageStore(image_dir)
+    for i in range(pages):
+        fetch_html_from_url(f"{base_url}/module/section/{i}")
+    for i in range(images):
+        download_from_url(f"{base_url}/images/{i}.png", store)
+
+def measure(server, scenario, *args):
+    """Run a scenario and return its timing and connection counters"""
+    server.reset_counters()
+    start = time.perf_counter()
+    scenario(server.base_url, *args)
+    elapsed = time.perf_counter() - start
+    counters = dict(server.counters)
+    counters['reused'] = counters['requests'] - counters['connections']
+    counters['seconds'] = round(elapsed, 4)
+    return counters
+
+def main():
+    """Run both scenarios and print the comparison"""
+    parser = argparse.ArgumentParser(description='Benchmark HTTP connection reuse')
+    parser.add_argument('--pages', type=int, default=20, help='Number of pages to fetch')
+    parser.add_argument('--images', type=int, default=40, help='Number of images to download')
+    parser.add_argument('--pool-size', type=int, default=10, help='Connections kept open per host')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    configure_transport(args.pool_size)
+    server = StandInServer(build_routes(args.pages, args.images)).start()
+    try:
+        with tempfile.TemporaryDirectory() as image_dir:
+            results = {
+                'bare_requests': measure(server, run_bare_requests, args.pages, args.images, image_dir),
+                'shared_transport': measure(server, run_shared_transport, args.pages, args.images, image_dir)
+            }
+    finally:
+        server.stop()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'scenario':<18} {'requests':>8} {'connections':>11} {'reused':>6} {'seconds':>8}")
+    for name, result in results.items():
+        print(f"{name:<18} {result['requests']:>8} {result['connections']:>11} "
+              f"{result['reused']:>6} {result['seconds']:>8.3f}")
+
+if __name__ == '__main__':
+    main()
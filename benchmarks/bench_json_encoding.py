@@ -0,0 +1,90 @@
+"""Benchmark JSON encode throughput of the output formats.
+
+Encodes the example page's structured content, and a synthetic corpus made of that
+content repeated many times, with every JSON writer: the indented json format, and
+JSON Lines with item and page granularity using the standard library encoder and
+orjson (when installed). Output goes to a stream that only counts characters, so the
+numbers are pure encoding cost. Reports the best time, records/s and MB/s.
+
+Usage:
+    python -m benchmarks.bench_json_encoding [--copies 500] [--repeat 5] [--json]
+"""
+import gc
+import json
+import time
+import argparse
+from src.json_output import write_json, write_jsonl, resolve_json_encoder
+
+EXAMPLE_OUTPUT = 'tests/examples/output.json'
+
+class CountingStream:
+    """Text stream that only counts what is written to it"""
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+def build_corpus(content, copies):
+    """Return a list of copies of the page, each with a distinct title"""
+    return [dict(content, title=f"{content['title']} {i}") for i in range(copies)]
+
+def build_scenarios():
+    """Return the writers to compare, keyed by name"""
+    scenarios = {'json indent=2': lambda page, stream: write_json(page, stream)}
+    encoders = ['json'] + (['orjson'] if resolve_json_encoder('orjson') == 'orjson' else [])
+    for encoder in encoders:
+        for granularity in ('item', 'page'):
+            scenarios[f"jsonl/{granularity} {encoder}"] = \
+                lambda page, stream, g=granularity, e=encoder: write_jsonl(page, stream, g, encoder=e)
+    return scenarios
+
+def measure(writer, pages, repeat):
+    """Return the best time and output size of writing every page"""
+    timings = []
+    for _ in range(repeat):
+        stream = CountingStream()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for page in pages:
+                writer(page, stream)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings), stream.size
+
+def main():
+    """Encode the example page and the synthetic corpus with every writer"""
+    parser = argparse.ArgumentParser(description='Benchmark JSON encoding throughput')
+    parser.add_argument('--copies', type=int, default=500, help='Pages in the synthetic corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per measurement, the best one is reported')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    with open(EXAMPLE_OUTPUT, 'r', encoding='utf-8') as f:
+        content = json.load(f)
+    records_per_page = len(content['content']) + len(content.get('questions', []))
+    datasets = {'example page': [content], f"corpus x{args.copies}": build_corpus(content, args.copies)}
+    results = {}
+    for dataset, pages in datasets.items():
+        for name, writer in build_scenarios().items():
+            seconds, size = measure(writer, pages, args.repeat)
+            records = len(pages) * (records_per_page if '/item' in name else 1)
+            results[f"{dataset}: {name}"] = {
+                'seconds': round(seconds, 5),
+                'records_per_second': round(records / seconds),
+                'mb_per_second': round(size / seconds / 1e6, 1)
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'dataset: writer':<36} {'seconds':>8} {'records/s':>10} {'MB/s':>7}")
+    for name, result in results.items():
+        print(f"{name:<36} {result['seconds']:>8.4f} {result['records_per_second']:>10} "
+              f"{result['mb_per_second']:>7.1f}")
+
+if __name__ == '__main__':
+    main()
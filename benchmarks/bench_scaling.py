@@ -0,0 +1,127 @@
+"""Benchmark extraction time and memory against input size.
+
+Generates synthetic module pages (benchmarks/synthetic_page.py) with an increasing
+number of sections and measures, for each size, the best extraction time (images
+disabled) and the peak traced memory of one extraction. The growth factor between
+sizes shows where the extractors stop scaling linearly.
+
+Results can be written as CSV for plotting elsewhere, or plotted directly with
+--plot when matplotlib is installed.
+
+Usage:
+    python -m benchmarks.bench_scaling [--sections 10 20 40 80 160] [--repeat 3]
+                                       [--list-depth 2] [--csv scaling.csv] [--plot scaling.png] [--json]
+"""
+import gc
+import csv
+import json
+import time
+import argparse
+import tracemalloc
+from benchmarks.synthetic_page import generate_page
+from src.LLMStructuredExtractor import extract_structured_content_from_html
+
+def extract(html_content, parser):
+    """Run one extraction without images"""
+    return extract_structured_content_from_html(html_content, download_images=False, parser=parser)
+
+def best_time(html_content, parser, repeat):
+    """Return the fastest of repeat extractions, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            extract(html_content, parser)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+def peak_memory(html_content, parser):
+    """Return the peak traced memory of one extraction, in bytes"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        extract(html_content, parser)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def measure_sizes(section_counts, page_options, parser, repeat):
+    """Measure every page size and return one result row per size"""
+    rows = []
+    for sections in section_counts:
+        html_content = generate_page(sections=sections, **page_options)
+        rows.append({
+            'sections': sections,
+            'html_bytes': len(html_content.encode('utf-8')),
+            'seconds': round(best_time(html_content, parser, repeat), 5),
+            'peak_bytes': peak_memory(html_content, parser)
+        })
+    return rows
+
+def write_csv(rows, path):
+    """Write the result rows as CSV"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+def plot(rows, path):
+    """Plot time and memory against input size; needs matplotlib"""
+    try:
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("matplotlib is not installed; use --csv to export the results instead")
+        return
+    sizes = [row['html_bytes'] / 1e6 for row in rows]
+    figure, (time_axis, memory_axis) = plt.subplots(1, 2, figsize=(10, 4))
+    time_axis.plot(sizes, [row['seconds'] for row in rows], marker='o')
+    time_axis.set(xlabel='HTML size (MB)', ylabel='extraction time (s)', title='Time')
+    memory_axis.plot(sizes, [row['peak_bytes'] / 1e6 for row in rows], marker='o')
+    memory_axis.set(xlabel='HTML size (MB)', ylabel='peak memory (MB)', title='Memory')
+    figure.tight_layout()
+    figure.savefig(path)
+    print(f"Plot saved to {path}")
+
+def main():
+    """Measure every size and print, export or plot the results"""
+    parser = argparse.ArgumentParser(description='Benchmark extraction time and memory against input size')
+    parser.add_argument('--sections', type=int, nargs='+', default=[10, 20, 40, 80, 160],
+                        help='Section counts of the generated pages')
+    parser.add_argument('--list-depth', type=int, default=2, help='Nesting depth of each list')
+    parser.add_argument('--list-items', type=int, default=4, help='Items per list level')
+    parser.add_argument('--table-rows', type=int, default=4, help='Rows per table')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed of the generated pages')
+    parser.add_argument('--parser', default='auto', help='Parser backend (default: auto)')
+    parser.add_argument('--repeat', type=int, default=3, help='Extractions per size, the best one is reported')
+    parser.add_argument('--csv', help='Write the results as CSV to this file')
+    parser.add_argument('--plot', help='Plot time and memory to this image file (needs matplotlib)')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    page_options = {'seed': args.seed, 'list_depth': args.list_depth, 'list_items': args.list_items,
+                    'table_rows': args.table_rows, 'images': 0}
+    rows = measure_sizes(args.sections, page_options, args.parser, args.repeat)
+    if args.csv:
+        write_csv(rows, args.csv)
+    if args.plot:
+        plot(rows, args.plot)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"{'sections':>8} {'HTML MB':>8} {'seconds':>8} {'peak MB':>8} {'time x':>7}")
+    previous = None
+    for row in rows:
+        growth = f"{row['seconds'] / previous['seconds']:.2f}" if previous else '-'
+        print(f"{row['sections']:>8} {row['html_bytes'] / 1e6:>8.2f} {row['seconds']:>8.4f} "
+              f"{row['peak_bytes'] / 1e6:>8.2f} {growth:>7}")
+        previous = row
+
+if __name__ == '__main__':
+    main()
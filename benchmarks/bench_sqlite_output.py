@@ -0,0 +1,106 @@
+"""Benchmark the SQLite output sink against scanning JSON output files.
+
+Builds a corpus from the example page's structured content repeated many times, with
+a code block mentioning nmap on every tenth page. The corpus is written once as one
+JSON file per page and once into a SQLite database through SQLiteOutput, with one
+transaction per page and with the default batch size. It then answers "every code
+block mentioning nmap" by loading and filtering every JSON file, and with an FTS5
+query. Reports the load throughput and the best query time.
+
+Usage:
+    python -m benchmarks.bench_sqlite_output [--pages 2000] [--repeat 5] [--json]
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+from src.sqlite_output import SQLiteOutput, DEFAULT_BATCH_SIZE
+
+EXAMPLE_OUTPUT = 'tests/examples/output.json'
+TERM = 'nmap'
+
+def build_corpus(content, pages):
+    """Return (source, page) pairs; every tenth page has a code block mentioning the term"""
+    corpus = []
+    for i in range(pages):
+        items = list(content['content'])
+        if i % 10 == 0:
+            items.append({"type": "code", "language": "bash", "text": f"{TERM} -sV -p- 10.129.0.{i % 256}"})
+        corpus.append((f"page-{i}.html", dict(content, title=f"{content['title']} {i}", content=items)))
+    return corpus
+
+def write_json_files(corpus, directory):
+    """Write every page as its own JSON file, as batch mode does"""
+    for source, page in corpus:
+        with open(os.path.join(directory, source + '.json'), 'w', encoding='utf-8') as f:
+            json.dump(page, f)
+
+def load_database(corpus, path, batch_size):
+    """Write the corpus into a fresh database and return the seconds it took"""
+    start = time.perf_counter()
+    with SQLiteOutput(path, batch_size=batch_size) as sink:
+        for source, page in corpus:
+            sink.write_page(page, source)
+    return time.perf_counter() - start
+
+def scan_json_files(directory):
+    """Answer the query by loading every JSON file"""
+    hits = []
+    for name in sorted(os.listdir(directory)):
+        with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+            page = json.load(f)
+        hits.extend((name, item["text"]) for item in page["content"]
+                    if item["type"] == "code" and TERM in item["text"].lower())
+    return hits
+
+def best_time(function, repeat):
+    """Return the best time of calling the function and its last result"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    """Load the corpus both ways and time the query against each"""
+    parser = argparse.ArgumentParser(description='Benchmark the SQLite output sink and its full-text index')
+    parser.add_argument('--pages', type=int, default=2000, help='Pages in the corpus')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query, the best one is reported')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    with open(EXAMPLE_OUTPUT, 'r', encoding='utf-8') as f:
+        corpus = build_corpus(json.load(f), args.pages)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        json_dir = os.path.join(directory, 'json')
+        os.makedirs(json_dir)
+        write_json_files(corpus, json_dir)
+        for batch_size in (1, DEFAULT_BATCH_SIZE):
+            path = os.path.join(directory, f"corpus-{batch_size}.db")
+            seconds = load_database(corpus, path, batch_size)
+            results[f"load, batch_size={batch_size}"] = {
+                'seconds': round(seconds, 4), 'pages_per_second': round(len(corpus) / seconds)}
+
+        scan_seconds, scan_hits = best_time(lambda: scan_json_files(json_dir), args.repeat)
+        with SQLiteOutput(path) as sink:
+            search_seconds, search_hits = best_time(
+                lambda: sink.search(TERM, item_type='code', limit=len(corpus)), args.repeat)
+        if len(scan_hits) != len(search_hits):
+            raise RuntimeError(f"query results differ: {len(scan_hits)} vs {len(search_hits)}")
+        results["query, scan JSON files"] = {'seconds': round(scan_seconds, 4), 'hits': len(scan_hits)}
+        results["query, FTS5"] = {'seconds': round(search_seconds, 4), 'hits': len(search_hits)}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'scenario':<26} {'seconds':>8}  detail")
+    for name, result in results.items():
+        detail = (f"{result['pages_per_second']} pages/s" if 'pages_per_second' in result
+                  else f"{result['hits']} hits")
+        print(f"{name:<26} {result['seconds']:>8.4f}  {detail}")
+
+if __name__ == '__main__':
+    main()
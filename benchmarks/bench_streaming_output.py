@@ -0,0 +1,75 @@
+"""Benchmark the memory used to write formatted output.
+
+Formats the example page, repeated to simulate a merged course dump, and writes it to
+a temporary file twice: once by building the whole string with format_content() and
+writing it (the old behaviour) and once by streaming it with write_formatted_content()
+through the buffered output file. Reports the time and the peak traced memory of each.
+
+Usage:
+    python -m benchmarks.bench_streaming_output [--copies 200] [--json]
+"""
+import os
+import gc
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import src.htb_scraper_utils as su
+
+EXAMPLE_OUTPUT = 'tests/examples/output.json'
+
+def build_content(copies):
+    """Return the example page's structured content with its items repeated"""
+    with open(EXAMPLE_OUTPUT, 'r', encoding='utf-8') as f:
+        content = json.load(f)
+    content['content'] = content['content'] * copies
+    return content
+
+def write_joined(content, path):
+    """Build the formatted string first, then write it"""
+    formatted_content = su.format_content(content, 'text')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(formatted_content)
+
+def write_streamed(content, path):
+    """Stream the formatted lines into a buffered file"""
+    with su.open_output_file(path) as f:
+        su.write_formatted_content(content, 'text', f)
+
+def measure(scenario, content, path):
+    """Run a scenario and return its time, peak traced memory and output size"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    scenario(content, path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': round(elapsed, 4), 'peak_bytes': peak, 'output_bytes': os.path.getsize(path)}
+
+def main():
+    """Compare joined and streamed output and print the results"""
+    parser = argparse.ArgumentParser(description='Benchmark streaming output')
+    parser.add_argument('--copies', type=int, default=200, help='How many times to repeat the example content')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    content = build_content(args.copies)
+    with tempfile.TemporaryDirectory() as output_dir:
+        path = os.path.join(output_dir, 'output.txt')
+        results = {
+            'joined': measure(write_joined, content, path),
+            'streamed': measure(write_streamed, content, path)
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'scenario':<10} {'output MB':>9} {'peak MB':>8} {'seconds':>8}")
+    for name, result in results.items():
+        print(f"{name:<10} {result['output_bytes'] / 1e6:>9.2f} {result['peak_bytes'] / 1e6:>8.2f} "
+              f"{result['seconds']:>8.3f}")
+
+if __name__ == '__main__':
+    main()
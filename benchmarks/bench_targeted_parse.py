@@ -0,0 +1,77 @@
+"""Benchmark the time and memory saved by a targeted parse.
+
+Parses tests/examples/example_page.html in full and in targeted mode with every
+installed backend that supports parse filtering, and reports the best parse time,
+the peak traced memory while parsing, and the number of nodes in the resulting tree.
+
+Usage:
+    python -m benchmarks.bench_targeted_parse [--repeat 5] [--json]
+"""
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from src.html_parsing import is_parser_available
+from src.LLMStructuredExtractor import LLMStructuredExtractor
+
+EXAMPLE_PAGE = 'tests/examples/example_page.html'
+BACKENDS = ['html.parser', 'lxml']
+
+def build_extractor(html_content, parser, parse_mode):
+    """Create an extractor, which parses the document"""
+    return LLMStructuredExtractor(html_content, download_images=False, parser=parser, parse_mode=parse_mode)
+
+def best_parse_time(html_content, parser, parse_mode, repeat):
+    """Return the fastest of repeat parses, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            build_extractor(html_content, parser, parse_mode)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+def peak_parse_memory(html_content, parser, parse_mode):
+    """Return the peak traced memory while parsing and the number of nodes in the tree"""
+    gc.collect()
+    tracemalloc.start()
+    extractor = build_extractor(html_content, parser, parse_mode)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, sum(1 for _ in extractor.soup.descendants)
+
+def main():
+    """Compare full and targeted parses and print the savings"""
+    parser = argparse.ArgumentParser(description='Benchmark targeted parsing')
+    parser.add_argument('--repeat', type=int, default=5, help='Parses per measurement, the best one is reported')
+    parser.add_argument('--json', action='store_true', help='Print machine-readable results')
+    args = parser.parse_args()
+
+    with open(EXAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    results = {}
+    for backend in BACKENDS:
+        if not is_parser_available(backend):
+            continue
+        for parse_mode in ('full', 'targeted'):
+            peak, nodes = peak_parse_memory(html_content, backend, parse_mode)
+            results[f"{backend}/{parse_mode}"] = {
+                'parse_seconds': round(best_parse_time(html_content, backend, parse_mode, args.repeat), 5),
+                'peak_bytes': peak,
+                'nodes': nodes
+            }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'backend/mode':<22} {'parse (s)':>10} {'peak MB':>8} {'nodes':>7}")
+    for name, result in results.items():
+        print(f"{name:<22} {result['parse_seconds']:>10.4f} {result['peak_bytes'] / 1e6:>8.2f} {result['nodes']:>7}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Benchmark the shared node text cache against separate get_text() calls.
+
+Walks list-heavy and table-heavy synthetic pages with BaseHTMLExtractor and with the
+recursive traversal of LLMStructuredExtractor, once with the NodeTextCache the walks
+use and once with the cache switched off so every processor calls get_text() itself.
+For each run it reports the text strings built and the characters copied into them,
+which is where the string allocations of text extraction go, the reads the cache
+answered without walking a subtree again, and the walk time.
+
+Without the cache each get_text() call joins every descendant string of its element
+again; with it each element's text is joined once and reused by later readers.
+
+Usage:
+    python -m benchmarks.bench_text_cache [--sections 100] [--repeat 5]
+"""
+import gc
+import time
+import argparse
+import contextlib
+from unittest import mock
+from bs4.element import Tag
+import src.BaseHTMLExtractor as base_module
+import src.LLMStructuredExtractor as llm_module
+from src.BaseHTMLExtractor import BaseHTMLExtractor
+from src.LLMStructuredExtractor import LLMStructuredExtractor
+from benchmarks.synthetic_page import generate_page
+
+class ModuleExtractor(BaseHTMLExtractor):
+    """Concrete BaseHTMLExtractor walking the training-module container"""
+    def find_main_content_container(self):
+        return self.soup.find('div', class_='training-module')
+
+    def extract_content(self):
+        return self.process_content_elements(self.find_main_content_container())
+
+def new_extractor(name, html_content):
+    if name == 'base':
+        return ModuleExtractor(html_content, download_images=False)
+    return LLMStructuredExtractor(html_content, download_images=False, traversal='recursive')
+
+@contextlib.contextmanager
+def text_cache_disabled():
+    """Run the walks without a text cache, as before it existed"""
+    no_cache = lambda cache: contextlib.nullcontext()
+    with mock.patch.object(base_module, 'use_text_cache', no_cache), \
+            mock.patch.object(llm_module, 'use_text_cache', no_cache):
+        yield
+
+def count_text_strings(extractor, container):
+    """Walk once and return (text strings built, characters copied into them, cache reuses)"""
+    counts = [0, 0, 0]
+    get_text = Tag.get_text
+
+    def counting_get_text(self, *args, **kwargs):
+        text = get_text(self, *args, **kwargs)
+        counts[0] += 1
+        counts[1] += len(text)
+        return text
+    with mock.patch.object(Tag, 'get_text', counting_get_text):
+        extractor.process_content_elements(container)
+    cache = extractor.text_cache
+    if cache is not None:
+        counts[0] += cache.built
+        counts[1] += sum(len(text) for text in cache.texts.values())
+        counts[2] = cache.reused
+    return counts
+
+def best_walk_time(extractor, container, repeat):
+    """Return the fastest of repeat walks, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            extractor.process_content_elements(container)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+def measure(name, html_content, repeat):
+    """Return (strings, characters, reuses, seconds) of one extractor on one page"""
+    extractor = new_extractor(name, html_content)
+    container = extractor.find_main_content_container()
+    counts = count_text_strings(extractor, container)
+    seconds = best_walk_time(extractor, container, repeat)
+    return (*counts, seconds)
+
+def main():
+    """Compare the walks with and without the text cache on every page"""
+    parser = argparse.ArgumentParser(description='Compare the node text cache with separate get_text() calls')
+    parser.add_argument('--sections', type=int, default=100, help='Sections of each generated page')
+    parser.add_argument('--repeat', type=int, default=5, help='Walks per measurement')
+    args = parser.parse_args()
+
+    pages = {
+        'list-heavy': generate_page(sections=args.sections, paragraphs=1, list_depth=3, list_items=6,
+                                    table_rows=0, images=args.sections),
+        'table-heavy': generate_page(sections=args.sections, paragraphs=1, list_depth=0, table_rows=20,
+                                     table_cols=5, images=args.sections)
+    }
+    print(f"{'page':<12} {'walk':<10} {'mode':<9} {'strings':>8} {'chars':>10} {'reused':>7} {'ms':>8}")
+    for page_name, html_content in pages.items():
+        for name in ['base', 'recursive']:
+            with text_cache_disabled():
+                before = measure(name, html_content, args.repeat)
+            after = measure(name, html_content, args.repeat)
+            for mode, (strings, characters, reused, seconds) in [('get_text', before), ('cache', after)]:
+                print(f"{page_name:<12} {name:<10} {mode:<9} {strings:>8} {characters:>10} {reused:>7} "
+                      f"{seconds * 1000:>8.2f}")
+
+if __name__ == '__main__':
+    main()
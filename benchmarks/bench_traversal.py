@@ -0,0 +1,65 @@
+"""Benchmark the single-pass traversal against the recursive walk.
+
+Times process_content_elements() (images not downloaded) with both traversals of
+LLMStructuredExtractor on the example page, on the example content repeated 16 times
+and on synthetic pages with deeply nested lists and tables. The recursive walk calls
+get_text() and find_all('img') on every list item and table cell, so it reads nested
+content once per enclosing construct; the single-pass traversal reads every node once.
+
+Usage:
+    python -m benchmarks.bench_traversal [--repeat 5] [--parser auto]
+"""
+import gc
+import time
+import argparse
+from src.LLMStructuredExtractor import LLMStructuredExtractor
+from benchmarks.synthetic_page import generate_page
+from benchmarks.run_benchmarks import scale_page, EXAMPLE_PAGE
+
+def nested_tables(depth, images):
+    """Return a page whose table cells nest depth levels deep around a run of images"""
+    inner = 'cell text <img src="a.png"/>' * images
+    return ('<html><body><div class="training-module">' + '<table><tr><td>' * depth + inner
+            + '</td></tr></table>' * depth + '</div></body></html>')
+
+def best_walk_time(html_content, traversal, parser, repeat):
+    """Return the fastest of repeat walks of the content container, in seconds"""
+    extractor = LLMStructuredExtractor(html_content, download_images=False, parser=parser,
+                                       traversal=traversal)
+    container = extractor.find_main_content_container()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            extractor.process_content_elements(container)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+def main():
+    """Time both traversals on every input and print the speedup"""
+    parser = argparse.ArgumentParser(description='Compare the single-pass traversal with the recursive walk')
+    parser.add_argument('--repeat', type=int, default=5, help='Walks per input and traversal')
+    parser.add_argument('--parser', default='auto', help='Parser backend (default: auto)')
+    args = parser.parse_args()
+
+    with open(EXAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        example_html = f.read()
+    inputs = {
+        'example': example_html,
+        'example_x16': scale_page(example_html, 16),
+        'synthetic_200': generate_page(sections=200, images=200),
+        'lists_depth_6': generate_page(sections=50, list_depth=6, list_items=3, images=100),
+        'tables_depth_8': nested_tables(8, 500)
+    }
+    print(f"{'input':<15} {'recursive (ms)':>15} {'single-pass (ms)':>17} {'speedup':>8}")
+    for name, html_content in inputs.items():
+        recursive = best_walk_time(html_content, 'recursive', args.parser, args.repeat)
+        single_pass = best_walk_time(html_content, 'single-pass', args.parser, args.repeat)
+        print(f"{name:<15} {recursive * 1000:>15.2f} {single_pass * 1000:>17.2f} {recursive / single_pass:>7.2f}x")
+
+if __name__ == '__main__':
+    main()
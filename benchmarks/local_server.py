@@ -0,0 +1,77 @@
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Request handler that serves fixed bodies over keep-alive HTTP/1.1 connections"""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without TCP_NODELAY every reused
+    # connection would stall on delayed ACKs and hide the benefit of keep-alive
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        """Count every new TCP connection accepted by the server"""
+        super().setup()
+        self.server.record('connections')
+
+    def do_GET(self):
+        """Serve the body registered for the path, or a 404"""
+        self.server.record('requests')
+        route = self.server.routes.get(self.path.split('?')[0])
+        if route is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body, content_type = route
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep benchmark output quiet"""
+        pass
+
+class StandInServer(ThreadingHTTPServer):
+    """Local HTTP server standing in for the real site, with connection and request counters"""
+    daemon_threads = True
+
+    def __init__(self, routes, handler_class=StandInHandler):
+        """
+        Args:
+            routes (dict): Mapping of path to (body bytes, content type)
+            handler_class: Request handler class to serve the routes with
+        """
+        super().__init__(('127.0.0.1', 0), handler_class)
+        self.routes = routes
+        self.counters = {'connections': 0, 'requests': 0}
+        self._counter_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self):
+        """Return the http://host:port prefix of the server"""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def record(self, counter):
+        """Increment one of the server counters"""
+        with self._counter_lock:
+            self.counters[counter] += 1
+
+    def reset_counters(self):
+        """Reset the connection and request counters"""
+        with self._counter_lock:
+            self.counters = {'connections': 0, 'requests': 0}
+
+    def start(self):
+        """Serve requests on a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket"""
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,233 @@
+"""Benchmark suite timing each stage of the extraction pipeline separately.
+
+Stages:
+    parse             LLMStructuredExtractor construction (HTML parse)
+    container_lookup  find_main_content_container(), including the index build
+    walk              process_content_elements() on the container (images not downloaded)
+    images            process_image() for every image in the container plus the wait for
+                      the download stage, copying local fixture images into a fresh directory
+    format_text       format_for_llm_structured()
+    encode_json       json.dumps(content, indent=2)
+    encode_jsonl      write_jsonl() with item granularity
+
+Inputs are tests/examples/example_page.html, inputs made by repeating the example page's
+content container --scale times, and synthetic pages with --synthetic sections generated
+by benchmarks/synthetic_page.py (seed 0). Every image a page refers to is
+written as a small fixture file next to a copy of the page, so the image stage measures
+local copies and never touches the network.
+
+Each stage is run --repeat times with its setup outside the timed region; the minimum
+and median are reported. --output writes the results, with the environment they were
+measured in, as JSON. --baseline compares against an earlier results file and exits
+with status 1 if any stage's minimum is slower than --tolerance times the baseline.
+
+Usage:
+    python -m benchmarks.run_benchmarks [--scale 1 4 16] [--synthetic 50 200] [--repeat 5] [--parser auto]
+                                        [--output results.json] [--baseline old.json]
+"""
+import os
+import gc
+import sys
+import json
+import time
+import hashlib
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import bs4
+from bs4 import BeautifulSoup, Comment
+from src.html_parsing import resolve_parser_backend
+from src.LLMStructuredExtractor import LLMStructuredExtractor
+from src.format_for_llm_structured import format_for_llm_structured
+from src.json_output import write_jsonl, resolve_json_encoder
+from benchmarks.synthetic_page import generate_page
+
+EXAMPLE_PAGE = 'tests/examples/example_page.html'
+CONTAINER_CLASS = 'training-module'
+SCALE_MARKER = 'benchmark-scaled-content'
+FIXTURE_IMAGE_SIZE = 16 * 1024
+IMAGE_WORKERS = 8
+
+class CountingStream:
+    """Text stream that only counts what is written to it"""
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+def scale_page(html_content, scale):
+    """Return the page with the content of its training-module container repeated scale times"""
+    if scale <= 1:
+        return html_content
+    soup = BeautifulSoup(html_content, 'html.parser')
+    container = soup.find('div', class_=CONTAINER_CLASS)
+    inner_html = container.decode_contents()
+    container.clear()
+    container.append(Comment(SCALE_MARKER))
+    return str(soup).replace(f"<!--{SCALE_MARKER}-->", inner_html * scale)
+
+def write_fixture_images(html_content, fixture_dir):
+    """Create a deterministic file for every local image the page refers to"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for img in soup.find_all('img'):
+        src = img.get('src', '')
+        if not src or src.startswith(('http://', 'https://', 'data:')):
+            continue
+        path = os.path.normpath(os.path.join(fixture_dir, src))
+        if not path.startswith(fixture_dir) or os.path.exists(path):
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        seed = hashlib.sha256(src.encode('utf-8')).digest()
+        with open(path, 'wb') as f:
+            f.write(seed * (FIXTURE_IMAGE_SIZE // len(seed)))
+
+def time_stage(setup, run, repeat):
+    """Run setup() untimed and run(state) timed, repeat times; return min and median seconds"""
+    timings = []
+    for _ in range(repeat):
+        state = setup()
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run(state)
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return {'min': round(min(timings), 6), 'median': round(statistics.median(timings), 6), 'runs': repeat}
+
+def build_stages(html_content, base_url, parser, work_dir):
+    """Return (setup, run) pairs for every stage of one input, keyed by stage name"""
+    def new_extractor(download_images=False, image_dir=None):
+        return LLMStructuredExtractor(html_content, base_url, download_images=download_images,
+                                      image_output_dir=image_dir or os.path.join(work_dir, 'unused'),
+                                      image_workers=IMAGE_WORKERS, parser=parser)
+
+    def extractor_with_container():
+        extractor = new_extractor()
+        return extractor, extractor.find_main_content_container()
+
+    image_runs = iter(range(sys.maxsize))
+
+    def images_setup():
+        extractor = new_extractor(True, os.path.join(work_dir, f"images-{next(image_runs)}"))
+        return extractor, extractor.find_main_content_container().find_all('img')
+
+    def images_run(state):
+        extractor, images = state
+        image_items = [extractor.process_image(img) for img in images]
+        extractor.finish_image_downloads()
+        # A failed copy falls through to a download attempt, which would be timed instead
+        missing = [item["src"] for item in image_items if item["local_path"] is None]
+        if missing:
+            raise RuntimeError(f"{len(missing)} images were not copied, e.g. {missing[0]!r}")
+
+    content = new_extractor().extract_content()
+    return {
+        'parse': (lambda: None, lambda _: new_extractor()),
+        'container_lookup': (new_extractor, lambda extractor: extractor.find_main_content_container()),
+        'walk': (extractor_with_container, lambda state: state[0].process_content_elements(state[1])),
+        'images': (images_setup, images_run),
+        'format_text': (lambda: content, format_for_llm_structured),
+        'encode_json': (lambda: content, lambda page: json.dumps(page, indent=2)),
+        'encode_jsonl': (lambda: content, lambda page: write_jsonl(page, CountingStream()))
+    }
+
+def run_input(html_content, parser, repeat):
+    """Benchmark every stage on one input and return the results keyed by stage"""
+    with tempfile.TemporaryDirectory() as work_dir:
+        fixture_dir = os.path.join(work_dir, 'page')
+        os.makedirs(fixture_dir)
+        write_fixture_images(html_content, fixture_dir)
+        base_url = os.path.join(fixture_dir, 'page.html')
+        # Relative image paths are only resolved against the page's folder if the page exists
+        with open(base_url, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        stages = build_stages(html_content, base_url, parser, work_dir)
+        results = {}
+        for name, (setup, run) in stages.items():
+            results[name] = time_stage(setup, run, repeat)
+    return results
+
+def describe_environment(parser):
+    """Return the versions and settings the results were measured with"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'beautifulsoup4': bs4.__version__,
+        'parser': resolve_parser_backend(parser),
+        'json_encoder': resolve_json_encoder(),
+        'image_workers': IMAGE_WORKERS
+    }
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return (input, stage, ratio) for every stage slower than tolerance times the baseline"""
+    regressions = []
+    for input_name, stages in results.items():
+        for stage, timing in stages.items():
+            previous = baseline.get(input_name, {}).get(stage)
+            if not previous or not previous['min']:
+                continue
+            ratio = timing['min'] / previous['min']
+            if ratio > tolerance:
+                regressions.append((input_name, stage, ratio))
+    return regressions
+
+def print_results(results):
+    """Print one table row per input and stage"""
+    print(f"{'input':<14} {'stage':<17} {'min (ms)':>10} {'median (ms)':>12}")
+    for input_name, stages in results.items():
+        for stage, timing in stages.items():
+            print(f"{input_name:<14} {stage:<17} {timing['min'] * 1000:>10.3f} {timing['median'] * 1000:>12.3f}")
+
+def main():
+    """Run the suite over every input and report, save and compare the results"""
+    parser = argparse.ArgumentParser(description='Benchmark each stage of the extraction pipeline')
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4, 16],
+                        help='Repeat the example content container this many times (1 = example page)')
+    parser.add_argument('--synthetic', type=int, nargs='*', default=[50, 200],
+                        help='Section counts of the generated synthetic pages')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per stage')
+    parser.add_argument('--parser', default='auto', help='Parser backend (default: auto)')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='Fail when a stage is slower than this many times the baseline (default: 1.25)')
+    args = parser.parse_args()
+
+    with open(EXAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        example_html = f.read()
+    results = {}
+    for scale in args.scale:
+        input_name = 'example' if scale <= 1 else f"example_x{scale}"
+        results[input_name] = run_input(scale_page(example_html, scale), args.parser, args.repeat)
+    for sections in args.synthetic:
+        results[f"synthetic_{sections}"] = run_input(generate_page(sections=sections, images=sections),
+                                                     args.parser, args.repeat)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': describe_environment(args.parser), 'results': results}, f, indent=2)
+        print(f"Results saved to {args.output}")
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)['results']
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        for input_name, stage, ratio in regressions:
+            print(f"REGRESSION {input_name} {stage}: {ratio:.2f}x the baseline")
+        if regressions:
+            sys.exit(1)
+        print(f"No stage slower than {args.tolerance}x the baseline")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+"""Generate synthetic HackTheBox Academy pages for scaling tests.
+
+The pages have the structure the extractors handle on real module pages: a page-title
+heading, a navigation bar and scripts outside the content, a training-module container
+with sections made of headings, paragraphs, card alerts, pre code blocks, nested
+ordered/unordered lists and tables with images, and a questionsDiv card with
+module-question labels. The size of each part is a parameter, and the same parameters
+and seed always produce exactly the same page.
+
+Usage:
+    python -m benchmarks.synthetic_page [--sections 10] [--seed 0] [--output page.html]
+"""
+import random
+import argparse
+from html import escape
+
+WORDS = ("splunk search index event query log source alert host field report dashboard "
+         "macro sysmon process network registry token user session admin payload").split()
+LANGUAGES = ['bash', 'powershell', 'python', 'sql']
+
+def generate_page(seed=0, sections=10, paragraphs=3, list_depth=2, list_items=4, table_rows=4,
+                  table_cols=3, images=10, code_blocks=1, alerts=1, questions=3):
+    """
+    Build a synthetic module page.
+    Args:
+        seed (int): Random seed; the same seed and sizes always give the same page
+        sections (int): Number of h2 sections in the training-module container
+        paragraphs (int): Paragraphs per section
+        list_depth (int): Nesting depth of each section's list (1 = flat list)
+        list_items (int): Items per list level
+        table_rows (int): Rows of each section's table (0 = no table)
+        table_cols (int): Cells per table row
+        images (int): Total number of images, spread over list items, table cells and paragraphs
+        code_blocks (int): pre code blocks per section
+        alerts (int): card alerts per section
+        questions (int): Questions in the questionsDiv card
+    Returns:
+        str: The HTML page
+    """
+    rng = random.Random(seed)
+    image_slots = ImageSlots(images, sections)
+    parts = [
+        "<!DOCTYPE html><html><head><title>Synthetic Module</title>",
+        "<script>window.analytics = {};</script></head><body>",
+        build_navigation(rng),
+        '<h4 class="page-title mb-0 font-size-18">Synthetic Module</h4>',
+        '<div class="training-module"><h1>Synthetic Module</h1><hr/>'
+    ]
+    for section in range(sections):
+        parts.append(build_section(rng, section, image_slots, paragraphs, list_depth, list_items,
+                                   table_rows, table_cols, code_blocks, alerts))
+    parts.append("</div>")
+    parts.append(build_questions(rng, questions))
+    parts.append("<footer><p>Synthetic footer</p></footer></body></html>")
+    return "\n".join(parts)
+
+class ImageSlots:
+    """Hands out the image tags of a page, spreading them evenly over the sections"""
+
+    def __init__(self, total, sections):
+        self.remaining = total
+        self.per_section = -(-total // sections) if sections else 0
+        self.next_index = 0
+
+    def take(self, wanted):
+        """Return up to wanted image tags"""
+        count = min(wanted, self.remaining)
+        self.remaining -= count
+        tags = [f'<img alt="Image {self.next_index + i}" src="./saved_page_files/image_{self.next_index + i}.png"/>'
+                for i in range(count)]
+        self.next_index += count
+        return tags
+
+def words(rng, count):
+    """Return count random words as a sentence fragment"""
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+def build_navigation(rng):
+    """Return a navigation bar, which lies outside the content container"""
+    links = "".join(f'<li><a href="/module/{i}">{escape(words(rng, 2))}</a></li>' for i in range(20))
+    return f'<nav class="navbar"><ul class="nav">{links}</ul></nav>'
+
+def build_section(rng, section, image_slots, paragraphs, list_depth, list_items,
+                  table_rows, table_cols, code_blocks, alerts):
+    """Return the HTML of one section"""
+    section_images = image_slots.take(image_slots.per_section)
+    list_images = section_images[:len(section_images) // 3]
+    table_images = section_images[len(list_images):len(list_images) * 2] if table_rows else []
+    paragraph_images = section_images[len(list_images) + len(table_images):]
+    parts = [f"<h2>Section {section}: {escape(words(rng, 3))}</h2>"]
+    for i in range(paragraphs):
+        image = paragraph_images.pop() if paragraph_images else ""
+        parts.append(f"<p>{escape(words(rng, 40))} <code>{escape(words(rng, 2))}</code>{image}</p>")
+    parts.extend(f"<p>{image}</p>" for image in paragraph_images)
+    for _ in range(alerts):
+        parts.append(f'<div class="card"><div class="card-body"><p>Note: {escape(words(rng, 15))}</p></div></div>')
+    for _ in range(code_blocks):
+        language = rng.choice(LANGUAGES)
+        code = "\n".join(escape(words(rng, 6)) for _ in range(4))
+        parts.append(f'<pre><code class="language-{language}">{code}</code></pre>')
+    if list_depth > 0 and list_items > 0:
+        parts.append(build_list(rng, list_depth, list_items, list_images, ordered=section % 2 == 0))
+    if table_rows > 0 and table_cols > 0:
+        parts.append(build_table(rng, table_rows, table_cols, table_images))
+    return "\n".join(parts)
+
+def build_list(rng, depth, items, list_images, ordered):
+    """Return a list nested depth levels deep; the first item of each level holds the nested list"""
+    tag = "ol" if ordered else "ul"
+    parts = [f"<{tag}>"]
+    for i in range(items):
+        image = list_images.pop() if list_images else ""
+        nested = build_list(rng, depth - 1, items, list_images, not ordered) if i == 0 and depth > 1 else ""
+        parts.append(f"<li><p>{escape(words(rng, 8))}{image}</p>{nested}</li>")
+    parts.append(f"</{tag}>")
+    return "".join(parts)
+
+def build_table(rng, rows, cols, table_images):
+    """Return a table whose cells hold text and, while they last, images"""
+    parts = ["<table>"]
+    for _ in range(rows):
+        cells = []
+        for _ in range(cols):
+            image = table_images.pop() if table_images else ""
+            cells.append(f"<td>{escape(words(rng, 3))}{image}</td>")
+        parts.append(f"<tr>{''.join(cells)}</tr>")
+    parts.append("</table>")
+    return "".join(parts)
+
+def build_questions(rng, questions):
+    """Return the questionsDiv card"""
+    labels = "".join(
+        f'<div><label class="module-question" for="{i}"><span class="badge">+ 1 <i class="fad fa-cube"></i></span> '
+        f'{escape(words(rng, 10))}?</label></div>'
+        for i in range(questions))
+    return (f'<div class="card" id="questionsDiv"><div class="card-body">'
+            f'<h4 class="card-title">Questions</h4>{labels}</div></div>')
+
+def main():
+    """Write a synthetic page to a file or stdout"""
+    parser = argparse.ArgumentParser(description='Generate a synthetic HackTheBox Academy page')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed')
+    parser.add_argument('--sections', type=int, default=10, help='Number of sections')
+    parser.add_argument('--paragraphs', type=int, default=3, help='Paragraphs per section')
+    parser.add_argument('--list-depth', type=int, default=2, help='Nesting depth of each list')
+    parser.add_argument('--list-items', type=int, default=4, help='Items per list level')
+    parser.add_argument('--table-rows', type=int, default=4, help='Rows per table')
+    parser.add_argument('--table-cols', type=int, default=3, help='Cells per table row')
+    parser.add_argument('--images', type=int, default=10, help='Total number of images')
+    parser.add_argument('--questions', type=int, default=3, help='Number of questions')
+    parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+    args = parser.parse_args()
+
+    html_content = generate_page(args.seed, args.sections, args.paragraphs, args.list_depth, args.list_items,
+                                 args.table_rows, args.table_cols, args.images, questions=args.questions)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+    else:
+        print(html_content)
+
+if __name__ == '__main__':
+    main()
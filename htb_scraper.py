@@ -1,39 +1,139 @@
 from src.LLMStructuredExtractor import extract_structured_content_from_html
-from src.format_for_llm_structured import format_for_llm_structured
 import src.htb_scraper_utils as su
-import json
+import src.batch_runner as batch
+from src.module_crawler import ModuleCrawler
+from src.sqlite_output import store_page
+from src.http_transport import configure_transport
+from src.log_config import verbosity_level
+import src.metrics as metrics
+import src.run_journal as run_journal
+import os
+import time
+import logging
 
-def main():
-    """Main function to coordinate the content extraction process with LLM-friendly structure"""
-    args = su.parse_arguments()
+logger = logging.getLogger('htb_scraper')
+
+def run_batch_mode(args, sink=None):
+    """Extract every input of a batch run and print the per-page summary"""
+    inputs = batch.collect_batch_inputs(args)
+    if not inputs:
+        logger.error("No batch inputs found")
+        return
+    options = {
+        "format": args.format,
+        "jsonl_granularity": args.jsonl_granularity,
+        "download_images": args.download_images,
+        "image_dir": args.image_dir,
+        "image_workers": args.image_workers,
+        "parser": args.parser,
+        "parse_mode": 'targeted' if args.targeted_parse else 'full',
+        "max_depth": args.max_depth,
+        "pool_size": args.pool_size,
+        "rate_limit": args.rate_limit,
+        "burst": args.burst,
+        "max_retries": args.max_retries,
+        "retry_backoff": args.retry_backoff,
+        "log_level": verbosity_level(args.quiet, args.verbose),
+        "metrics": bool(args.metrics),
+        "http_cache_dir": None if args.no_cache else args.cache_dir,
+        "http_cache_bytes": args.cache_size * 1024 * 1024,
+        "extract_cache_dir": None if args.no_extract_cache else args.extract_cache_dir,
+        "extract_cache_bytes": args.extract_cache_size * 1024 * 1024
+    }
+    start = time.perf_counter()
+    results = batch.run_batch(inputs, args.output_dir, options, workers=args.workers, sink=sink)
+    print(batch.format_batch_summary(results, time.perf_counter() - start))
+
+def run_crawl_mode(args, sink=None):
+    """Crawl the module of the --crawl URL, writing each page to --output-dir, and print the summary"""
+    if args.targeted_parse:
+        # Link discovery reads every <a href> on the page, so crawl pages always get the full tree
+        logger.warning("--targeted-parse is ignored in crawl mode; pages are fully parsed to find their links")
+    os.makedirs(args.output_dir, exist_ok=True)
+    if args.download_images and args.image_dir:
+        os.makedirs(args.image_dir, exist_ok=True)
+    crawler = ModuleCrawler(depth=args.crawl_depth, concurrency=args.crawl_concurrency, delay=args.crawl_delay,
+                            download_images=args.download_images, image_output_dir=args.image_dir,
+                            image_workers=args.image_workers, parser=args.parser, max_depth=args.max_depth)
+    used_names = {}
+
+    def write_page(record, content):
+        if record["status"] == "skipped":
+            # Take up the page's name, so later pages are numbered as in the run that wrote it
+            batch.unique_output_path(record["input"], args.output_dir, args.format, used_names)
+            return
+        if content is None:
+            return
+        record["output"] = batch.unique_output_path(record["input"], args.output_dir, args.format, used_names)
+        try:
+            with su.open_output_file(record["output"]) as f:
+                su.write_formatted_content(content, args.format, f, args.jsonl_granularity, record["input"])
+        except Exception as e:
+            record["status"] = "failed"
+            record["error"] = str(e)
+            logger.warning("Failed to write %s: %s", record["input"], e)
+            return
+        store_page(sink, content, record["input"])
+
+    start = time.perf_counter()
+    results = crawler.crawl(args.crawl, on_page=write_page)
+    print(batch.format_batch_summary(results, time.perf_counter() - start))
+
+def run_single_mode(args, sink=None):
+    """Extract the page given by --file or --url and write it to the output"""
     html_content, base_url = su.get_html_content(args)
     if html_content is None:
+        metrics.inc(metrics.PAGES_TOTAL, status='failed')
         return
 
     # Create image directory if it doesn't exist
     if args.download_images and args.image_dir:
-        import os
         os.makedirs(args.image_dir, exist_ok=True)
 
-    # Extract content with image handling and LLM-friendly structure
-    content = extract_structured_content_from_html(
-        html_content,
-        base_url=base_url,
-        download_images=args.download_images,
-        image_output_dir=args.image_dir
-    )
-
-    # Format output based on selected format
-    if args.format == 'json':
-        formatted_content = json.dumps(content, indent=2)
-    else:
-        formatted_content = format_for_llm_structured(content)
-
-    # Write to output file or print to console
-    if args.output:
-        su.write_to_file(formatted_content, args.output)
-    else:
-        print(formatted_content)
+    with su.profile_if_requested(args):
+        # Extract content with image handling and LLM-friendly structure
+        content = extract_structured_content_from_html(
+            html_content,
+            base_url=base_url,
+            download_images=args.download_images,
+            image_output_dir=args.image_dir,
+            image_workers=args.image_workers,
+            parser=args.parser,
+            parse_mode='targeted' if args.targeted_parse else 'full',
+            max_depth=args.max_depth
+        )
+
+        # Stream the formatted output to the output file or the console
+        su.output_formatted_content(content, args)
+    store_page(sink, content, args.url or args.file)
+    metrics.inc(metrics.PAGES_TOTAL, status='ok')
+
+def main():
+    """Main function to coordinate the content extraction process with LLM-friendly structure"""
+    args = su.parse_arguments()
+    su.setup_logging(args)
+    su.setup_metrics(args)
+    configure_transport(args.pool_size)
+    su.setup_request_scheduler(args)
+    su.setup_http_cache(args)
+    su.setup_extraction_cache(args)
+    su.setup_journal(args)
+    sink = su.open_sqlite_output(args)
+    start = time.perf_counter()
+    try:
+        if su.is_batch_mode(args):
+            with su.profile_if_requested(args):
+                run_batch_mode(args, sink)
+        elif args.crawl:
+            with su.profile_if_requested(args):
+                run_crawl_mode(args, sink)
+        else:
+            run_single_mode(args, sink)
+    finally:
+        if sink is not None:
+            sink.close()
+        su.write_metrics(args, time.perf_counter() - start)
+        run_journal.close_journal()
 
 if __name__ == '__main__':
     main()
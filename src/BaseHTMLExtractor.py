@@ -1,27 +1,81 @@
-from bs4 import BeautifulSoup
 import re
 import os
+import logging
 from abc import ABC, abstractmethod
-from src.image_handler import process_image_element
+from src.image_handler import process_image_element, resolve_url, ImageDownloadStage
+from src.html_parsing import parse_html, parse_html_targeted
+from src.soup_index import SoupIndex
+from src.node_text import NodeTextCache, use_text_cache, stripped_text, normalized_text
+import src.metrics as metrics
+
+logger = logging.getLogger(__name__)
 
 class BaseHTMLExtractor(ABC):
 
-    def __init__(self, html_content, base_url=None, download_images=True, image_output_dir='images', max_depth=5):
+    # Elements kept by a targeted parse, as (tag name, class, id); subclasses add their containers
+    PARSE_TARGETS = [('h4', 'page-title', None), ('h1', None, None), ('title', None, None)]
+    # A targeted parse is only used if one of these elements is found in it
+    REQUIRED_PARSE_TARGETS = []
+    # Elements whose children are walked after the element itself is processed
+    WALKED_CONTAINER_TAGS = ['div', 'article', 'section', 'figure', 'p', 'table', 'tr', 'ul', 'ol']
+
+    def __init__(self, html_content, base_url=None, download_images=True, image_output_dir='images', max_depth=5,
+                 image_workers=1, parser='auto', parse_mode='full'):
         """Initialize with HTML content to parse.
         Args:
             html_content (str): HTML content as string
             base_url (str, optional): Base URL for resolving relative image URLs
             download_images (bool): Whether to download images
             image_output_dir (str): Directory to save downloaded images
-            max_depth (int): Maximum recursion depth for processing nested elements
+            max_depth (int, optional): Deepest level of nested containers to walk into; content
+                below it is skipped. None walks documents of any depth
+            image_workers (int): Number of concurrent image downloads. With more than one worker
+                images are fetched in the background and finish_image_downloads() fills in their
+                local_path; with one worker each image is downloaded as it is reached
+            parser (str): Parser backend: 'auto' (lxml when installed), 'lxml', 'html.parser' or 'html5lib'
+            parse_mode (str): 'full' builds the whole tree; 'targeted' only builds PARSE_TARGETS
         """
-        self.soup = BeautifulSoup(html_content, 'html.parser')
+        with metrics.timed('parse'):
+            self.soup = self.parse_document(html_content, parser, parse_mode)
+        self._index = None
         self.base_url = base_url
         self.download_images = download_images
         self.image_output_dir = image_output_dir
         self.max_depth = max_depth
+        self.image_stage = None
+        if download_images and image_workers > 1:
+            self.image_stage = ImageDownloadStage(base_url, image_output_dir, max_workers=image_workers)
+        # Resolved image URL -> first processed image item, so each image is fetched once per document
+        self.image_memo = {}
+        self.image_memo_hits = 0
+        # Text memo of the last walk, see process_content_elements()
+        self.text_cache = None
         self.element_processors = self.get_element_processor_map()
 
+    def parse_document(self, html_content, parser, parse_mode):
+        """Parse the HTML content into the soup the extractor works on.
+        In 'targeted' mode only the PARSE_TARGETS regions are built. If none of the
+        REQUIRED_PARSE_TARGETS is found in them the document is parsed in full instead.
+        Args:
+            html_content (str): HTML content as string
+            parser (str): Parser backend name
+            parse_mode (str): 'full' or 'targeted'
+        Returns:
+            BeautifulSoup: The parsed document
+        """
+        if parse_mode == 'targeted' and self.REQUIRED_PARSE_TARGETS:
+            soup = parse_html_targeted(html_content, self.PARSE_TARGETS, self.REQUIRED_PARSE_TARGETS, parser)
+            if soup is not None:
+                return soup
+        return parse_html(html_content, parser)
+
+    @property
+    def index(self):
+        """Tag name / class / id index of the document, built on first use with a single walk."""
+        if self._index is None:
+            self._index = SoupIndex(self.soup)
+        return self._index
+
     @abstractmethod
     def extract_content(self):
         """Extract content from HTML and return structured data."""
@@ -44,10 +98,10 @@ class BaseHTMLExtractor(ABC):
                 Returns "Unknown Title" if no title element is found.
         """
         title_elements = [
-            self.soup.find('h4', class_='page-title'),
-            self.soup.find('h1', class_='page-title'),
-            self.soup.find('h1'),
-            self.soup.find('title')
+            self.index.find('h4', class_='page-title'),
+            self.index.find('h1', class_='page-title'),
+            self.index.find('h1'),
+            self.index.find('title')
         ]
         for element in title_elements:
             if element and element.text.strip():
@@ -104,7 +158,10 @@ class BaseHTMLExtractor(ABC):
 
     def process_content_elements(self, container):
         """Process all content elements in the container.
-        Iterates through elements in the container and processes them in order.
+        Iterates through elements in the container and processes them in order. While
+        the walk runs, the text processors read element text from a NodeTextCache, so
+        text that several processors need (a list item read by process_list() and
+        _process_list_item(), a paragraph inside an alert) is built only once.
         Args:
             container: BeautifulSoup element containing the content to process
         Returns:
@@ -114,20 +171,29 @@ class BaseHTMLExtractor(ABC):
         """
         content_items = []
         # Process all elements in order by traversing the DOM tree
-        self._process_elements_in_order(container, content_items)
+        with metrics.timed('walk'), use_text_cache(NodeTextCache()) as self.text_cache:
+            self._process_elements_in_order(container, content_items)
+        metrics.count_elements(content_items)
         return content_items
 
     def _process_elements_in_order(self, container, content_items, depth=0):
-        """Recursively process elements in order.
+        """Process elements in document order.
+        The walk keeps an explicit stack of child iterators instead of recursing, so
+        documents of any depth are walked without reaching Python's recursion limit.
         Args:
             container: BeautifulSoup element to process
             content_items: List to append processed items to
-            depth: Current recursion depth
+            depth: Nesting depth of the container
         """
         if self._should_stop_recursion(depth):
             return
-        # Process direct children in order
-        for element in container.children:
+        stack = [(iter(container.children), depth)]
+        while stack:
+            children, depth = stack[-1]
+            element = next(children, None)
+            if element is None:
+                stack.pop()
+                continue
             if not hasattr(element, 'name') or not element.name:
                 continue
             # Process this element based on its type
@@ -139,16 +205,28 @@ class BaseHTMLExtractor(ABC):
                 self._process_table_cell(element, content_items)
             else:
                 self._process_standard_element(element, content_items)
-            self._process_container_children(element, content_items, depth)
+            # Walk into container elements that might contain images
+            if self._walks_into(element, depth):
+                stack.append((iter(element.children), depth + 1))
 
     def _should_stop_recursion(self, depth):
-        """Check if recursion should stop based on depth.
+        """Check if the walk should stop based on depth.
         Args:
-            depth: Current recursion depth
+            depth: Current nesting depth
         Returns:
-            bool: True if recursion should stop, False otherwise
+            bool: True if depth is beyond max_depth, False otherwise or if there is no max_depth
         """
-        return depth > self.max_depth
+        return self.max_depth is not None and depth > self.max_depth
+
+    def _walks_into(self, element, depth):
+        """Check whether the walk continues into the children of an element.
+        Args:
+            element: BeautifulSoup element found at the given depth
+            depth: Nesting depth of the element's parent
+        Returns:
+            bool: True for container elements whose children are within max_depth
+        """
+        return element.name in self.WALKED_CONTAINER_TAGS and not self._should_stop_recursion(depth + 1)
 
     def _process_image_element(self, element, content_items):
         """Process an image element and add it to content items.
@@ -162,7 +240,7 @@ class BaseHTMLExtractor(ABC):
         processed_item = self.process_image(element)
         if processed_item:
             content_items.append(processed_item)
-            print(f"Processed image: {processed_item.get('src', 'unknown')}")
+            logger.debug("Processed image: %s", processed_item.get('src', 'unknown'))
 
     def _process_list_item(self, element, content_items):
         """Process a list item element and its contained images.
@@ -171,7 +249,7 @@ class BaseHTMLExtractor(ABC):
             content_items: List to append processed items to
         """
         # First process the list item text
-        text = element.get_text().strip()
+        text = stripped_text(element)
         if text:
             content_items.append({
                 "type": "paragraph",
@@ -182,7 +260,7 @@ class BaseHTMLExtractor(ABC):
             processed_img = self.process_image(img)
             if processed_img:
                 content_items.append(processed_img)
-                print(f"Processed image in list item: {processed_img.get('src', 'unknown')}")
+                logger.debug("Processed image in list item: %s", processed_img.get('src', 'unknown'))
 
     def _process_table_cell(self, element, content_items):
         """Process a table cell element and its contained images.
@@ -191,7 +269,7 @@ class BaseHTMLExtractor(ABC):
             content_items: List to append processed items to
         """
         # Process text content
-        text = element.get_text().strip()
+        text = stripped_text(element)
         if text:
             content_items.append({
                 "type": "paragraph",
@@ -202,7 +280,7 @@ class BaseHTMLExtractor(ABC):
             processed_img = self.process_image(img)
             if processed_img:
                 content_items.append(processed_img)
-                print(f"Processed image in table cell: {processed_img.get('src', 'unknown')}")
+                logger.debug("Processed image in table cell: %s", processed_img.get('src', 'unknown'))
 
     def _process_standard_element(self, element, content_items):
         """Process a standard element using the appropriate processor.
@@ -215,22 +293,20 @@ class BaseHTMLExtractor(ABC):
             content_items.append(processed_item)
 
     def _process_container_children(self, element, content_items, depth):
-        """Process children of container elements recursively.
+        """Process the children of a container element.
         Args:
             element: BeautifulSoup element to check if it's a container
             content_items: List to append processed items to
-            depth: Current recursion depth
+            depth: Nesting depth of the element's parent
         """
-        # If this is a container element that might contain images, process its children
-        # Expanded list of container elements
-        if element.name in ['div', 'article', 'section', 'figure', 'p', 'table', 'tr', 'ul', 'ol']:
+        if self._walks_into(element, depth):
             self._process_elements_in_order(element, content_items, depth + 1)
 
     @staticmethod
     def process_heading(element):
         """Process a heading element."""
         # Normalize whitespace: replace newlines and multiple spaces with single spaces
-        text = re.sub(r'\s+', ' ', element.text.strip())
+        text = normalized_text(element)
         return {
             "type": "heading",
             "level": int(element.name[1]),
@@ -242,7 +318,7 @@ class BaseHTMLExtractor(ABC):
         """Process a list element."""
         list_items = []
         for li in element.find_all('li', recursive=False):
-            list_items.append(li.text.strip())
+            list_items.append(stripped_text(li))
         return {
             "type": "list",
             "list_type": "ordered" if element.name == "ol" else "unordered",
@@ -260,26 +336,47 @@ class BaseHTMLExtractor(ABC):
     @staticmethod
     def process_alert(element):
         """Process an alert element."""
-        card_text = element.text.strip()
+        # Normalize whitespace: replace newlines and multiple spaces with single spaces
+        card_text = normalized_text(element)
         if not card_text:
             return None
-        # Normalize whitespace: replace newlines and multiple spaces with single spaces
-        normalized_text = re.sub(r'\s+', ' ', card_text)
         return {
             "type": "alert",
-            "text": normalized_text
+            "text": card_text
         }
 
     def process_image(self, element):
         """Process an image element.
         Uses the image_handler module to process and optionally download the image.
+        Each distinct resolved image URL is downloaded once per document; repeated
+        images reuse the local_path of the first one and count as a memo hit.
         """
-        return process_image_element(
-            element,
-            base_url=self.base_url,
-            download=self.download_images,
-            output_dir=self.image_output_dir
-        )
+        src = element.get('src', '')
+        memo_key = resolve_url(src, self.base_url) if self.download_images and src else None
+        memoized_item = self.image_memo.get(memo_key) if memo_key else None
+        if memoized_item is None:
+            image_item = process_image_element(
+                element,
+                base_url=self.base_url,
+                download=self.download_images,
+                output_dir=self.image_output_dir,
+                download_stage=self.image_stage
+            )
+            if memo_key:
+                self.image_memo[memo_key] = image_item
+            return image_item
+        self.image_memo_hits += 1
+        image_item = process_image_element(element, base_url=self.base_url, download=False)
+        if self.image_stage is not None:
+            self.image_stage.share(image_item, memoized_item)
+        else:
+            image_item["local_path"] = memoized_item["local_path"]
+        return image_item
+
+    def finish_image_downloads(self):
+        """Wait for queued background image downloads and fill in their local_path fields."""
+        if self.image_stage is not None:
+            self.image_stage.wait()
 
     @staticmethod
     def process_paragraph(element):
@@ -291,20 +388,19 @@ class BaseHTMLExtractor(ABC):
                 Format: {"type": "paragraph", "text": "paragraph content"}
             None: If the paragraph contains no text after stripping whitespace
         """
-        text = element.text.strip()
+        # Normalize whitespace: replace newlines and multiple spaces with single spaces
+        text = normalized_text(element)
         if not text:
             return None
-        # Normalize whitespace: replace newlines and multiple spaces with single spaces
-        normalized_text = re.sub(r'\s+', ' ', text)
         return {
             "type": "paragraph",
-            "text": normalized_text
+            "text": text
         }
 
     @staticmethod
     def process_code_block(element):
         """Process a code block element."""
-        code = element.text.strip()
+        code = stripped_text(element)
         language = ""
         class_attr = element.get('class', [])
         if class_attr:
@@ -1,12 +1,51 @@
 from bs4 import BeautifulSoup
 import re
 import os
+import logging
 from src.BaseHTMLExtractor import BaseHTMLExtractor
-from src.image_handler import process_image_element
+from src.image_handler import process_image_element, count_failed_images
+from src.extraction_cache import get_default_extraction_cache
+from src.traversal_engine import SinglePassTraversal
+from src.node_text import NodeTextCache, use_text_cache, stripped_text
+import src.metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever a change to the extractors changes their output, so cached results are not reused
+EXTRACTOR_VERSION = '1'
 
 class LLMStructuredExtractor(BaseHTMLExtractor):
     """HTML extractor that creates a more structured output for LLM consumption."""
 
+    # Candidate content containers as (tag name, class), in order of preference
+    CONTAINER_SELECTORS = [
+        ('div', 'training-module'),
+        ('div', 'page-content'),
+        ('div', 'content'),
+        ('article', None),
+        ('main', None),
+        ('body', None)
+    ]
+    # A targeted parse builds only the HTB containers, the questions and the title elements
+    REQUIRED_PARSE_TARGETS = [('div', 'training-module', None), ('div', 'page-content', None)]
+    PARSE_TARGETS = BaseHTMLExtractor.PARSE_TARGETS + REQUIRED_PARSE_TARGETS + [('div', None, 'questionsDiv')]
+    # Lists and tables are processed as a whole, so only these containers are walked into
+    WALKED_CONTAINER_TAGS = ['div', 'article', 'section', 'figure', 'p']
+    TRAVERSALS = ['single-pass', 'recursive']
+
+    def __init__(self, *args, traversal='single-pass', **kwargs):
+        """Initialize with HTML content to parse.
+        Takes the same arguments as BaseHTMLExtractor, plus:
+        Args:
+            traversal (str): 'single-pass' visits every node once (see traversal_engine.py);
+                'recursive' is the original walk, which re-reads the text and images of
+                every list item and table cell. Both produce the same content items.
+        """
+        if traversal not in self.TRAVERSALS:
+            raise ValueError(f"Unknown traversal '{traversal}', expected one of {self.TRAVERSALS}")
+        super().__init__(*args, **kwargs)
+        self.traversal = traversal
+
     def extract_content(self):
         """Extract content from HTML and return structured data.
         Returns:
@@ -21,6 +60,9 @@ class LLMStructuredExtractor(BaseHTMLExtractor):
         title = self.extract_title()
         content_items = self.process_content_elements(content_container)
         questions = self.extract_questions()
+        self.finish_image_downloads()
+        if self.image_memo_hits:
+            logger.info("Reused %d repeated images without fetching them again", self.image_memo_hits)
         result = {"title": title, "content": content_items}
         if questions:
             result["questions"] = questions
@@ -32,19 +74,9 @@ class LLMStructuredExtractor(BaseHTMLExtractor):
             BeautifulSoup element or None: The main content container element if found, None otherwise.
         """
         # Try to find common content containers
-        for selector in [
-            ('div', 'training-module'),
-            ('div', 'page-content'),
-            ('div', 'content'),
-            ('article', None),
-            ('main', None),
-            ('body', None)
-        ]:
+        for selector in self.CONTAINER_SELECTORS:
             element_type, class_name = selector
-            if class_name:
-                container = self.soup.find(element_type, class_=class_name)
-            else:
-                container = self.soup.find(element_type)
+            container = self.index.find(element_type, class_=class_name)
             if container:
                 return container
         return None
@@ -54,7 +86,7 @@ class LLMStructuredExtractor(BaseHTMLExtractor):
         Returns:
             list: A list of question strings extracted from the page. Returns empty list if no questions found.
         """
-        questions_div = self.soup.find('div', id='questionsDiv')
+        questions_div = self.index.find('div', id='questionsDiv')
         if not questions_div:
             return []
         questions = []
@@ -74,42 +106,53 @@ class LLMStructuredExtractor(BaseHTMLExtractor):
         Returns:
             list: List of processed content items with a hierarchical structure
         """
-        content_items = []
-        # Process all elements in order by traversing the DOM tree
-        self._process_elements_in_order(container, content_items)
+        with metrics.timed('walk'):
+            if self.traversal == 'single-pass':
+                content_items = SinglePassTraversal(self).run(container)
+            else:
+                content_items = []
+                # Process all elements in order by traversing the DOM tree, reading text through a shared memo
+                with use_text_cache(NodeTextCache()) as self.text_cache:
+                    self._process_elements_in_order(container, content_items)
+        metrics.count_elements(content_items)
         return content_items
 
     def _process_elements_in_order(self, container, content_items, depth=0):
-        """Recursively process elements in order with a more structured approach.
+        """Process elements in order with a more structured approach.
+        The walk keeps an explicit stack of child iterators instead of recursing, so
+        documents of any depth are walked without reaching Python's recursion limit.
         Args:
             container: BeautifulSoup element to process
             content_items: List to append processed items to
-            depth: Current recursion depth
+            depth: Nesting depth of the container
         """
         if self._should_stop_recursion(depth):
             return
-        # Special handling for lists (ul/ol)
-        if container.name in ['ul', 'ol']:
-            self._process_list(container, content_items)
+        # Lists and tables are processed as a whole
+        if container.name in ['ul', 'ol', 'table']:
+            self._process_special_element(container, content_items)
             return
-        # Special handling for tables
-        if container.name == 'table':
-            self._process_table(container, content_items)
-            return
-        # Process direct children in order
-        for element in container.children:
+        stack = [(iter(container.children), depth)]
+        while stack:
+            children, depth = stack[-1]
+            element = next(children, None)
+            if element is None:
+                stack.pop()
+                continue
             if not hasattr(element, 'name') or not element.name:
                 continue
-            # Skip elements that are handled specially
+            # Lists and tables are one level deeper than their parent
             if element.name in ['ul', 'ol', 'table']:
-                self._process_special_element(element, content_items, depth)
+                if not self._should_stop_recursion(depth + 1):
+                    self._process_special_element(element, content_items)
                 continue
             # Process this element
             if element.name == 'img':
                 self._process_image_element(element, content_items)
             else:
                 self._process_standard_element(element, content_items)
-                self._process_container_children(element, content_items, depth)
+                if self._walks_into(element, depth):
+                    stack.append((iter(element.children), depth + 1))
 
     def _process_list(self, container, content_items):
         """Process a list element (ul/ol) and its items.
@@ -141,7 +184,7 @@ class LLMStructuredExtractor(BaseHTMLExtractor):
         """
         item_content = []
         # Get the text content
-        text = list_item.get_text().strip()
+        text = stripped_text(list_item)
         if text:
             item_content.append({
                 "type": "text",
@@ -197,7 +240,7 @@ class LLMStructuredExtractor(BaseHTMLExtractor):
         """
         cell_content = []
         # Get the text content
-        text = cell.get_text().strip()
+        text = stripped_text(cell)
         if text:
             cell_content.append({
                 "type": "text",
@@ -210,14 +253,16 @@ class LLMStructuredExtractor(BaseHTMLExtractor):
                 cell_content.append(processed_img)
         return cell_content
 
-    def _process_special_element(self, element, content_items, depth):
+    def _process_special_element(self, element, content_items):
         """Process special elements like lists and tables.
         Args:
-            element: BeautifulSoup element
+            element: BeautifulSoup list or table element
             content_items: List to append processed items to
-            depth: Current recursion depth
         """
-        self._process_elements_in_order(element, content_items, depth + 1)
+        if element.name == 'table':
+            self._process_table(element, content_items)
+        else:
+            self._process_list(element, content_items)
 
     def _process_image_element(self, element, content_items):
         """Process an image element.
@@ -239,25 +284,49 @@ class LLMStructuredExtractor(BaseHTMLExtractor):
         if processed_item:
             content_items.append(processed_item)
 
-    def _process_container_children(self, element, content_items, depth):
-        """Process children of container elements recursively.
-        Args:
-            element: BeautifulSoup element
-            content_items: List to append processed items to
-            depth: Current recursion depth
-        """
-        if element.name in ['div', 'article', 'section', 'figure', 'p']:
-            self._process_elements_in_order(element, content_items, depth + 1)
-
-def extract_structured_content_from_html(html_content, base_url=None, download_images=True, image_output_dir='images'):
+def extract_structured_content_from_html(html_content, base_url=None, download_images=True, image_output_dir='images',
+                                         image_workers=1, parser='auto', parse_mode='full', cache=None,
+                                         traversal='single-pass', max_depth=5):
     """Helper function to extract structured content from HTML for LLM consumption.
+    When an extraction cache is enabled, a page that was extracted before with the same
+    HTML, extractor version and options is returned from the cache without being parsed.
     Args:
         html_content (str): HTML content to parse
         base_url (str, optional): Base URL for resolving relative image URLs
         download_images (bool): Whether to download images
         image_output_dir (str): Directory to save downloaded images
+        image_workers (int): Number of concurrent image downloads
+        parser (str): Parser backend: 'auto' (lxml when installed), 'lxml', 'html.parser' or 'html5lib'
+        parse_mode (str): 'full' or 'targeted' (only build the content container, questions and title)
+        cache (ExtractionCache, optional): Result cache, defaults to the configured default cache
+        traversal (str): 'single-pass' or 'recursive'; both give the same result, so it is not part of the cache key
+        max_depth (int, optional): Deepest level of nested containers to walk into; None walks any depth
     Returns:
         dict: Extracted content with a hierarchical structure
     """
-    extractor = LLMStructuredExtractor(html_content, base_url, download_images, image_output_dir)
-    return extractor.extract_content()
+    cache = cache if cache is not None else get_default_extraction_cache()
+    if cache is not None:
+        key = cache.make_key(html_content, EXTRACTOR_VERSION, {
+            'base_url': base_url,
+            'download_images': download_images,
+            'image_output_dir': image_output_dir,
+            'parser': parser,
+            'parse_mode': parse_mode,
+            'max_depth': max_depth
+        })
+        content = cache.lookup(key, check_images=download_images)
+        if content is not None:
+            logger.info("Using cached extraction result")
+            return content
+    extractor = LLMStructuredExtractor(html_content, base_url, download_images, image_output_dir,
+                                       image_workers=image_workers, parser=parser,
+                                       max_depth=max_depth, parse_mode=parse_mode, traversal=traversal)
+    content = extractor.extract_content()
+    if cache is not None:
+        failed_images = count_failed_images(content) if download_images else 0
+        if failed_images:
+            # A failed download may only be a timeout or a 503; the next run should try again
+            logger.info("Not caching the extraction result: %d images could not be saved", failed_images)
+        else:
+            cache.save(key, content, EXTRACTOR_VERSION)
+    return content
@@ -0,0 +1,305 @@
+import os
+import re
+import sys
+import glob
+import time
+import logging
+from urllib.parse import urlparse
+from concurrent.futures import ProcessPoolExecutor
+from src.LLMStructuredExtractor import extract_structured_content_from_html
+from src.http_transport import configure_transport, DEFAULT_POOL_SIZE
+import src.request_scheduler as request_scheduler
+from src.http_cache import configure_cache, DEFAULT_MAX_BYTES
+from src.extraction_cache import (configure_extraction_cache, get_default_extraction_cache,
+                                  DEFAULT_MAX_BYTES as EXTRACT_CACHE_MAX_BYTES)
+from src.image_handler import count_failed_images
+import src.htb_scraper_utils as su
+import src.metrics as metrics
+import src.run_journal as run_journal
+from src.sqlite_output import store_page
+from src.log_config import configure_logging, DEFAULT_LEVEL
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_EXTENSIONS = {
+    'json': '.json',
+    'jsonl': '.jsonl',
+    'text': '.txt'
+}
+
+def collect_batch_inputs(args):
+    """Collect the list of batch inputs from a manifest, a glob pattern or stdin.
+    Args:
+        args: Parsed command line arguments
+    Returns:
+        list: Input file paths and/or URLs in the order they were given
+    """
+    if args.manifest:
+        return read_manifest(args.manifest)
+    if args.glob:
+        return expand_glob(args.glob)
+    return read_input_lines(sys.stdin)
+
+def read_manifest(manifest_path):
+    """Read batch inputs from a manifest file (one file path or URL per line).
+    Args:
+        manifest_path (str): Path to the manifest file
+    Returns:
+        list: Inputs listed in the manifest
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return read_input_lines(f)
+
+def read_input_lines(stream):
+    """Read inputs from a stream, skipping blank lines and '#' comments.
+    Args:
+        stream: Iterable of text lines
+    Returns:
+        list: Stripped input entries
+    """
+    inputs = []
+    for line in stream:
+        entry = line.strip()
+        if entry and not entry.startswith('#'):
+            inputs.append(entry)
+    return inputs
+
+def expand_glob(pattern):
+    """Expand a glob pattern into a sorted list of files.
+    Args:
+        pattern (str): Glob pattern, '**' is expanded recursively
+    Returns:
+        list: Matching file paths
+    """
+    return sorted(path for path in glob.glob(pattern, recursive=True) if os.path.isfile(path))
+
+def is_url(source):
+    """Check whether a batch input is a URL rather than a local file."""
+    return urlparse(source).scheme in ('http', 'https')
+
+def build_output_name(source):
+    """Derive an output file stem from an input path or URL.
+    Args:
+        source (str): Input file path or URL
+    Returns:
+        str: Filesystem-safe stem without extension
+    """
+    if is_url(source):
+        parsed = urlparse(source)
+        stem = f"{parsed.netloc}{parsed.path}".strip('/')
+    else:
+        stem = os.path.splitext(os.path.basename(source))[0]
+    stem = re.sub(r'[^\w.-]+', '_', stem).strip('_')
+    return stem or 'page'
+
+def assign_output_paths(inputs, output_dir, format_type):
+    """Assign a unique output file to every input.
+    Args:
+        inputs (list): Input file paths and/or URLs
+        output_dir (str): Directory the output files are written to
+        format_type (str): Output format, used to pick the file extension
+    Returns:
+        list: Output paths in the same order as the inputs
+    """
+    used_names = {}
+    return [unique_output_path(source, output_dir, format_type, used_names) for source in inputs]
+
+def unique_output_path(source, output_dir, format_type, used_names):
+    """Assign an output file to one input, numbering stems that were used before.
+    Args:
+        source (str): Input file path or URL
+        output_dir (str): Directory the output files are written to
+        format_type (str): Output format, used to pick the file extension
+        used_names (dict): Stem -> times used so far, updated in place
+    Returns:
+        str: Output path
+    """
+    stem = build_output_name(source)
+    count = used_names.get(stem, 0) + 1
+    used_names[stem] = count
+    if count > 1:
+        stem = f"{stem}-{count}"
+    return os.path.join(output_dir, stem + OUTPUT_EXTENSIONS.get(format_type, '.txt'))
+
+def initialize_worker(options):
+    """Set up logging, the shared HTTP transport and request scheduler, the caches and the journal in a worker process.
+    Args:
+        options (dict): Extraction and output options shared by the batch
+    """
+    configure_logging(options.get("log_level", DEFAULT_LEVEL))
+    configure_transport(options.get("pool_size", DEFAULT_POOL_SIZE))
+    request_scheduler.configure_scheduler(
+        rate=options.get("rate_limit"), burst=options.get("burst", 1),
+        max_retries=options.get("max_retries", request_scheduler.DEFAULT_MAX_RETRIES),
+        backoff=options.get("retry_backoff", request_scheduler.DEFAULT_BACKOFF))
+    if options.get("http_cache_dir"):
+        configure_cache(options["http_cache_dir"], options.get("http_cache_bytes", DEFAULT_MAX_BYTES))
+    if options.get("extract_cache_dir"):
+        configure_extraction_cache(options["extract_cache_dir"],
+                                   options.get("extract_cache_bytes", EXTRACT_CACHE_MAX_BYTES))
+    if options.get("journal_path"):
+        run_journal.configure_journal(options["journal_path"])
+
+def process_batch_item(source, output_path, options):
+    """Extract a single batch input and write it to its own output file.
+    This runs inside a worker process, so it must stay a module level function.
+    Args:
+        source (str): Input file path or URL
+        output_path (str): File to write the formatted output to
+        options (dict): Extraction and output options shared by the batch
+    Returns:
+        dict: Result record with the input, output, status, timing, error and extraction
+            cache outcome ('hit', 'miss' or None when the cache is disabled). With the
+            "metrics" option it also has the page's metrics as a Metrics.snapshot(), and
+            with the "return_content" option the extracted content of a successful page
+    """
+    if not options.get("metrics"):
+        return extract_batch_item(source, output_path, options)
+    with metrics.collect_metrics() as page_metrics:
+        result = extract_batch_item(source, output_path, options)
+        page_metrics.inc(metrics.PAGES_TOTAL, status=result["status"])
+    result["metrics"] = page_metrics.snapshot()
+    return result
+
+def extract_batch_item(source, output_path, options):
+    """Extract a single batch input and write it to its output file; see process_batch_item()"""
+    start = time.perf_counter()
+    result = {"input": source, "output": output_path, "status": "failed", "seconds": 0.0, "error": None,
+              "extract_cache": None}
+    cache = get_default_extraction_cache()
+    cache_hits = cache.hits if cache is not None else 0
+    try:
+        if is_url(source):
+            html_content, base_url = su.get_content_from_url(source)
+        else:
+            html_content, base_url = su.get_content_from_file(source)
+        if html_content is None:
+            raise RuntimeError("could not read input")
+        run_journal.record(source, run_journal.FETCHED)
+        content = extract_structured_content_from_html(
+            html_content,
+            base_url=base_url,
+            download_images=options["download_images"],
+            image_output_dir=options["image_dir"],
+            image_workers=options.get("image_workers", 1),
+            parser=options.get("parser", 'auto'),
+            parse_mode=options.get("parse_mode", 'full'),
+            max_depth=options.get("max_depth", 5)
+        )
+        if cache is not None:
+            result["extract_cache"] = "hit" if cache.hits > cache_hits else "miss"
+        run_journal.record(source, run_journal.EXTRACTED)
+        with su.open_output_file(output_path) as f:
+            su.write_formatted_content(content, options["format"], f,
+                                       options.get("jsonl_granularity", 'item'), source)
+        failed_images = count_failed_images(content) if options["download_images"] else 0
+        run_journal.mark_done(source, output_path, failed_images)
+        if options.get("return_content"):
+            result["content"] = content
+        result["status"] = "ok"
+    except Exception as e:
+        result["error"] = str(e)
+        logger.warning("Failed to extract %s: %s", source, e)
+        run_journal.record(source, run_journal.FAILED, error=str(e))
+    result["seconds"] = time.perf_counter() - start
+    logger.debug("Finished %s in %.2fs", source, result["seconds"])
+    return result
+
+def run_batch(inputs, output_dir, options, workers=1, sink=None):
+    """Run the extraction for every input, fanning out across a process pool.
+    Args:
+        inputs (list): Input file paths and/or URLs
+        output_dir (str): Directory to write one output file per input to
+        options (dict): Extraction and output options shared by the batch
+        workers (int): Number of worker processes; 1 runs everything in-process
+        sink (SQLiteOutput, optional): Database every extracted page is also written to.
+            Workers send their pages back and the calling process writes them, so the
+            database has a single writer that can batch its transactions
+    Returns:
+        list: Result records in input order. When metrics are enabled, each page's metrics
+            are merged into the default registry. When a journal is enabled, inputs it
+            records as complete are not processed again and get a 'skipped' record
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    if options["download_images"] and options["image_dir"]:
+        os.makedirs(options["image_dir"], exist_ok=True)
+    # Paths are assigned over every input, so a resumed run writes to the same files
+    output_paths = assign_output_paths(inputs, output_dir, options["format"])
+    results = [None] * len(inputs)
+    todo = list(range(len(inputs)))
+    journal = run_journal.get_default_journal()
+    if journal is not None:
+        journal.add(inputs)
+        todo = []
+        for i, (source, path) in enumerate(zip(inputs, output_paths)):
+            if journal.is_complete(source, path):
+                results[i] = skipped_result(source, path)
+            else:
+                todo.append(i)
+        if len(todo) < len(inputs):
+            logger.info("Journal %s: skipping %d finished inputs, %d to do", journal.path,
+                        len(inputs) - len(todo), len(todo))
+            metrics.inc(metrics.PAGES_TOTAL, len(inputs) - len(todo), status='skipped')
+    if sink is not None:
+        options = dict(options, return_content=True)
+    if workers <= 1 or len(todo) <= 1:
+        for i in todo:
+            results[i] = store_result(process_batch_item(inputs[i], output_paths[i], options), sink)
+    else:
+        if options.get("rate_limit"):
+            # Each worker process has its own token buckets; together they keep to the limit
+            options = dict(options, rate_limit=options["rate_limit"] / min(workers, len(todo)))
+        if journal is not None:
+            options = dict(options, journal_path=journal.path)
+        with ProcessPoolExecutor(max_workers=workers, initializer=initialize_worker,
+                                 initargs=(options,)) as executor:
+            futures = {i: executor.submit(process_batch_item, inputs[i], output_paths[i], options) for i in todo}
+            for i, future in futures.items():
+                results[i] = store_result(future.result(), sink)
+    registry = metrics.get_default_metrics()
+    if registry is not None:
+        for result in results:
+            if result.get("metrics"):
+                registry.merge(result["metrics"])
+    return results
+
+def store_result(result, sink):
+    """Write the content a worker sent back with its result to the sink, and drop it from the result."""
+    content = result.pop("content", None)
+    if content is not None:
+        store_page(sink, content, result["input"])
+    return result
+
+def skipped_result(source, output_path):
+    """Build the result record of an input the journal records as complete."""
+    return {"input": source, "output": output_path, "status": "skipped", "seconds": 0.0, "error": None,
+            "extract_cache": None}
+
+def format_batch_summary(results, elapsed):
+    """Build a human readable summary of a batch run.
+    Args:
+        results (list): Result records returned by run_batch()
+        elapsed (float): Wall clock time of the whole run in seconds
+    Returns:
+        str: Summary with one line per page followed by totals
+    """
+    lines = ["", "Batch summary:"]
+    for result in results:
+        if result["status"] == "ok":
+            lines.append(f"  OK    {result['seconds']:7.2f}s  {result['input']} -> {result['output']}")
+        elif result["status"] == "skipped":
+            lines.append(f"  SKIP  {result['seconds']:7.2f}s  {result['input']} -> {result['output']}")
+        else:
+            lines.append(f"  FAIL  {result['seconds']:7.2f}s  {result['input']}: {result['error']}")
+    succeeded = sum(1 for result in results if result["status"] == "ok")
+    skipped = sum(1 for result in results if result["status"] == "skipped")
+    failed = len(results) - succeeded - skipped
+    page_seconds = sum(result["seconds"] for result in results)
+    skipped_text = f", {skipped} skipped" if skipped else ""
+    lines.append(f"{len(results)} pages: {succeeded} succeeded, {failed} failed{skipped_text} "
+                 f"in {elapsed:.2f}s (page time {page_seconds:.2f}s)")
+    cache_results = [result["extract_cache"] for result in results if result.get("extract_cache")]
+    if cache_results:
+        hits = cache_results.count("hit")
+        lines.append(f"Extraction cache: {hits} hits, {len(cache_results) - hits} misses")
+    return "\n".join(lines)
@@ -0,0 +1,224 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+import time
+import logging
+
+METADATA_SUFFIX = '.json'
+BODY_SUFFIX = '.body'
+TEMP_PREFIX = '.tmp-'
+
+logger = logging.getLogger(__name__)
+
+class DiskCache:
+    """
+    Persistent key/value store on disk with a size cap and least-recently-used eviction.
+    Each entry is a JSON metadata file plus a body file, sharded into sub-directories by
+    the first two characters of the key. Files are written to a temporary name and moved
+    into place with os.replace(), so concurrent readers and writers in other threads or
+    processes never see a partially written entry. The modification time of the metadata
+    file records the last access and drives eviction.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        """
+        Args:
+            cache_dir (str): Directory holding the cache entries
+            max_bytes (int): Size cap; the least recently used entries are evicted above it
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._size_estimate = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts):
+        """
+        Build a cache key by hashing the given parts.
+        Args:
+            *parts (str): Values identifying the entry
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key):
+        """
+        Read an entry and mark it as recently used.
+        Args:
+            key (str): Cache key
+        Returns:
+            tuple: (metadata dict, body bytes), or None if the entry does not exist
+        """
+        metadata_path, body_path = self._entry_paths(key)
+        try:
+            with open(metadata_path, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+            self._touch(metadata_path)
+        except (OSError, ValueError):
+            return None
+        return metadata, body
+
+    def put(self, key, metadata, body):
+        """
+        Store an entry, replacing any existing one, and evict old entries if over the size cap.
+        Args:
+            key (str): Cache key
+            metadata (dict): JSON serializable metadata
+            body (bytes): Entry body
+        """
+        metadata_path, body_path = self._entry_paths(key)
+        os.makedirs(os.path.dirname(metadata_path), exist_ok=True)
+        # The body goes first so a visible metadata file always has its body
+        atomic_write(body_path, body)
+        atomic_write(metadata_path, json.dumps(metadata).encode('utf-8'))
+        self._touch(metadata_path)
+        self._add_to_size(len(body))
+
+    def update_metadata(self, key, metadata):
+        """
+        Replace the metadata of an existing entry, keeping its body.
+        Args:
+            key (str): Cache key
+            metadata (dict): JSON serializable metadata
+        """
+        metadata_path, _ = self._entry_paths(key)
+        atomic_write(metadata_path, json.dumps(metadata).encode('utf-8'))
+        self._touch(metadata_path)
+
+    def delete(self, key):
+        """Remove an entry if it exists."""
+        for path in self._entry_paths(key):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every entry in the cache.
+        Only the shard directories and the entry and temporary files in them are removed,
+        and cache_dir itself only once it is empty, so pointing the cache at a directory
+        holding other files never deletes them.
+        """
+        for shard in self._scan_shards():
+            for entry in os.scandir(shard.path):
+                if is_cache_file(entry.name):
+                    try:
+                        os.remove(entry.path)
+                    except OSError:
+                        pass
+            remove_empty_dir(shard.path)
+        remove_empty_dir(self.cache_dir)
+        with self._lock:
+            self._size_estimate = 0
+
+    def total_size(self):
+        """Return the total size in bytes of all entry bodies."""
+        return sum(size for _, _, size in self._scan_entries())
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes."""
+        entries = sorted(self._scan_entries())
+        total = sum(size for _, _, size in entries)
+        evicted = 0
+        for _, key, size in entries:
+            if total <= self.max_bytes:
+                break
+            self.delete(key)
+            total -= size
+            evicted += 1
+        if evicted:
+            logger.debug("Evicted %d entries from %s, %d bytes left", evicted, self.cache_dir, total)
+        with self._lock:
+            self._size_estimate = total
+
+    def _add_to_size(self, size):
+        """Track the cache size and evict once it exceeds the cap.
+        The estimate is initialised from disk once and then updated in memory, so eviction
+        only rescans the cache directory when the cap has been reached.
+        """
+        with self._lock:
+            if self._size_estimate is None:
+                self._size_estimate = self.total_size()
+            else:
+                self._size_estimate += size
+            over_cap = self._size_estimate > self.max_bytes
+        if over_cap:
+            self.evict()
+
+    def _scan_entries(self):
+        """Yield (last access time, key, body size) for every complete entry."""
+        for shard in self._scan_shards():
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(METADATA_SUFFIX):
+                    continue
+                key = entry.name[:-len(METADATA_SUFFIX)]
+                try:
+                    accessed = entry.stat().st_mtime_ns
+                    size = os.path.getsize(os.path.join(shard.path, key + BODY_SUFFIX))
+                except OSError:
+                    continue
+                yield accessed, key, size
+
+    def _scan_shards(self):
+        """Yield the shard directories, named after the first two characters of their keys."""
+        if not os.path.isdir(self.cache_dir):
+            return
+        for shard in os.scandir(self.cache_dir):
+            if shard.is_dir(follow_symlinks=False) and is_shard_name(shard.name):
+                yield shard
+
+    def _entry_paths(self, key):
+        """Return the metadata and body paths of an entry."""
+        shard = os.path.join(self.cache_dir, key[:2])
+        return os.path.join(shard, key + METADATA_SUFFIX), os.path.join(shard, key + BODY_SUFFIX)
+
+    @staticmethod
+    def _touch(path):
+        """Record an access by setting the file's modification time to the precise current time.
+        The kernel timestamps new files with a coarse clock, which can give entries written
+        in quick succession the same time and blur the LRU order.
+        """
+        now = time.time_ns()
+        os.utime(path, ns=(now, now))
+
+def is_shard_name(name):
+    """Check whether a directory name is a shard, i.e. two lowercase hex characters."""
+    return len(name) == 2 and all(char in '0123456789abcdef' for char in name)
+
+def is_cache_file(name):
+    """Check whether a file in a shard is an entry body, metadata or temporary file."""
+    return name.endswith((METADATA_SUFFIX, BODY_SUFFIX)) or name.startswith(TEMP_PREFIX)
+
+def remove_empty_dir(path):
+    """Remove a directory if it exists and is empty."""
+    try:
+        os.rmdir(path)
+    except OSError:
+        pass
+
+def atomic_write(path, data):
+    """Write data to a temporary file next to path and move it into place.
+    Args:
+        path (str): Destination file
+        data (bytes): File content
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=TEMP_PREFIX)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from src.disk_cache import DiskCache
+from src.image_handler import count_failed_images
+import src.metrics as metrics
+
+DEFAULT_CACHE_DIR = '.htb_cache/extract'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+_default_cache = None
+
+class ExtractionCache:
+    """
+    Persistent cache of extraction results.
+    Re-scraped pages are usually byte-identical, so the structured result of a page is
+    stored under a key made of the SHA-256 of its HTML, the extractor version and every
+    option that changes the result. A hit returns the stored result without parsing the
+    page at all. Entries are written atomically (see disk_cache.py), so worker processes
+    of a batch run can share the cache, and the least recently used entries are evicted
+    above the size cap.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str): Directory to keep the cached results in
+            max_bytes (int): Size cap; least recently used results are evicted above it
+        """
+        self.store = DiskCache(cache_dir, max_bytes)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(html_content, extractor_version, options):
+        """
+        Build the cache key of a page.
+        Args:
+            html_content (str): HTML of the page
+            extractor_version (str): Version of the extractor producing the result
+            options (dict): Extraction options that affect the result
+        Returns:
+            str: Cache key
+        """
+        html_hash = hashlib.sha256(html_content.encode('utf-8')).hexdigest()
+        return DiskCache.make_key(html_hash, extractor_version, json.dumps(options, sort_keys=True))
+
+    def lookup(self, key, check_images=False):
+        """
+        Return the stored result for a key and count the hit or miss.
+        Args:
+            key (str): Key returned by make_key()
+            check_images (bool): Treat the entry as missing if any image it refers to
+                is no longer on disk or was never saved, so the page is extracted (and
+                downloaded) again
+        Returns:
+            dict: The structured result, or None
+        """
+        cached = self.store.get(key)
+        content = None
+        if cached is not None:
+            _, body = cached
+            try:
+                content = json.loads(body.decode('utf-8'))
+            except ValueError:
+                logger.debug("Ignoring unreadable extraction cache entry %s", key)
+                content = None
+        if content is not None and check_images and (count_failed_images(content) or not all(
+                os.path.isfile(path) for path in iter_local_paths(content))):
+            content = None
+        if content is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        metrics.inc(metrics.CACHE_REQUESTS_TOTAL, cache='extract', result='miss' if content is None else 'hit')
+        return content
+
+    def save(self, key, content, extractor_version):
+        """
+        Store the result of a page.
+        Args:
+            key (str): Key returned by make_key()
+            content (dict): Structured result
+            extractor_version (str): Version of the extractor that produced it
+        """
+        metadata = {'extractor_version': extractor_version, 'stored_at': time.time()}
+        self.store.put(key, metadata, json.dumps(content).encode('utf-8'))
+
+    def clear(self):
+        """Remove every cached result."""
+        self.store.clear()
+
+def iter_local_paths(value):
+    """
+    Yield every image local_path in a structured result, including nested list and table images.
+    Args:
+        value: Structured result or any part of it
+    Yields:
+        str: Local image paths
+    """
+    if isinstance(value, dict):
+        if value.get('local_path'):
+            yield value['local_path']
+        for child in value.values():
+            if isinstance(child, (dict, list)):
+                yield from iter_local_paths(child)
+    elif isinstance(value, list):
+        for child in value:
+            yield from iter_local_paths(child)
+
+def configure_extraction_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Enable the default cache used by extract_structured_content_from_html().
+    Args:
+        cache_dir (str): Directory to keep the cached results in
+        max_bytes (int): Size cap of the cache
+    Returns:
+        ExtractionCache: The configured default cache
+    """
+    global _default_cache
+    _default_cache = ExtractionCache(cache_dir, max_bytes)
+    return _default_cache
+
+def disable_extraction_cache():
+    """Disable the default cache so every page is extracted."""
+    global _default_cache
+    _default_cache = None
+
+def get_default_extraction_cache():
+    """Return the default cache, or None if caching is disabled."""
+    return _default_cache
@@ -1,10 +1,50 @@
-def fetch_html_from_url(url):
+import logging
+import requests
+from urllib.parse import urlparse
+from src.request_scheduler import get_scheduler
+from src.http_cache import get_default_cache
+import src.metrics as metrics
+
+logger = logging.getLogger(__name__)
+
+def fetch_html_from_url(url, cache=None):
     """
     Fetch HTML content from a URL
+    Args:
+        url (str): URL of the page
+        cache (HTTPCache, optional): Response cache to use, defaults to the cache
+            enabled with http_cache.configure_cache() (no caching if none is enabled)
     """
     validate_url(url)
     headers = get_browser_headers()
-    return make_http_request(url, headers)
+    cache = cache if cache is not None else get_default_cache()
+    with metrics.timed('fetch'):
+        if cache is None:
+            return make_http_request(url, headers)
+        return fetch_with_cache(url, headers, cache)
+
+def fetch_with_cache(url, headers, cache):
+    """
+    Fetch a page through the response cache.
+    Fresh entries are returned without a request; stale ones are revalidated with a
+    conditional request and reused when the server answers 304 Not Modified.
+    """
+    entry = cache.lookup(url)
+    if entry is not None:
+        if cache.is_fresh(entry):
+            logger.info("Using cached copy of %s", url)
+            metrics.inc(metrics.CACHE_REQUESTS_TOTAL, cache='http', result='hit')
+            return entry['body']
+        headers = dict(headers, **cache.conditional_headers(entry))
+    response = send_request(url, headers)
+    if response.status_code == 304 and entry is not None:
+        logger.info("Not modified, using cached copy of %s", url)
+        metrics.inc(metrics.CACHE_REQUESTS_TOTAL, cache='http', result='revalidated')
+        cache.refresh(url, entry, response)
+        return entry['body']
+    metrics.inc(metrics.CACHE_REQUESTS_TOTAL, cache='http', result='miss')
+    cache.save(url, response)
+    return response.text
 
 def validate_url(url):
     """
@@ -24,12 +64,20 @@ def get_browser_headers():
 
 def make_http_request(url, headers):
     """
-    Make the HTTP request and handle potential errors
+    Make the HTTP request and return the page content
+    """
+    return send_request(url, headers).text
+
+def send_request(url, headers):
+    """
+    Make the HTTP request through the shared scheduler, which rate limits it and retries
+    transient failures, and handle potential errors
     """
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_scheduler().get(url, headers=headers, timeout=30)
         response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        return response.text
+        metrics.inc(metrics.FETCHED_BYTES_TOTAL, len(response.content), kind='page')
+        return response
     except requests.exceptions.RequestException as e:
         raise RuntimeError(f"Error fetching content: {str(e)}")
 
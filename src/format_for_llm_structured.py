@@ -4,27 +4,42 @@ def format_for_llm_structured(extracted_content):
 
     This formatter handles the hierarchical structure created by LLMStructuredExtractor
     """
-    output_lines = []
-    output_lines.extend(format_title(extracted_content))
-    output_lines.extend(format_content_items(extracted_content["content"]))
+    return "\n".join(iter_llm_structured(extracted_content))
+
+def write_llm_structured(extracted_content, stream):
+    """
+    Write the LLM-friendly text straight to an open text stream, line by line.
+    Produces exactly the same text as format_for_llm_structured() without ever holding
+    the whole document in memory, so peak memory does not grow with the output size.
+    Args:
+        extracted_content (dict): Structured content from LLMStructuredExtractor
+        stream: Writable text stream, e.g. an open file or sys.stdout
+    """
+    separator = ""
+    for line in iter_llm_structured(extracted_content):
+        stream.write(separator)
+        stream.write(line)
+        separator = "\n"
+
+def iter_llm_structured(extracted_content):
+    """Yield the lines of the formatted document in order"""
+    yield from format_title(extracted_content)
+    yield from format_content_items(extracted_content["content"])
     if "questions" in extracted_content:
-        output_lines.extend(format_questions(extracted_content["questions"]))
-    return "\n".join(output_lines)
+        yield from format_questions(extracted_content["questions"])
 
 def format_title(content):
-    """Format the title section"""
+    """Yield the lines of the title section"""
     if 'title' in content:
-        return [f"# {content['title']}", ""]
-    return []
+        yield f"# {content['title']}"
+        yield ""
 
 def format_content_items(content_items):
-    """Format all content items"""
-    output_lines = []
+    """Yield the lines of all content items, one item at a time"""
     for item in content_items:
         formatter = get_formatter_for_type(item["type"])
         if formatter:
-            output_lines.extend(formatter(item))
-    return output_lines
+            yield from formatter(item)
 
 def get_formatter_for_type(item_type):
     """Return the appropriate formatter function for the given item type"""
@@ -151,9 +166,9 @@ def format_alert(item):
     return ["---", "Note:", item["text"], "---", ""]
 
 def format_questions(questions):
-    """Format the questions section"""
-    result = ["## Questions", ""]
+    """Yield the lines of the questions section"""
+    yield "## Questions"
+    yield ""
     for i, question in enumerate(questions):
-        result.append(f"Question {i+1}: {question}")
-        result.append("")
-    return result
+        yield f"Question {i+1}: {question}"
+        yield ""
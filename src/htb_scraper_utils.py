@@ -1,7 +1,29 @@
+import io
+import os
+import sys
 import json
+import logging
+import time
 import argparse
-from src.format_for_llm_structured import format_for_llm_structured as format_for_llm
+import contextlib
+from src.format_for_llm_structured import format_for_llm_structured as format_for_llm, write_llm_structured
 from src.fetch_html_from_url import fetch_html_from_url
+from src.http_transport import DEFAULT_POOL_SIZE
+from src.html_parsing import PARSER_BACKENDS
+from src.json_output import JSONL_GRANULARITIES, write_json, write_jsonl
+from src.profiling import DEFAULT_PROFILE_PREFIX, profile_run
+from src.log_config import configure_logging, verbosity_level
+from src.http_cache import HTTPCache, configure_cache, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+import src.extraction_cache as extraction_cache
+import src.metrics as metrics
+import src.module_crawler as module_crawler
+import src.request_scheduler as request_scheduler
+import src.run_journal as run_journal
+from src.sqlite_output import SQLiteOutput
+
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+logger = logging.getLogger(__name__)
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -10,17 +32,185 @@ def parse_arguments():
     input_group = parser.add_mutually_exclusive_group(required=True)
     input_group.add_argument('--file', '-f', help='Path to a local HTML file')
     input_group.add_argument('--url', '-u', help='URL of the webpage to scrape')
+    input_group.add_argument('--manifest', help='Batch mode: file listing one HTML file or URL per line')
+    input_group.add_argument('--glob', help='Batch mode: glob pattern matching local HTML files')
+    input_group.add_argument('--stdin', action='store_true',
+                             help='Batch mode: read HTML file paths or URLs from stdin, one per line')
+    input_group.add_argument('--crawl', metavar='URL',
+                             help='Crawl mode: extract every page of the module this URL belongs to; pages are '
+                                  'always fully parsed and not served from the extraction cache')
     # Output options
     parser.add_argument('--output', '-o', help='Output file (default: output.txt)')
-    parser.add_argument('--format', '-m', choices=['text', 'json'], default='json',
-                        help='Output format (default: text)')
+    parser.add_argument('--format', '-m', choices=['text', 'json', 'jsonl'], default='json',
+                        help='Output format; jsonl writes one JSON record per line (default: text)')
+    parser.add_argument('--jsonl-granularity', choices=JSONL_GRANULARITIES, default='item',
+                        help='jsonl format: one record per content item or per page (default: item)')
+    parser.add_argument('--sqlite', metavar='FILE',
+                        help='Also write every extracted page into a SQLite database with a full-text index '
+                             '(single, batch and crawl mode)')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default='auto',
+                        help='HTML parser backend; auto uses lxml when installed (default: auto)')
+    parser.add_argument('--targeted-parse', action='store_true',
+                        help='Only build the parse tree for the content container, questions and title '
+                             '(falls back to a full parse when they are not found; ignored in crawl mode)')
+    parser.add_argument('--max-depth', type=parse_max_depth, default=5,
+                        help="Deepest level of nested containers to extract, or 'none' for any depth (default: 5)")
     # Image options
     parser.add_argument('--download-images', '-d', action='store_true', default=True,
                         help='Download images (default: True)')
     parser.add_argument('--image-dir', '-i', default='images',
                         help='Directory to save downloaded images (default: images)')
+    parser.add_argument('--image-workers', type=int, default=8,
+                        help='Number of concurrent image downloads per page (default: 8)')
+    # Network options
+    parser.add_argument('--pool-size', type=int, default=DEFAULT_POOL_SIZE,
+                        help=f'Keep-alive connections kept open per host (default: {DEFAULT_POOL_SIZE})')
+    parser.add_argument('--rate-limit', type=float, metavar='RPS',
+                        help='Maximum requests per second to each host, pages and images together (default: no limit)')
+    parser.add_argument('--burst', type=int, default=1,
+                        help='Requests to a host that may start at once before --rate-limit applies (default: 1)')
+    parser.add_argument('--max-retries', type=int, default=request_scheduler.DEFAULT_MAX_RETRIES,
+                        help='Retries of a request after a connection error, timeout, 429 or 5xx '
+                             f'(default: {request_scheduler.DEFAULT_MAX_RETRIES})')
+    parser.add_argument('--retry-backoff', type=float, default=request_scheduler.DEFAULT_BACKOFF,
+                        help='Base delay in seconds of the exponential retry backoff; Retry-After is honored '
+                             f'(default: {request_scheduler.DEFAULT_BACKOFF})')
+    # Cache options
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Directory of the HTTP response cache (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Maximum size of the HTTP response cache in MB (default: 512)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Bypass the HTTP response cache and always fetch pages in full')
+    parser.add_argument('--clear-cache', action='store_true',
+                        help='Remove all cached HTTP responses and extraction results before running')
+    parser.add_argument('--extract-cache-dir', default=extraction_cache.DEFAULT_CACHE_DIR,
+                        help=f'Directory of the extraction result cache (default: {extraction_cache.DEFAULT_CACHE_DIR})')
+    parser.add_argument('--extract-cache-size', type=int,
+                        default=extraction_cache.DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help='Maximum size of the extraction result cache in MB (default: 256)')
+    parser.add_argument('--no-extract-cache', action='store_true',
+                        help='Always extract pages instead of reusing cached results')
+    # Diagnostics options
+    parser.add_argument('--profile', nargs='?', const=DEFAULT_PROFILE_PREFIX, metavar='PREFIX',
+                        help='Profile the extract and format stages; writes PREFIX.prof and PREFIX.collapsed '
+                             f'and prints the hottest functions to stderr (default prefix: {DEFAULT_PROFILE_PREFIX})')
+    parser.add_argument('--metrics', metavar='FILE',
+                        help='Write run metrics (page, element, image, byte and cache counters and stage '
+                             'latency histograms) to FILE at the end of the run, e.g. a node exporter textfile')
+    parser.add_argument('--metrics-format', choices=metrics.METRICS_FORMATS, default='prometheus',
+                        help='Format of the --metrics file (default: prometheus)')
+    # Logging options (log lines always go to stderr)
+    verbosity_group = parser.add_mutually_exclusive_group()
+    verbosity_group.add_argument('--quiet', '-q', action='store_true',
+                                 help='Only log warnings and errors')
+    verbosity_group.add_argument('--verbose', '-v', action='store_true',
+                                 help='Also log every image and request handled')
+    # Batch options
+    parser.add_argument('--output-dir', default='output',
+                        help='Batch mode: directory for the per-page output files (default: output)')
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count() or 1,
+                        help='Batch mode: number of worker processes (default: CPU count)')
+    parser.add_argument('--journal', metavar='FILE',
+                        help='Batch and crawl mode: record the state of every input in a SQLite journal; '
+                             'rerunning with the same journal skips finished inputs and retries the rest')
+    # Crawl options (pages are written to --output-dir)
+    parser.add_argument('--crawl-depth', type=int, default=module_crawler.DEFAULT_CRAWL_DEPTH,
+                        help='Crawl mode: number of links to follow from the entry page '
+                             f'(default: {module_crawler.DEFAULT_CRAWL_DEPTH})')
+    parser.add_argument('--crawl-concurrency', type=int, default=module_crawler.DEFAULT_CONCURRENCY,
+                        help='Crawl mode: pages fetched and extracted at once '
+                             f'(default: {module_crawler.DEFAULT_CONCURRENCY})')
+    parser.add_argument('--crawl-delay', type=float, default=module_crawler.DEFAULT_DELAY,
+                        help='Crawl mode: minimum seconds between two requests to the same host '
+                             f'(default: {module_crawler.DEFAULT_DELAY})')
     return parser.parse_args()
 
+def parse_max_depth(value):
+    """Parse the --max-depth argument: a non-negative integer, or 'none' for no limit"""
+    if value.lower() == 'none':
+        return None
+    try:
+        depth = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a non-negative integer or 'none', got '{value}'")
+    if depth < 0:
+        raise argparse.ArgumentTypeError(f"expected a non-negative integer or 'none', got '{value}'")
+    return depth
+
+def profile_if_requested(args):
+    """Return a context that profiles its block when --profile was given, and does nothing otherwise"""
+    if not args.profile:
+        return contextlib.nullcontext()
+    if is_batch_mode(args) and args.workers > 1:
+        logger.warning("--profile only covers the parent process; use --workers 1 to profile the extraction")
+    return profile_run(args.profile)
+
+def setup_logging(args):
+    """Configure logging to stderr at the level selected by --quiet and --verbose"""
+    configure_logging(verbosity_level(args.quiet, args.verbose))
+
+def setup_metrics(args):
+    """Enable metrics collection when --metrics was given"""
+    if args.metrics:
+        metrics.configure_metrics()
+
+def write_metrics(args, elapsed):
+    """Write the collected metrics to the --metrics file, with the run's duration and end time"""
+    registry = metrics.get_default_metrics()
+    if not args.metrics or registry is None:
+        return
+    registry.set(metrics.RUN_SECONDS, elapsed)
+    registry.set(metrics.LAST_RUN_TIMESTAMP, time.time())
+    try:
+        registry.write(args.metrics, args.metrics_format)
+        logger.info("Metrics written to %s", args.metrics)
+    except OSError as e:
+        logger.error("Error writing metrics: %s", e)
+
+def setup_request_scheduler(args):
+    """Configure the rate limit and retries of every outbound request according to the arguments"""
+    request_scheduler.configure_scheduler(rate=args.rate_limit, burst=args.burst, max_retries=args.max_retries,
+                                          backoff=args.retry_backoff)
+
+def setup_journal(args):
+    """Enable the run journal when --journal was given"""
+    if args.journal:
+        journal = run_journal.configure_journal(args.journal)
+        logger.info("Using journal %s", args.journal)
+        counts = journal.counts()
+        if counts:
+            logger.info("Journal has %s", ", ".join(f"{count} {state}" for state, count in sorted(counts.items())))
+
+def open_sqlite_output(args):
+    """Open the --sqlite database, or return None when it was not given"""
+    if not args.sqlite:
+        return None
+    logger.info("Writing pages to %s", args.sqlite)
+    return SQLiteOutput(args.sqlite)
+
+def is_batch_mode(args):
+    """Check whether the arguments select batch mode instead of a single file or URL"""
+    return bool(args.manifest or args.glob or args.stdin)
+
+def setup_http_cache(args):
+    """Clear and/or enable the HTTP response cache according to the arguments"""
+    cache_bytes = args.cache_size * 1024 * 1024
+    if args.clear_cache:
+        HTTPCache(args.cache_dir, cache_bytes).clear()
+        logger.info("Cleared HTTP cache: %s", args.cache_dir)
+    if not args.no_cache:
+        configure_cache(args.cache_dir, cache_bytes)
+
+def setup_extraction_cache(args):
+    """Clear and/or enable the extraction result cache according to the arguments"""
+    cache_bytes = args.extract_cache_size * 1024 * 1024
+    if args.clear_cache:
+        extraction_cache.ExtractionCache(args.extract_cache_dir, cache_bytes).clear()
+        logger.info("Cleared extraction cache: %s", args.extract_cache_dir)
+    if not args.no_extract_cache:
+        extraction_cache.configure_extraction_cache(args.extract_cache_dir, cache_bytes)
+
 def get_html_content(args):
     """Get HTML content from either a file or URL"""
     if args.file:
@@ -33,43 +223,78 @@ def get_content_from_file(file_path):
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
-        print(f"Read content from file: {file_path}")
+        logger.info("Read content from file: %s", file_path)
         return content, file_path  # Use file path as base URL for resolving relative paths
     except Exception as e:
-        print(f"Error reading file: {str(e)}")
+        logger.error("Error reading file: %s", e)
         return None, None
 
 def get_content_from_url(url):
     """Fetch HTML content from a URL"""
     try:
-        print(f"Fetching content from URL: {url}")
+        logger.info("Fetching content from URL: %s", url)
         content = fetch_html_from_url(url)
-        print(f"Successfully fetched content ({len(content)} bytes)")
+        logger.info("Successfully fetched content (%d bytes)", len(content))
         return content, url
     except Exception as e:
-        print(f"Error: {str(e)}")
+        logger.error("Error fetching %s: %s", url, e)
         return None, None
 
 def output_formatted_content(content, args):
-    """Format and output the content based on user preferences"""
-    formatted_content = format_content(content, args.format)
+    """Format and output the content based on user preferences.
+    The formatted text is streamed to the output file or stdout instead of being built
+    as one string first.
+    """
+    source = args.url or args.file
     if args.output:
-        write_to_file(formatted_content, args.output)
+        save_formatted_content(content, args.format, args.output, args.jsonl_granularity, source)
     else:
-        print(formatted_content)
+        write_formatted_content(content, args.format, sys.stdout, args.jsonl_granularity, source)
+        if args.format != 'jsonl':
+            sys.stdout.write("\n")
+        sys.stdout.flush()
 
-def format_content(content, format_type):
-    """Format content as either JSON or LLM-friendly text"""
+def format_content(content, format_type, granularity='item', source=None):
+    """Format content as either JSON, JSON Lines or LLM-friendly text"""
     if format_type == 'json':
         return json.dumps(content, indent=2)
+    elif format_type == 'jsonl':
+        stream = io.StringIO()
+        write_jsonl(content, stream, granularity, source)
+        return stream.getvalue()
     else:
         return format_for_llm(content)
 
+def write_formatted_content(content, format_type, stream, granularity='item', source=None):
+    """Write content to an open text stream as either JSON, JSON Lines or LLM-friendly text.
+    Produces the same text as format_content().
+    """
+    with metrics.timed('format'):
+        if format_type == 'json':
+            write_json(content, stream)
+        elif format_type == 'jsonl':
+            write_jsonl(content, stream, granularity, source)
+        else:
+            write_llm_structured(content, stream)
+
+def open_output_file(file_path):
+    """Open an output file for writing with a large write buffer"""
+    return open(file_path, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE)
+
+def save_formatted_content(content, format_type, file_path, granularity='item', source=None):
+    """Stream formatted content into a file"""
+    try:
+        with open_output_file(file_path) as f:
+            write_formatted_content(content, format_type, f, granularity, source)
+        logger.info("Content saved to %s", file_path)
+    except Exception as e:
+        logger.error("Error writing to file: %s", e)
+
 def write_to_file(content, file_path):
     """Write content to a file"""
     try:
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
-        print(f"Content saved to {file_path}")
+        logger.info("Content saved to %s", file_path)
     except Exception as e:
-        print(f"Error writing to file: {str(e)}")
+        logger.error("Error writing to file: %s", e)
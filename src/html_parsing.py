@@ -0,0 +1,139 @@
+import re
+import logging
+import bs4
+from bs4 import BeautifulSoup, SoupStrainer
+from bs4.builder import builder_registry
+
+PARSER_BACKENDS = ['auto', 'lxml', 'html.parser', 'html5lib']
+PARSE_MODES = ['full', 'targeted']
+FALLBACK_PARSER = 'html.parser'
+# allow_tag_creation()/allow_string_creation() are only called by the ElementFilter API of bs4 4.13+
+TARGETED_PARSE_MIN_BS4 = (4, 13)
+
+logger = logging.getLogger(__name__)
+
+def is_parser_available(parser):
+    """
+    Check whether a BeautifulSoup tree builder is installed.
+    Args:
+        parser (str): Tree builder name, e.g. 'lxml' or 'html5lib'
+    Returns:
+        bool: True if BeautifulSoup can use the parser
+    """
+    return builder_registry.lookup(parser) is not None
+
+def resolve_parser_backend(parser='auto'):
+    """
+    Pick the parser backend to build the soup with.
+    'auto' uses lxml when it is installed, since it parses large pages much faster than
+    the pure-Python 'html.parser'. A requested backend that is not installed falls back
+    to 'html.parser', which ships with Python.
+    Args:
+        parser (str): 'auto', 'lxml', 'html.parser' or 'html5lib'
+    Returns:
+        str: The parser name to pass to BeautifulSoup
+    """
+    if parser == 'auto':
+        return 'lxml' if is_parser_available('lxml') else FALLBACK_PARSER
+    if is_parser_available(parser):
+        return parser
+    logger.warning("Parser backend '%s' is not installed, falling back to '%s'", parser, FALLBACK_PARSER)
+    return FALLBACK_PARSER
+
+def parse_html(html_content, parser='auto'):
+    """
+    Parse HTML with the resolved parser backend.
+    Args:
+        html_content (str): HTML content to parse
+        parser (str): 'auto', 'lxml', 'html.parser' or 'html5lib'
+    Returns:
+        BeautifulSoup: The parsed document
+    """
+    return BeautifulSoup(html_content, resolve_parser_backend(parser))
+
+class TargetedParseFilter(SoupStrainer):
+    """
+    Parse filter that only builds the subtrees of the target elements.
+    Top-level tags are checked against the targets as the parser reaches them; a matching
+    element is built together with its whole subtree and everything else (navigation,
+    scripts, inline SVGs, footers) is dropped without creating any objects.
+    """
+
+    def __init__(self, targets):
+        """
+        Args:
+            targets (list): (tag name, class or None, id or None) tuples of the elements to keep
+        """
+        super().__init__()
+        self.targets = targets
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        """Keep a tag if it matches one of the targets."""
+        attrs = attrs or {}
+        classes = attrs.get('class') or []
+        if isinstance(classes, str):
+            classes = classes.split()
+        for target_name, target_class, target_id in self.targets:
+            if name != target_name:
+                continue
+            if target_class is not None and target_class not in classes:
+                continue
+            if target_id is not None and attrs.get('id') != target_id:
+                continue
+            return True
+        return False
+
+    def allow_string_creation(self, string):
+        """Drop text that is not inside a target element."""
+        return False
+
+def bs4_version():
+    """Return the installed beautifulsoup4 version as a tuple of ints, e.g. (4, 12, 3)."""
+    parts = []
+    for part in bs4.__version__.split('.'):
+        digits = re.match(r'\d+', part)
+        if digits is None:
+            break
+        parts.append(int(digits.group()))
+        if digits.end() < len(part):
+            break
+    return tuple(parts)
+
+_warned_old_bs4 = False
+
+def supports_targeted_parse():
+    """Check whether the installed beautifulsoup4 can filter a parse with TargetedParseFilter.
+    Older versions never call the filter's hooks and would silently build the full tree,
+    so a warning is logged the first time this returns False.
+    """
+    global _warned_old_bs4
+    if bs4_version() >= TARGETED_PARSE_MIN_BS4:
+        return True
+    if not _warned_old_bs4:
+        _warned_old_bs4 = True
+        logger.warning("Targeted parsing needs beautifulsoup4 >= %s, found %s; parsing pages in full",
+                       '.'.join(map(str, TARGETED_PARSE_MIN_BS4)), bs4.__version__)
+    return False
+
+def parse_html_targeted(html_content, targets, required_targets, parser='auto'):
+    """
+    Parse only the target elements of a document.
+    Args:
+        html_content (str): HTML content to parse
+        targets (list): (tag name, class or None, id or None) tuples of the elements to keep
+        required_targets (list): Targets of which at least one must be found for the partial
+            tree to be usable, e.g. the content containers
+        parser (str): 'auto', 'lxml', 'html.parser' or 'html5lib'
+    Returns:
+        BeautifulSoup: The partial document, or None if no required target was found, the
+            backend does not support parse filtering (html5lib) or beautifulsoup4 is older
+            than 4.13, so the caller should do a full parse
+    """
+    backend = resolve_parser_backend(parser)
+    if backend == 'html5lib' or not supports_targeted_parse():
+        return None
+    soup = BeautifulSoup(html_content, backend, parse_only=TargetedParseFilter(targets))
+    for name, class_name, element_id in required_targets:
+        if soup.find(name, class_=class_name, id=element_id):
+            return soup
+    return None
@@ -0,0 +1,167 @@
+import re
+import time
+from src.disk_cache import DiskCache
+
+DEFAULT_CACHE_DIR = '.htb_cache/http'
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+_default_cache = None
+
+class HTTPCache:
+    """
+    Persistent HTTP response cache for fetched pages.
+    Stores each response body together with its ETag / Last-Modified validators and its
+    Cache-Control freshness lifetime. Fresh entries are served without a request; stale
+    entries are revalidated with If-None-Match / If-Modified-Since so an unchanged page
+    costs a 304 response instead of a full download.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Args:
+            cache_dir (str): Directory to keep the cached responses in
+            max_bytes (int): Size cap; least recently used responses are evicted above it
+        """
+        self.store = DiskCache(cache_dir, max_bytes)
+
+    def lookup(self, url):
+        """
+        Return the cached entry for a URL.
+        Args:
+            url (str): Requested URL
+        Returns:
+            dict: Entry metadata with the decoded page under 'body', or None if not cached
+        """
+        cached = self.store.get(self.store.make_key(url))
+        if cached is None:
+            return None
+        entry, body = cached
+        entry['body'] = body.decode('utf-8')
+        return entry
+
+    @staticmethod
+    def is_fresh(entry, now=None):
+        """
+        Check whether an entry can be used without contacting the server.
+        Args:
+            entry (dict): Entry returned by lookup()
+            now (float, optional): Current time, defaults to time.time()
+        Returns:
+            bool: True if the entry is still within its max-age
+        """
+        if entry.get('max_age') is None:
+            return False
+        now = time.time() if now is None else now
+        return now - entry['stored_at'] < entry['max_age']
+
+    @staticmethod
+    def conditional_headers(entry):
+        """
+        Build the revalidation headers for a stale entry.
+        Args:
+            entry (dict): Entry returned by lookup()
+        Returns:
+            dict: If-None-Match and/or If-Modified-Since headers
+        """
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def save(self, url, response):
+        """
+        Store a 200 response unless its Cache-Control forbids it.
+        Args:
+            url (str): Requested URL
+            response (requests.Response): Response to store
+        """
+        directives = parse_cache_control(response.headers.get('Cache-Control', ''))
+        if 'no-store' in directives:
+            return
+        entry = build_entry(url, response.headers, directives)
+        self.store.put(self.store.make_key(url), entry, response.text.encode('utf-8'))
+
+    def refresh(self, url, entry, response):
+        """
+        Update a revalidated entry after a 304 Not Modified response.
+        Args:
+            url (str): Requested URL
+            entry (dict): Entry returned by lookup()
+            response (requests.Response): The 304 response
+        """
+        directives = parse_cache_control(response.headers.get('Cache-Control', ''))
+        refreshed = build_entry(url, response.headers, directives)
+        # A 304 may omit validators; keep the ones we already have
+        refreshed['etag'] = refreshed['etag'] or entry.get('etag')
+        refreshed['last_modified'] = refreshed['last_modified'] or entry.get('last_modified')
+        self.store.update_metadata(self.store.make_key(url), refreshed)
+
+    def clear(self):
+        """Remove every cached response."""
+        self.store.clear()
+
+def build_entry(url, headers, directives):
+    """
+    Build the metadata stored for a response.
+    Args:
+        url (str): Requested URL
+        headers: Response headers
+        directives (dict): Parsed Cache-Control directives
+    Returns:
+        dict: Entry metadata
+    """
+    max_age = None
+    if 'no-cache' not in directives and directives.get('max-age') is not None:
+        max_age = directives['max-age']
+    return {
+        'url': url,
+        'etag': headers.get('ETag'),
+        'last_modified': headers.get('Last-Modified'),
+        'max_age': max_age,
+        'stored_at': time.time()
+    }
+
+def parse_cache_control(header):
+    """
+    Parse a Cache-Control header.
+    Args:
+        header (str): Cache-Control header value
+    Returns:
+        dict: Directive names mapped to their value; max-age is an int (or None if invalid)
+    """
+    directives = {}
+    for part in header.split(','):
+        name, _, value = part.strip().partition('=')
+        name = name.strip().lower()
+        if not name:
+            continue
+        value = value.strip().strip('"')
+        if name == 'max-age':
+            directives[name] = int(value) if re.fullmatch(r'\d+', value) else None
+        else:
+            directives[name] = value or True
+    return directives
+
+def configure_cache(cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+    """
+    Enable the default cache used by fetch_html_from_url().
+    Args:
+        cache_dir (str): Directory to keep the cached responses in
+        max_bytes (int): Size cap of the cache
+    Returns:
+        HTTPCache: The configured default cache
+    """
+    global _default_cache
+    _default_cache = HTTPCache(cache_dir, max_bytes)
+    return _default_cache
+
+def disable_cache():
+    """Disable the default cache so every fetch goes to the network."""
+    global _default_cache
+    _default_cache = None
+
+def get_default_cache():
+    """Return the default cache, or None if caching is disabled."""
+    return _default_cache
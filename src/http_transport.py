@@ -0,0 +1,64 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_POOL_HOSTS = 10
+
+_session = None
+_pool_size = DEFAULT_POOL_SIZE
+_session_lock = threading.Lock()
+
+def configure_transport(pool_size=DEFAULT_POOL_SIZE):
+    """
+    Configure the shared HTTP transport.
+    Closes the current session, if any, so the next request uses the new settings.
+    Args:
+        pool_size (int): Maximum number of keep-alive connections kept open per host
+    """
+    global _pool_size
+    with _session_lock:
+        _pool_size = pool_size
+        _close_session()
+
+def get_session():
+    """
+    Return the shared requests.Session, creating it on first use.
+    The session is shared by page fetches and image downloads, so requests to the same
+    host reuse pooled keep-alive connections instead of opening a new TCP/TLS connection
+    each time. Each process creates its own session.
+    Returns:
+        requests.Session: The shared session
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session(_pool_size)
+    return _session
+
+def create_session(pool_size):
+    """
+    Create a session with a connection pool of the given size mounted for http and https.
+    Args:
+        pool_size (int): Maximum number of keep-alive connections kept open per host
+    Returns:
+        requests.Session: A new session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=DEFAULT_POOL_HOSTS, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+def close_transport():
+    """Close the shared session and all of its pooled connections."""
+    with _session_lock:
+        _close_session()
+
+def _close_session():
+    """Close the current session; the caller must hold _session_lock."""
+    global _session
+    if _session is not None:
+        _session.close()
+        _session = None
@@ -1,13 +1,36 @@
 import os
-import requests
+import logging
 import urllib.parse
 from urllib.parse import urlparse
-import re
-import shutil
+from concurrent.futures import ThreadPoolExecutor
+from src.request_scheduler import get_scheduler
+from src.image_store import get_image_store
+import src.metrics as metrics
+
+logger = logging.getLogger(__name__)
 
 def download_image(image_url, base_url=None, output_dir='images'):
+    """
+    Download or copy an image, recording its result and latency when metrics are enabled.
+    Args:
+        image_url (str): URL of the image to download
+        base_url (str, optional): Base URL to resolve relative URLs
+        output_dir (str): Directory to save images to
+    Returns:
+        str: Path to the saved image file, or None if download failed
+    """
+    with metrics.timed('image'):
+        local_path = fetch_image(image_url, base_url, output_dir)
+    if local_path is None:
+        metrics.inc(metrics.IMAGES_TOTAL, result='failed')
+    return local_path
+
+def fetch_image(image_url, base_url=None, output_dir='images'):
     """
     Download an image from a URL and save it to the specified directory.
+    Images are kept in a content-addressed store in output_dir, named after the hash of
+    their content; an image whose URL or local path has been stored before is reused
+    without a new download or copy.
     Args:
         image_url (str): URL of the image to download
         base_url (str, optional): Base URL to resolve relative URLs
@@ -22,22 +45,27 @@ def download_image(image_url, base_url=None, output_dir='images'):
         # Try to handle as a local file first
         local_path = handle_local_file(image_url, base_url, output_dir)
         if local_path:
+            metrics.inc(metrics.IMAGES_TOTAL, result='copied')
             return local_path
 
-        # Handle as a remote URL
+        # Handle as a remote URL, reusing a previously stored copy if there is one
         resolved_url = resolve_url(image_url, base_url)
-        filename = generate_filename(resolved_url)
-        save_path = os.path.join(output_dir, filename)
+        store = get_image_store(output_dir)
+        stored_path = store.lookup(resolved_url)
+        if stored_path:
+            logger.debug("Using stored image for %s: %s", resolved_url, stored_path)
+            metrics.inc(metrics.IMAGES_TOTAL, result='reused')
+            return stored_path
 
-        return download_from_url(resolved_url, save_path, filename)
+        return download_from_url(resolved_url, store)
 
     except Exception as e:
-        print(f"Error handling image {image_url}: {str(e)}")
+        logger.warning("Error handling image %s: %s", image_url, e)
         return None
 
 def handle_local_file(image_url, base_url, output_dir):
     """
-    Handle local file paths and copy the file to the output directory.
+    Handle local file paths and add the file to the image store in the output directory.
     Args:
         image_url (str): URL or path of the image
         base_url (str, optional): Base URL or path of the HTML file
@@ -49,23 +77,19 @@ def handle_local_file(image_url, base_url, output_dir):
     if not (image_url.startswith('./') or image_url.startswith('../') or '/' in image_url or '\\' in image_url):
         return None
 
-    # Get the filename from the path
-    filename = os.path.basename(image_url)
-    save_path = os.path.join(output_dir, filename)
-
     # Try several possible locations
     possible_paths = generate_possible_paths(image_url, base_url)
 
     # Try each possible path
     for path in possible_paths:
-        print(f"Trying path: {path}")
+        logger.debug("Trying path: %s", path)
         if os.path.exists(path) and os.path.isfile(path):
-            shutil.copy2(path, save_path)
-            print(f"Copied local image: {filename} from {path}")
+            save_path = get_image_store(output_dir).add_file(path)
+            logger.debug("Stored local image: %s as %s", path, save_path)
             return save_path
 
     # If we get here, we couldn't find the file
-    print(f"Local image not found in any of the tried paths: {image_url}")
+    logger.debug("Local image not found in any of the tried paths: %s", image_url)
     return None
 
 def generate_possible_paths(image_url, base_url):
@@ -104,53 +128,31 @@ def resolve_url(image_url, base_url):
         return urllib.parse.urljoin(base_url, image_url)
     return image_url
 
-def generate_filename(url):
-    """
-    Generate a filename from a URL.
-    Args:
-        url (str): URL of the image
-    Returns:
-        str: Generated filename
-    """
-    # Get the filename from the URL
-    filename = os.path.basename(urlparse(url).path)
-
-    # Clean the filename (remove query parameters, etc.)
-    filename = re.sub(r'\?.*$', '', filename)
-
-    # If filename is empty or invalid, generate a random one
-    if not filename or len(filename) < 3:
-        import uuid
-        extension = guess_extension(url)
-        filename = f"image_{uuid.uuid4().hex[:8]}{extension}"
-
-    return filename
-
-def download_from_url(url, save_path, filename):
+def download_from_url(url, store):
     """
-    Download an image from a URL and save it to the specified path.
+    Download an image from a URL and add it to the image store.
     Args:
         url (str): URL of the image
-        save_path (str): Path to save the image to
-        filename (str): Filename for logging purposes
+        store (ImageStore): Content-addressed store to save the image in
     Returns:
         str: Path to the saved image file, or None if download failed
     """
     try:
-        # Download the image
-        response = requests.get(url, stream=True, timeout=10)
-        response.raise_for_status()
+        # Download the image through the shared scheduler (rate limit and retries);
+        # closing the response returns its connection to the pool
+        with get_scheduler().get(url, stream=True, timeout=10) as response:
+            response.raise_for_status()
 
-        # Save the image to disk
-        with open(save_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
+            # Hash and save the image while it streams in
+            save_path = store.add_chunks(url, response.iter_content(chunk_size=8192), guess_extension(url))
 
-        print(f"Downloaded image: {filename}")
+        logger.debug("Downloaded image: %s as %s", url, save_path)
+        metrics.inc(metrics.IMAGES_TOTAL, result='downloaded')
+        metrics.inc(metrics.FETCHED_BYTES_TOTAL, os.path.getsize(save_path), kind='image')
         return save_path
 
     except Exception as e:
-        print(f"Error downloading image {url}: {str(e)}")
+        logger.warning("Error downloading image %s: %s", url, e)
         return None
 
 def guess_extension(url):
@@ -166,7 +168,7 @@ def guess_extension(url):
     # Default to .jpg if we can't determine the extension
     return '.jpg'
 
-def process_image_element(element, base_url=None, download=True, output_dir='images'):
+def process_image_element(element, base_url=None, download=True, output_dir='images', download_stage=None):
     """
     Process an image element from HTML.
     Args:
@@ -174,26 +176,116 @@ def process_image_element(element, base_url=None, download=True, output_dir='ima
         base_url (str, optional): Base URL to resolve relative URLs
         download (bool): Whether to download the image
         output_dir (str): Directory to save images to
+        download_stage (ImageDownloadStage, optional): Stage to queue the download on instead of
+            downloading synchronously. The returned local_path is filled in by download_stage.wait()
     Returns:
         dict: Processed image data
     """
     src = element.get('src', '')
     alt = element.get('alt', '')
 
-    print(f"Processing image: src='{src}', alt='{alt}'")
+    logger.debug("Processing image: src='%s', alt='%s'", src, alt)
 
-    local_path = None
-    if download and src:
-        print(f"Attempting to download/copy image: {src}")
-        local_path = download_image(src, base_url, output_dir)
-        if local_path:
-            print(f"Successfully saved image to: {local_path}")
-        else:
-            print(f"Failed to save image: {src}")
-
-    return {
+    image_item = {
         "type": "image",
         "src": src,
         "alt": alt if alt else "Image",
-        "local_path": local_path
+        "local_path": None
     }
+    if download and src:
+        if download_stage is not None:
+            logger.debug("Queued image download/copy: %s", src)
+            download_stage.submit(image_item)
+            return image_item
+        logger.debug("Attempting to download/copy image: %s", src)
+        image_item["local_path"] = download_image(src, base_url, output_dir)
+        report_image_result(src, image_item["local_path"])
+
+    return image_item
+
+def report_image_result(src, local_path):
+    """Log the outcome of an image download or copy"""
+    if local_path:
+        logger.debug("Successfully saved image to: %s", local_path)
+    else:
+        logger.warning("Failed to save image: %s", src)
+
+def count_failed_images(value):
+    """
+    Count the images of a structured result that have a src but were not saved.
+    Images inside list items and table cells are counted too.
+    Args:
+        value: Structured result or any part of it
+    Returns:
+        int: Number of image items with a src and no local_path
+    """
+    if isinstance(value, dict):
+        failed = int(value.get("type") == "image" and bool(value.get("src")) and not value.get("local_path"))
+        return failed + sum(count_failed_images(child) for child in value.values()
+                            if isinstance(child, (dict, list)))
+    if isinstance(value, list):
+        return sum(count_failed_images(child) for child in value)
+    return 0
+
+class ImageDownloadStage:
+    """
+    Downloads and copies images on a bounded thread pool.
+    Image items are queued while the DOM walk continues; wait() blocks until every queued
+    download has finished and fills in each item's local_path. Items are updated in place,
+    so the order of the extracted content never depends on which download finishes first.
+    """
+
+    def __init__(self, base_url=None, output_dir='images', max_workers=4):
+        """
+        Args:
+            base_url (str, optional): Base URL to resolve relative URLs
+            output_dir (str): Directory to save images to
+            max_workers (int): Maximum number of concurrent downloads
+        """
+        self.base_url = base_url
+        self.output_dir = output_dir
+        self.max_workers = max_workers
+        self._executor = None
+        self._pending = []
+        self._futures = {}
+
+    def submit(self, image_item):
+        """
+        Queue the download or copy of an image item.
+        Args:
+            image_item (dict): Image item whose local_path is filled in by wait()
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                thread_name_prefix='image-download')
+        future = self._executor.submit(download_image, image_item["src"], self.base_url, self.output_dir)
+        self._futures[id(image_item)] = future
+        self._pending.append((image_item, future, True))
+
+    def share(self, image_item, source_item):
+        """
+        Give an image item the local_path of an already queued item instead of downloading it again.
+        Args:
+            image_item (dict): Image item to fill in
+            source_item (dict): Image item previously passed to submit()
+        """
+        future = self._futures.get(id(source_item))
+        if future is None:
+            image_item["local_path"] = source_item["local_path"]
+            return
+        self._pending.append((image_item, future, False))
+
+    def wait(self):
+        """
+        Wait for all queued downloads and fill in the local_path of their image items.
+        The thread pool is shut down afterwards and recreated if more images are queued.
+        """
+        for image_item, future, is_download in self._pending:
+            image_item["local_path"] = future.result()
+            if is_download:
+                report_image_result(image_item["src"], image_item["local_path"])
+        self._pending = []
+        self._futures = {}
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
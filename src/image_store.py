@@ -0,0 +1,149 @@
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from src.disk_cache import atomic_write
+
+INDEX_DIR = '.index'
+HASH_CHUNK_SIZE = 65536
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+class ImageStore:
+    """
+    Content-addressed image store.
+    Every image is saved once as <sha256 of its content><extension> in the store directory,
+    so different images that share a name never overwrite each other and identical images
+    are kept once. An index maps each source (remote URL or local file path) to its stored
+    file; a source that is already in the index is served without a network request or copy,
+    across pages and across runs.
+    """
+
+    def __init__(self, root_dir):
+        """
+        Args:
+            root_dir (str): Directory holding the images and the index
+        """
+        self.root_dir = root_dir
+        self.index_dir = os.path.join(root_dir, INDEX_DIR)
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def lookup(self, source, source_stat=None):
+        """
+        Return the stored file for a source, if it has been stored before.
+        Args:
+            source (str): Resolved URL or absolute local path of the image
+            source_stat (os.stat_result, optional): For local files, the current stat of the
+                source; the entry is only used if the file has not changed since it was stored
+        Returns:
+            str: Path of the stored image, or None
+        """
+        try:
+            with open(self._index_path(source), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if source_stat is not None and (entry.get('size'), entry.get('mtime_ns')) != \
+                (source_stat.st_size, source_stat.st_mtime_ns):
+            return None
+        path = os.path.join(self.root_dir, entry['file'])
+        return path if os.path.isfile(path) else None
+
+    def add_chunks(self, source, chunks, extension):
+        """
+        Store an image from an iterable of byte chunks, hashing it while it is written.
+        Args:
+            source (str): Resolved URL of the image
+            chunks: Iterable of bytes
+            extension (str): File extension including the dot
+        Returns:
+            str: Path of the stored image
+        """
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.root_dir, prefix='.download-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in chunks:
+                    digest.update(chunk)
+                    f.write(chunk)
+            filename = digest.hexdigest() + extension
+            self._move_into_place(temp_path, filename)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self._write_index(source, {'file': filename})
+        return os.path.join(self.root_dir, filename)
+
+    def add_file(self, source_path):
+        """
+        Store a local image file.
+        Args:
+            source_path (str): Path of the image file
+        Returns:
+            str: Path of the stored image
+        """
+        source = os.path.abspath(source_path)
+        source_stat = os.stat(source)
+        stored_path = self.lookup(source, source_stat)
+        if stored_path:
+            return stored_path
+        filename = hash_file(source) + os.path.splitext(source)[1]
+        stored_path = os.path.join(self.root_dir, filename)
+        if not os.path.isfile(stored_path):
+            fd, temp_path = tempfile.mkstemp(dir=self.root_dir, prefix='.copy-')
+            os.close(fd)
+            with open(source, 'rb') as src, open(temp_path, 'wb') as dst:
+                for chunk in iter(lambda: src.read(HASH_CHUNK_SIZE), b''):
+                    dst.write(chunk)
+            self._move_into_place(temp_path, filename)
+        self._write_index(source, {'file': filename, 'size': source_stat.st_size,
+                                   'mtime_ns': source_stat.st_mtime_ns})
+        return stored_path
+
+    def _move_into_place(self, temp_path, filename):
+        """Move a finished temporary file to its content-addressed name, or drop it if that exists."""
+        stored_path = os.path.join(self.root_dir, filename)
+        if os.path.isfile(stored_path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, stored_path)
+
+    def _write_index(self, source, entry):
+        """Record the stored file of a source."""
+        atomic_write(self._index_path(source), json.dumps(entry).encode('utf-8'))
+
+    def _index_path(self, source):
+        """Return the index file of a source."""
+        key = hashlib.sha256(source.encode('utf-8')).hexdigest()
+        return os.path.join(self.index_dir, key + '.json')
+
+def hash_file(path):
+    """
+    Hash the content of a file.
+    Args:
+        path (str): File to hash
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_image_store(root_dir):
+    """
+    Return the store for an image directory, shared by every extractor and download thread.
+    Args:
+        root_dir (str): Directory holding the images
+    Returns:
+        ImageStore: The store for that directory
+    """
+    key = os.path.abspath(root_dir)
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ImageStore(root_dir)
+        return _stores[key]
@@ -0,0 +1,92 @@
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSONL_GRANULARITIES = ['item', 'page']
+JSON_ENCODERS = ['auto', 'orjson', 'json']
+
+def resolve_json_encoder(encoder='auto'):
+    """
+    Pick the encoder used for JSON Lines records.
+    Args:
+        encoder (str): 'auto', 'orjson' or 'json'
+    Returns:
+        str: 'orjson' if requested (or auto) and installed, otherwise 'json'
+    """
+    if encoder in ('auto', 'orjson') and orjson is not None:
+        return 'orjson'
+    return 'json'
+
+def encode_record(record, encoder='auto'):
+    """
+    Encode one record as a single line of compact JSON.
+    Both encoders produce the same text: compact separators, keys in insertion order
+    and non-ASCII characters written as UTF-8 rather than escaped.
+    Args:
+        record (dict): JSON serializable record
+        encoder (str): 'auto', 'orjson' or 'json'
+    Returns:
+        str: The encoded record without a trailing newline
+    """
+    if resolve_json_encoder(encoder) == 'orjson':
+        return orjson.dumps(record).decode('utf-8')
+    return json.dumps(record, ensure_ascii=False, separators=(',', ':'))
+
+def iter_jsonl_records(content, granularity='item', source=None):
+    """
+    Yield the JSON Lines records of an extracted page.
+    With 'page' granularity the whole page is one record. With 'item' granularity every
+    content item and every question is its own record, tagged with the page title, its
+    position and, when given, the page source, so records from many pages can be
+    concatenated into one corpus.
+    Args:
+        content (dict): Structured content from LLMStructuredExtractor
+        granularity (str): 'item' or 'page'
+        source (str, optional): Input file path or URL of the page
+    Yields:
+        dict: One record per line
+    """
+    if granularity == 'page':
+        yield content if source is None else {"source": source, **content}
+        return
+    page = {"title": content.get("title")}
+    if source is not None:
+        page["source"] = source
+    for index, item in enumerate(content.get("content", [])):
+        yield {**page, "index": index, **item}
+    for index, question in enumerate(content.get("questions", [])):
+        yield {**page, "index": index, "type": "question", "text": question}
+
+def write_jsonl(content, stream, granularity='item', source=None, encoder='auto'):
+    """
+    Encode the records of a page one at a time and write each as a line to a stream.
+    Args:
+        content (dict): Structured content from LLMStructuredExtractor
+        stream: Writable text stream, e.g. an open file or sys.stdout
+        granularity (str): 'item' or 'page'
+        source (str, optional): Input file path or URL of the page
+        encoder (str): 'auto', 'orjson' or 'json'
+    Returns:
+        int: Number of records written
+    """
+    encoder = resolve_json_encoder(encoder)
+    count = 0
+    for record in iter_jsonl_records(content, granularity, source):
+        stream.write(encode_record(record, encoder))
+        stream.write("\n")
+        count += 1
+    return count
+
+def write_json(content, stream):
+    """
+    Write the page as indented JSON to a stream.
+    json.dump() encodes the tree incrementally, so this produces the same text as
+    json.dumps(content, indent=2) without building it as one string.
+    Args:
+        content (dict): Structured content from LLMStructuredExtractor
+        stream: Writable text stream
+    """
+    json.dump(content, stream, indent=2)
@@ -0,0 +1,51 @@
+import sys
+import logging
+
+LOG_FORMAT = '%(asctime)s %(levelname)-7s %(name)s: %(message)s'
+DATE_FORMAT = '%H:%M:%S'
+DEFAULT_LEVEL = logging.INFO
+QUIET_LEVEL = logging.WARNING
+VERBOSE_LEVEL = logging.DEBUG
+
+# Handler installed by configure_logging(), replaced when it is called again
+_handler = None
+
+def configure_logging(level=DEFAULT_LEVEL, stream=None):
+    """
+    Send log records of the given level and above to stderr, one line per record.
+    Output written to stdout (the extracted content when no output file is given)
+    never carries log lines. Calling it again replaces the handler installed before.
+    Args:
+        level (int): Lowest level that is written, e.g. logging.INFO
+        stream: Text stream for the records (default: stderr)
+    Returns:
+        logging.Handler: The installed handler
+    """
+    global _handler
+    root = logging.getLogger()
+    if _handler is not None:
+        root.removeHandler(_handler)
+    _handler = logging.StreamHandler(stream or sys.stderr)
+    _handler.setFormatter(logging.Formatter(LOG_FORMAT, DATE_FORMAT))
+    root.addHandler(_handler)
+    root.setLevel(level)
+    # Records are only created for enabled levels; these skip per-record lookups we never print
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    return _handler
+
+def verbosity_level(quiet=False, verbose=False):
+    """
+    Return the log level selected by --quiet and --verbose.
+    Args:
+        quiet (bool): Only warnings and errors
+        verbose (bool): Include per-image and per-request details
+    Returns:
+        int: Logging level
+    """
+    if quiet:
+        return QUIET_LEVEL
+    if verbose:
+        return VERBOSE_LEVEL
+    return DEFAULT_LEVEL
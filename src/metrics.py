@@ -0,0 +1,258 @@
+import json
+import time
+import threading
+import contextlib
+from collections import Counter
+from src.disk_cache import atomic_write
+
+METRICS_FORMATS = ['prometheus', 'json']
+
+# Metric names, following the Prometheus naming conventions
+PAGES_TOTAL = 'htb_scraper_pages_total'
+ELEMENTS_TOTAL = 'htb_scraper_elements_total'
+IMAGES_TOTAL = 'htb_scraper_images_total'
+FETCHED_BYTES_TOTAL = 'htb_scraper_fetched_bytes_total'
+CACHE_REQUESTS_TOTAL = 'htb_scraper_cache_requests_total'
+RETRIES_TOTAL = 'htb_scraper_http_retries_total'
+STAGE_SECONDS = 'htb_scraper_stage_duration_seconds'
+RUN_SECONDS = 'htb_scraper_run_duration_seconds'
+LAST_RUN_TIMESTAMP = 'htb_scraper_last_run_timestamp_seconds'
+
+METRIC_HELP = {
+    PAGES_TOTAL: ('counter', 'Pages processed, by status'),
+    ELEMENTS_TOTAL: ('counter', 'Top-level content items extracted, by type'),
+    IMAGES_TOTAL: ('counter', 'Images handled, by result (downloaded, copied, reused, failed)'),
+    FETCHED_BYTES_TOTAL: ('counter', 'Bytes received over the network, by kind (page, image)'),
+    CACHE_REQUESTS_TOTAL: ('counter', 'Cache lookups, by cache and result'),
+    RETRIES_TOTAL: ('counter', 'Requests retried, by reason (status code or error)'),
+    STAGE_SECONDS: ('histogram', 'Time spent in each pipeline stage'),
+    RUN_SECONDS: ('gauge', 'Wall clock time of the last run'),
+    LAST_RUN_TIMESTAMP: ('gauge', 'Unix time the last run finished')
+}
+
+# Upper bounds of the latency histogram buckets, in seconds
+STAGE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_default_metrics = None
+
+class Metrics:
+    """
+    Counters, gauges and latency histograms of one run.
+    Series are keyed by metric name and label values. Updates take a lock, since images
+    are downloaded on worker threads. snapshot() and merge() carry the series of a batch
+    worker process over to the parent, which writes them out once at the end of the run.
+    """
+
+    def __init__(self, buckets=STAGE_BUCKETS):
+        """
+        Args:
+            buckets (tuple): Upper bounds of the histogram buckets, in seconds
+        """
+        self.buckets = tuple(buckets)
+        self.counters = {}
+        self.gauges = {}
+        # (name, labels) -> [per-bucket counts, including +Inf, sum, count]
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        """Set a gauge."""
+        with self._lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name, value, **labels):
+        """Record one observation in a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            series = self.histograms.get(key)
+            if series is None:
+                series = self.histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def value(self, name, **labels):
+        """Return the current value of a counter or gauge, 0 if it was never set."""
+        key = (name, tuple(sorted(labels.items())))
+        return self.counters.get(key, self.gauges.get(key, 0))
+
+    def snapshot(self):
+        """
+        Return every series as a JSON-serializable dict.
+        Returns:
+            dict: counters, gauges and histograms, each a list of series with their labels
+        """
+        with self._lock:
+            return {
+                "buckets": list(self.buckets),
+                "counters": [{"name": name, "labels": dict(labels), "value": value}
+                             for (name, labels), value in sorted(self.counters.items())],
+                "gauges": [{"name": name, "labels": dict(labels), "value": value}
+                           for (name, labels), value in sorted(self.gauges.items())],
+                "histograms": [{"name": name, "labels": dict(labels), "buckets": list(counts),
+                                "sum": total, "count": count}
+                               for (name, labels), (counts, total, count) in sorted(self.histograms.items())]
+            }
+
+    def merge(self, snapshot):
+        """
+        Add the series of a snapshot() to this registry.
+        Counters and histograms are summed; gauges are overwritten.
+        Args:
+            snapshot (dict): Result of snapshot(), e.g. from a batch worker process
+        Raises:
+            ValueError: If the snapshot's histograms use different buckets
+        """
+        if snapshot["histograms"] and tuple(snapshot["buckets"]) != self.buckets:
+            raise ValueError("cannot merge histograms with different buckets")
+        for series in snapshot["counters"]:
+            self.inc(series["name"], series["value"], **series["labels"])
+        for series in snapshot["gauges"]:
+            self.set(series["name"], series["value"], **series["labels"])
+        with self._lock:
+            for series in snapshot["histograms"]:
+                key = (series["name"], tuple(sorted(series["labels"].items())))
+                current = self.histograms.get(key)
+                if current is None:
+                    current = self.histograms[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                current[0] = [a + b for a, b in zip(current[0], series["buckets"])]
+                current[1] += series["sum"]
+                current[2] += series["count"]
+
+    def to_prometheus(self):
+        """
+        Render every series in the Prometheus text exposition format.
+        Returns:
+            str: HELP and TYPE lines followed by the samples of each metric
+        """
+        snapshot = self.snapshot()
+        by_name = {}
+        for kind in ("counters", "gauges", "histograms"):
+            for series in snapshot[kind]:
+                by_name.setdefault(series["name"], []).append(series)
+        lines = []
+        for name in sorted(by_name):
+            metric_type, help_text = METRIC_HELP.get(name, (None, name))
+            if metric_type is None:
+                metric_type = 'histogram' if 'buckets' in by_name[name][0] else 'untyped'
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for series in by_name[name]:
+                if 'buckets' in series:
+                    cumulative = 0
+                    bounds = [format_value(bound) for bound in self.buckets] + ['+Inf']
+                    for bound, count in zip(bounds, series["buckets"]):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{format_labels(series['labels'], le=bound)} {cumulative}")
+                    lines.append(f"{name}_sum{format_labels(series['labels'])} {format_value(series['sum'])}")
+                    lines.append(f"{name}_count{format_labels(series['labels'])} {series['count']}")
+                else:
+                    lines.append(f"{name}{format_labels(series['labels'])} {format_value(series['value'])}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path, metrics_format='prometheus'):
+        """
+        Write the metrics to a file, replacing it atomically so a node exporter reading
+        the textfile directory never sees a partial file.
+        Args:
+            file_path (str): Output file, e.g. /var/lib/node_exporter/textfile/htb_scraper.prom
+            metrics_format (str): 'prometheus' or 'json'
+        """
+        if metrics_format == 'json':
+            text = json.dumps(self.snapshot(), indent=2) + "\n"
+        else:
+            text = self.to_prometheus()
+        atomic_write(file_path, text.encode('utf-8'))
+
+def format_labels(labels, **extra):
+    """Render labels as {name="value",...}, escaping the values; empty string if there are none."""
+    items = list(labels.items()) + list(extra.items())
+    if not items:
+        return ""
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in items)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(items, escaped)) + "}"
+
+def format_value(value):
+    """Render a sample value; whole numbers without a trailing .0."""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def configure_metrics(metrics=None):
+    """
+    Enable the default registry the pipeline records into.
+    Args:
+        metrics (Metrics, optional): Registry to use, a new one by default
+    Returns:
+        Metrics: The default registry
+    """
+    global _default_metrics
+    _default_metrics = metrics if metrics is not None else Metrics()
+    return _default_metrics
+
+def disable_metrics():
+    """Stop recording metrics."""
+    global _default_metrics
+    _default_metrics = None
+
+def get_default_metrics():
+    """Return the default registry, or None if metrics are disabled."""
+    return _default_metrics
+
+@contextlib.contextmanager
+def collect_metrics():
+    """
+    Record into a fresh registry while the block runs, then restore the previous one.
+    Batch items use this so each result carries only its own metrics.
+    Yields:
+        Metrics: The fresh registry
+    """
+    global _default_metrics
+    previous = _default_metrics
+    _default_metrics = Metrics()
+    try:
+        yield _default_metrics
+    finally:
+        _default_metrics = previous
+
+def inc(name, value=1, **labels):
+    """Add value to a counter of the default registry, if metrics are enabled."""
+    metrics = _default_metrics
+    if metrics is not None:
+        metrics.inc(name, value, **labels)
+
+@contextlib.contextmanager
+def timed(stage):
+    """
+    Record the time the block takes in the stage latency histogram, if metrics are enabled.
+    Args:
+        stage (str): 'fetch', 'parse', 'walk', 'image', 'format' or 'store'
+    """
+    metrics = _default_metrics
+    if metrics is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.observe(STAGE_SECONDS, time.perf_counter() - start, stage=stage)
+
+def count_elements(content_items):
+    """Count the top-level content items of a page by type, if metrics are enabled."""
+    metrics = _default_metrics
+    if metrics is None:
+        return
+    for item_type, count in Counter(item.get("type", "unknown") for item in content_items).items():
+        metrics.inc(ELEMENTS_TOTAL, count, type=item_type)
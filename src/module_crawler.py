@@ -0,0 +1,257 @@
+import re
+import time
+import logging
+import threading
+import posixpath
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from concurrent.futures import ThreadPoolExecutor
+from src.fetch_html_from_url import fetch_html_from_url
+from src.LLMStructuredExtractor import LLMStructuredExtractor
+from src.image_handler import count_failed_images
+import src.metrics as metrics
+import src.run_journal as run_journal
+
+DEFAULT_CRAWL_DEPTH = 2
+DEFAULT_CONCURRENCY = 4
+DEFAULT_DELAY = 1.0
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Module pages: /module/details/<id>, /module/<id>/section/<id>, ...
+MODULE_PATH = re.compile(r'^/module/(?:details/)?(\d+)(?:/|$)')
+
+logger = logging.getLogger(__name__)
+
+def normalize_url(url, base_url=None):
+    """
+    Resolve a link and bring it into one canonical form, so each page is crawled once.
+    The scheme and host are lowercased, default ports, fragments and trailing slashes
+    are dropped, and dot segments in the path are resolved. The query is kept.
+    Args:
+        url (str): Link as found in the page
+        base_url (str, optional): URL of the page the link was found on
+    Returns:
+        str: Normalized absolute URL, or None if the link is not an http(s) URL
+    """
+    parts = urlsplit(urljoin(base_url, url.strip()) if base_url else url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    path = posixpath.normpath(parts.path) if parts.path else '/'
+    if path.startswith('//'):
+        path = '/' + path.lstrip('/')
+    if path != '/':
+        path = path.rstrip('/')
+    return urlunsplit((scheme, host, path, parts.query, ''))
+
+class CrawlScope:
+    """
+    Decides which links belong to the crawled module.
+    A link is in scope when it is on the entry URL's host and, for a module URL, its
+    path is one of that module's pages (/module/<id>/...); for any other entry URL,
+    its path is below the entry URL's directory.
+    """
+
+    def __init__(self, entry_url):
+        """
+        Args:
+            entry_url (str): Normalized URL the crawl starts from
+        """
+        parts = urlsplit(entry_url)
+        self.host = parts.netloc
+        match = MODULE_PATH.match(parts.path)
+        self.module_id = match.group(1) if match else None
+        self.path_prefix = posixpath.dirname(parts.path).rstrip('/') + '/'
+
+    def contains(self, url):
+        """Check whether a normalized URL belongs to the crawl."""
+        parts = urlsplit(url)
+        if parts.netloc != self.host:
+            return False
+        if self.module_id is not None:
+            match = MODULE_PATH.match(parts.path)
+            return match is not None and match.group(1) == self.module_id
+        return parts.path.startswith(self.path_prefix)
+
+def discover_links(soup, page_url, scope):
+    """
+    Return the in-scope links of a page, normalized and in document order, without duplicates.
+    Args:
+        soup (BeautifulSoup): Parsed page
+        page_url (str): URL of the page, to resolve relative links against
+        scope (CrawlScope): Scope of the crawl
+    Returns:
+        list: Normalized URLs
+    """
+    links = {}
+    for anchor in soup.find_all('a', href=True):
+        url = normalize_url(anchor['href'], page_url)
+        if url is not None and scope.contains(url):
+            links[url] = None
+    return list(links)
+
+class HostThrottle:
+    """
+    Spaces out the requests to each host by at least a fixed delay.
+    Concurrent callers for the same host are given consecutive time slots, so the
+    delay holds however many crawl workers run; requests to different hosts do not
+    wait for each other.
+    """
+
+    def __init__(self, delay=DEFAULT_DELAY):
+        """
+        Args:
+            delay (float): Minimum seconds between the starts of two requests to one host
+        """
+        self.delay = delay
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until a request to the URL's host may start."""
+        if self.delay <= 0:
+            return
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+class ModuleCrawler:
+    """
+    Crawls a module from one entry URL and extracts every page it finds.
+    Pages are crawled breadth first, one depth level at a time, with up to concurrency
+    pages fetched and extracted in parallel. Each page is parsed once: the extractor's
+    soup is also used to discover the links of the next level.
+    """
+
+    def __init__(self, depth=DEFAULT_CRAWL_DEPTH, concurrency=DEFAULT_CONCURRENCY, delay=DEFAULT_DELAY,
+                 **extract_options):
+        """
+        Args:
+            depth (int): Number of links to follow from the entry page; 0 only extracts the entry page
+            concurrency (int): Maximum number of pages fetched and extracted at once
+            delay (float): Minimum seconds between two requests to the same host
+            **extract_options: LLMStructuredExtractor options for every page (download_images,
+                image_output_dir, image_workers, parser, max_depth)
+        """
+        self.depth = depth
+        self.concurrency = max(1, concurrency)
+        self.throttle = HostThrottle(delay)
+        self.extract_options = extract_options
+
+    def crawl(self, entry_url, on_page=None):
+        """
+        Crawl the module the entry URL belongs to.
+        Args:
+            entry_url (str): Module or section URL to start from
+            on_page (callable, optional): Called as on_page(record, content) for every page,
+                in crawl order, from the calling thread; content is None for failed and
+                skipped pages. It may set the record's status to 'failed' and its error,
+                e.g. when the page's output could not be written
+        Returns:
+            list: One record per page in crawl order, with its URL as input, the output
+                set by on_page, depth, status ('ok', 'failed' or 'skipped'), seconds, error
+                and the number of in-scope links found. With a journal enabled, pages it
+                records as complete are skipped and their stored links followed
+        Raises:
+            ValueError: If the entry URL is not an http(s) URL
+        """
+        start_url = normalize_url(entry_url)
+        if start_url is None:
+            raise ValueError(f"Invalid URL '{entry_url}'. Please include http:// or https://")
+        scope = CrawlScope(start_url)
+        seen = {start_url}
+        level = [start_url]
+        records = []
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='crawl') as executor:
+            for depth in range(self.depth + 1):
+                if not level:
+                    break
+                logger.info("Crawling %d pages at depth %d", len(level), depth)
+                next_level = []
+                for record, content, links in executor.map(lambda url: self.crawl_page(url, scope), level):
+                    record["depth"] = depth
+                    records.append(record)
+                    for url in links:
+                        if url not in seen:
+                            seen.add(url)
+                            next_level.append(url)
+                    extracted = record["status"] == "ok"
+                    if on_page is not None:
+                        on_page(record, content)
+                    if extracted:
+                        self.finish_page(record, self.failed_image_count(content))
+                    # Counted after on_page, which fails the page if it cannot write it out
+                    metrics.inc(metrics.PAGES_TOTAL, status=record["status"])
+                level = next_level
+        return records
+
+    def failed_image_count(self, content):
+        """Return the images of a page that were to be downloaded but could not be saved."""
+        if not self.extract_options.get("download_images", True):
+            return 0
+        return count_failed_images(content)
+
+    @staticmethod
+    def finish_page(record, failed_images=0):
+        """
+        Record an extracted page as done once on_page has written it, or as failed if it was
+        not written, so a resumed crawl fetches it again.
+        Args:
+            record (dict): Record of a page that was extracted, updated in place
+            failed_images (int): Images of the page that could not be saved; the page is
+                then recorded as images_failed and also fetched again
+        """
+        if record["status"] == "ok":
+            try:
+                run_journal.mark_done(record["input"], record["output"], failed_images)
+                return
+            except OSError as e:
+                # The output file is missing or unreadable, so a resumed crawl must write it again
+                record["status"] = "failed"
+                record["error"] = str(e)
+                logger.warning("Failed to write %s: %s", record["input"], e)
+        run_journal.record(record["input"], run_journal.FAILED, error=record["error"])
+
+    def crawl_page(self, url, scope):
+        """
+        Fetch and extract one page and discover its links, or take them from the journal
+        if the page was finished by an earlier run.
+        Args:
+            url (str): Normalized page URL
+            scope (CrawlScope): Scope of the crawl
+        Returns:
+            tuple: (record, content or None, list of in-scope links)
+        """
+        start = time.perf_counter()
+        record = {"input": url, "output": None, "depth": None, "status": "failed", "seconds": 0.0,
+                  "error": None, "links": 0}
+        content, links = None, []
+        journal = run_journal.get_default_journal()
+        if journal is not None and journal.is_complete(url):
+            entry = journal.get(url)
+            links = entry["links"] or []
+            record.update(status="skipped", output=entry["output"], links=len(links))
+            logger.info("Skipping %s, finished in an earlier run", url)
+            return record, content, links
+        try:
+            self.throttle.wait(url)
+            html_content = fetch_html_from_url(url)
+            run_journal.record(url, run_journal.FETCHED)
+            extractor = LLMStructuredExtractor(html_content, url, **self.extract_options)
+            content = extractor.extract_content()
+            links = discover_links(extractor.soup, url, scope)
+            run_journal.record(url, run_journal.EXTRACTED, links=links)
+            record["status"] = "ok"
+            record["links"] = len(links)
+            logger.info("Extracted %s (%d links in scope)", url, len(links))
+        except Exception as e:
+            record["error"] = str(e)
+            logger.warning("Failed to crawl %s: %s", url, e)
+            run_journal.record(url, run_journal.FAILED, error=str(e))
+        record["seconds"] = time.perf_counter() - start
+        return record, content, links
@@ -0,0 +1,143 @@
+import re
+import contextlib
+from contextvars import ContextVar
+from bs4.element import NavigableString, CData, Tag
+
+# String types a tag's get_text() includes unless the tag is a script, style or template
+CONTENT_STRING_TYPES = (NavigableString, CData)
+_CONTENT_STRING_TYPE_SET = set(CONTENT_STRING_TYPES)
+WHITESPACE_RUN = re.compile(r'\s+')
+
+_active_cache = ContextVar('node_text_cache', default=None)
+
+class NodeTextCache:
+    """
+    Per-document memo of element text.
+    The text of an element is joined once, when it is first read; reading it again,
+    or reading its stripped or whitespace-normalized form again, is a lookup. When
+    an ancestor is read later, the text of every descendant read before it is
+    spliced in instead of walking that subtree again. When a descendant is read
+    after its ancestor (a paragraph inside an alert), its text is joined from its
+    span of the pieces collected for the ancestor instead of walking it again. Only
+    elements that are read get a string, so none are built for elements nobody asks
+    about. Elements are keyed by identity, so a cache must only be used while the
+    document it was created for is alive.
+    """
+
+    def __init__(self):
+        self.texts = {}
+        # Element -> (pieces of an ancestor's text, start, end) for elements walked inside an ancestor
+        self.spans = {}
+        self.stripped_texts = {}
+        self.normalized_texts = {}
+        # Strings built by the cache, and requests answered without building one
+        self.built = 0
+        self.reused = 0
+
+    def text(self, element):
+        """
+        Return the text of an element, equal to element.get_text().
+        Args:
+            element: BeautifulSoup Tag
+        Returns:
+            str: Concatenated text of the element's descendants
+        """
+        if getattr(element, 'interesting_string_types', _CONTENT_STRING_TYPE_SET) != _CONTENT_STRING_TYPE_SET:
+            # script, style and template tags keep their own string types
+            return element.get_text()
+        texts = self.texts
+        key = id(element)
+        cached = texts.get(key)
+        if cached is not None:
+            self.reused += 1
+            return cached
+        span = self.spans.get(key)
+        if span is not None:
+            # Read inside an ancestor before: join its share of the ancestor's pieces
+            pieces, start, end = span
+            text = texts[key] = "".join(pieces[start:end])
+            self.built += 1
+            self.reused += 1
+            return text
+        pieces = []
+        stack = [(None, iter(element.contents), 0)]
+        while stack:
+            node, children, start = stack[-1]
+            for child in children:
+                if isinstance(child, Tag):
+                    child_text = texts.get(id(child))
+                    if child_text is None:
+                        stack.append((child, iter(child.contents), len(pieces)))
+                        break
+                    # A descendant that was read before is spliced in instead of walked again
+                    pieces.append(child_text)
+                    self.reused += 1
+                elif type(child) in CONTENT_STRING_TYPES:
+                    pieces.append(child)
+            else:
+                stack.pop()
+                if node is not None:
+                    self.spans[id(node)] = (pieces, start, len(pieces))
+        text = texts[key] = "".join(pieces)
+        self.built += 1
+        return text
+
+    def stripped(self, element):
+        """Return element.get_text().strip(), memoized."""
+        key = id(element)
+        value = self.stripped_texts.get(key)
+        if value is None:
+            value = self.stripped_texts[key] = self.text(element).strip()
+        else:
+            self.reused += 1
+        return value
+
+    def normalized(self, element):
+        """Return the stripped text with every whitespace run replaced by one space, memoized."""
+        key = id(element)
+        value = self.normalized_texts.get(key)
+        if value is None:
+            value = self.normalized_texts[key] = WHITESPACE_RUN.sub(' ', self.stripped(element))
+        else:
+            self.reused += 1
+        return value
+
+@contextlib.contextmanager
+def use_text_cache(cache):
+    """
+    Answer stripped_text() and normalized_text() from a cache while the block runs.
+    Args:
+        cache (NodeTextCache): Cache of the document being processed
+    """
+    token = _active_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _active_cache.reset(token)
+
+def stripped_text(element):
+    """
+    Return element.text.strip(), from the active cache when there is one.
+    Args:
+        element: BeautifulSoup element, or any object with a text attribute
+    Returns:
+        str: The stripped text
+    """
+    cache = _active_cache.get()
+    if cache is None or not isinstance(element, Tag):
+        return element.text.strip()
+    return cache.stripped(element)
+
+def normalized_text(element):
+    """
+    Return the stripped text of an element with whitespace runs collapsed to one space,
+    from the active cache when there is one.
+    Args:
+        element: BeautifulSoup element, or any object with a text attribute
+    Returns:
+        str: The normalized text
+    """
+    cache = _active_cache.get()
+    if cache is None or not isinstance(element, Tag):
+        return WHITESPACE_RUN.sub(' ', element.text.strip())
+    return cache.normalized(element)
@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+import pstats
+import cProfile
+import threading
+import contextlib
+from collections import Counter
+
+DEFAULT_PROFILE_PREFIX = 'htb_profile'
+SAMPLE_INTERVAL = 0.001
+TOP_FUNCTIONS = 25
+
+class StackSampler:
+    """
+    Samples the Python stacks of every thread at a fixed interval.
+    cProfile only records caller/callee pairs of the thread it runs in, so full call
+    stacks for a flame graph, including the image download threads, are collected by
+    a background thread reading sys._current_frames().
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        """
+        Args:
+            interval (float): Seconds between samples
+        """
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start sampling in a daemon thread."""
+        self._thread = threading.Thread(target=self._run, name='htb-stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop sampling and wait for the sampling thread to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                self.stacks[collapse_stack(names.get(thread_id, str(thread_id)), frame)] += 1
+            self.samples += 1
+
+    def write_collapsed(self, file_path):
+        """
+        Write the samples in the collapsed-stack format read by flamegraph.pl, speedscope
+        and inferno: one 'root;caller;callee count' line per distinct stack.
+        Args:
+            file_path (str): Path of the output file
+        """
+        with open(file_path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+def collapse_stack(thread_name, frame):
+    """
+    Return a frame's call stack as one collapsed-stack line, outermost call first.
+    Args:
+        thread_name (str): Name used as the root of the stack
+        frame: Innermost frame of the stack
+    Returns:
+        str: 'thread;function (file:line);...' without the sample count
+    """
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    names.append(thread_name)
+    # Semicolons separate frames; the count is separated by the last space, so spaces are fine
+    return ";".join(name.replace(';', ':') for name in reversed(names))
+
+def print_hot_functions(profiler, stream=None, limit=TOP_FUNCTIONS):
+    """
+    Print the functions with the most total time, with their call counts and cumulative time.
+    Args:
+        profiler (cProfile.Profile): Finished profiler
+        stream: Text stream to print to (default: stderr)
+        limit (int): Number of functions to print
+    """
+    stream = stream or sys.stderr
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.TIME).print_stats(limit)
+
+@contextlib.contextmanager
+def profile_run(prefix=DEFAULT_PROFILE_PREFIX, interval=SAMPLE_INTERVAL, stream=None):
+    """
+    Profile the block with cProfile and a stack sampler.
+    On exit writes <prefix>.prof (pstats / snakeviz / gprof2dot input) and
+    <prefix>.collapsed (flame graph input), and prints the hottest functions.
+    Args:
+        prefix (str): Output path without extension
+        interval (float): Seconds between stack samples
+        stream: Text stream for the report (default: stderr)
+    Yields:
+        cProfile.Profile: The running profiler
+    """
+    stream = stream or sys.stderr
+    directory = os.path.dirname(prefix)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    sampler = StackSampler(interval)
+    start = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - start
+        profiler.dump_stats(f"{prefix}.prof")
+        sampler.write_collapsed(f"{prefix}.collapsed")
+        print(f"Profiled {elapsed:.2f}s: {prefix}.prof (cProfile), {prefix}.collapsed "
+              f"({sampler.samples} stack samples)", file=stream)
+        print_hot_functions(profiler, stream)
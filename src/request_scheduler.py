@@ -0,0 +1,216 @@
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import requests
+from src.http_transport import get_session
+import src.metrics as metrics
+
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_MAX_BACKOFF = 30.0
+# A Retry-After longer than this is not waited for; the response is returned as it is
+DEFAULT_MAX_RETRY_AFTER = 120.0
+# Responses worth another attempt: rate limited, or a server or gateway that may recover
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+# Request errors worth another attempt; invalid URLs and the like fail at once
+RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+logger = logging.getLogger(__name__)
+
+_default_scheduler = None
+_scheduler_lock = threading.Lock()
+
+class TokenBucket:
+    """
+    Token bucket limiting the request rate to one host.
+    Tokens are added at rate per second up to burst. A request that finds the bucket
+    empty takes a token on credit and is told how long to wait for it, so concurrent
+    callers are handed consecutive slots instead of racing for the next token. The
+    bucket can also be paused, e.g. while the host has asked us to retry later.
+    """
+
+    def __init__(self, rate=None, burst=1, clock=time.monotonic):
+        """
+        Args:
+            rate (float, optional): Tokens added per second; None for no rate limit
+            burst (int): Largest number of requests that can start at once
+            clock (callable): Monotonic clock returning seconds
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.clock = clock
+        self.updated = clock()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Take a token.
+        Returns:
+            float: Seconds to wait before the request may start
+        """
+        with self._lock:
+            now = self.clock()
+            wait = max(0.0, self.paused_until - now)
+            if self.rate:
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                self.tokens -= 1
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.rate)
+            return wait
+
+    def pause(self, seconds):
+        """Hold back every request for the given number of seconds from now."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, self.clock() + seconds)
+
+class RequestScheduler:
+    """
+    Sends every outbound request through a per-host token bucket and retries transient failures.
+    Connection errors, timeouts and 429/5xx responses are retried up to max_retries times
+    with exponential backoff and full jitter. A Retry-After header sets the least time to
+    wait and pauses the host's bucket, so the other threads sending to that host back
+    off too.
+    """
+
+    def __init__(self, rate=None, burst=1, max_retries=DEFAULT_MAX_RETRIES, backoff=DEFAULT_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF, max_retry_after=DEFAULT_MAX_RETRY_AFTER,
+                 sleep=time.sleep, clock=time.monotonic):
+        """
+        Args:
+            rate (float, optional): Requests per second allowed to each host; None for no limit
+            burst (int): Requests that may start at once before the rate applies
+            max_retries (int): Retries after the first attempt; 0 disables retrying
+            backoff (float): Base delay in seconds, doubled for every retry
+            max_backoff (float): Upper bound of the backoff delay
+            max_retry_after (float): Longest Retry-After that is waited for
+            sleep (callable): Function used to wait
+            clock (callable): Monotonic clock used by the token buckets
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_retry_after = max_retry_after
+        self.sleep = sleep
+        self.clock = clock
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        """Return the token bucket of a host, creating it on first use."""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.setdefault(host, TokenBucket(self.rate, self.burst, self.clock))
+        return bucket
+
+    def get(self, url, **kwargs):
+        """Send a GET request; see request()."""
+        return self.request('GET', url, **kwargs)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request over the shared session once the host's bucket allows it, retrying transient failures.
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            **kwargs: Passed on to requests.Session.request()
+        Returns:
+            requests.Response: The last response, which may still be an error status
+        Raises:
+            requests.exceptions.RequestException: When the last attempt failed without a response
+        """
+        bucket = self.bucket(urlsplit(url).netloc)
+        attempt = 0
+        while True:
+            wait = bucket.reserve()
+            if wait > 0:
+                self.sleep(wait)
+            try:
+                response = get_session().request(method, url, **kwargs)
+            except RETRY_EXCEPTIONS as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.backoff_delay(attempt)
+                retry_after = None
+                reason = type(e).__name__
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                if retry_after is not None and retry_after > self.max_retry_after:
+                    return response
+                delay = self.backoff_delay(attempt)
+                if retry_after is not None:
+                    # The wait happens in the next reserve(), so every request to the host waits
+                    delay = max(delay, retry_after)
+                    bucket.pause(delay)
+                response.close()
+                reason = str(response.status_code)
+            attempt += 1
+            logger.warning("Retrying %s in %.2fs after %s (retry %d of %d)", url, delay, reason,
+                           attempt, self.max_retries)
+            metrics.inc(metrics.RETRIES_TOTAL, reason=reason)
+            if retry_after is None:
+                self.sleep(delay)
+
+    def backoff_delay(self, attempt):
+        """
+        Return the delay before retry number attempt + 1: a random time up to
+        backoff * 2 ** attempt, capped at max_backoff (exponential backoff with full jitter).
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+def parse_retry_after(value):
+    """
+    Parse a Retry-After header.
+    Args:
+        value (str): Delay in seconds or an HTTP date, or None
+    Returns:
+        float: Seconds to wait (0 for a date in the past), or None if absent or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None or retry_at.tzinfo is None:
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+def configure_scheduler(**options):
+    """
+    Replace the shared scheduler used by page fetches and image downloads.
+    Args:
+        **options: RequestScheduler arguments
+    Returns:
+        RequestScheduler: The new shared scheduler
+    """
+    global _default_scheduler
+    with _scheduler_lock:
+        _default_scheduler = RequestScheduler(**options)
+    return _default_scheduler
+
+def get_scheduler():
+    """
+    Return the shared scheduler, creating one with the default retries and no rate limit on first use.
+    Returns:
+        RequestScheduler: The shared scheduler
+    """
+    global _default_scheduler
+    if _default_scheduler is None:
+        with _scheduler_lock:
+            if _default_scheduler is None:
+                _default_scheduler = RequestScheduler()
+    return _default_scheduler
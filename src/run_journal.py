@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import weakref
+
+# States of an input, in the order a run moves it through them
+PENDING = 'pending'
+FETCHED = 'fetched'
+EXTRACTED = 'extracted'
+DONE = 'done'
+# Written out, but some images could not be saved; not complete, so a rerun tries them again
+IMAGES_FAILED = 'images_failed'
+FAILED = 'failed'
+STATES = (PENDING, FETCHED, EXTRACTED, DONE, IMAGES_FAILED, FAILED)
+# States that end an attempt
+FINAL_STATES = (DONE, IMAGES_FAILED, FAILED)
+
+# Seconds a writer waits for another process's write transaction before giving up
+BUSY_TIMEOUT = 30.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    input TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    output TEXT,
+    content_hash TEXT,
+    links TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    updated REAL NOT NULL
+)
+"""
+
+logger = logging.getLogger(__name__)
+
+_default_journal = None
+_open_journals = weakref.WeakSet()
+# Connections inherited by a forked child. SQLite connections must not be used or closed
+# across fork(), so the child keeps them referenced and opens its own.
+_inherited_connections = []
+
+class RunJournal:
+    """
+    Durable record of the state of every input of a batch or crawl run.
+    Each input is a row of a SQLite database with its state (pending, fetched, extracted,
+    done or failed), output path, a SHA-256 of the output file, its in-scope links for
+    crawls, and the last error. The database is in WAL mode with synchronous=NORMAL, so a
+    state change is an append to the log that survives the process being killed, and
+    batch worker processes can write while others read. Every process opens its own
+    connection on first use; threads share it under a lock.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Journal database file, created if it does not exist
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = None
+        self._pid = None
+        self._lock = threading.Lock()
+        _open_journals.add(self)
+        with self._lock:
+            self._connect().execute(SCHEMA)
+
+    def _connect(self):
+        """Return this process's connection, opening it on first use. Call with the lock held."""
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None,
+                                         check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.row_factory = sqlite3.Row
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def _after_fork(self):
+        """Set aside the parent's connection in a forked child; the child connects again on first use."""
+        if self._connection is not None:
+            _inherited_connections.append(self._connection)
+            self._connection = None
+        self._lock = threading.Lock()
+
+    def add(self, inputs):
+        """
+        Record inputs as pending, leaving inputs already in the journal as they are.
+        Args:
+            inputs (list): Input file paths and/or URLs
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute("BEGIN")
+                connection.executemany("INSERT OR IGNORE INTO items (input, state, updated) VALUES (?, ?, ?)",
+                                       [(source, PENDING, now) for source in inputs])
+
+    def record(self, source, state, output=None, content_hash=None, links=None, error=None):
+        """
+        Move an input to a new state.
+        Fields that are not given keep their stored value, except the error, which is
+        replaced by the given one. Every done or failed state counts as an attempt.
+        Args:
+            source (str): Input file path or URL
+            state (str): One of STATES
+            output (str, optional): Output file written for the input
+            content_hash (str, optional): SHA-256 of the output file
+            links (list, optional): In-scope links found on a crawled page
+            error (str, optional): Error of a failed input
+        """
+        if state not in STATES:
+            raise ValueError(f"unknown journal state '{state}'")
+        attempt = 1 if state in FINAL_STATES else 0
+        links_json = json.dumps(links) if links is not None else None
+        with self._lock:
+            self._connect().execute(
+                """INSERT INTO items (input, state, output, content_hash, links, error, attempts, updated)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT (input) DO UPDATE SET
+                       state = excluded.state,
+                       output = COALESCE(excluded.output, output),
+                       content_hash = COALESCE(excluded.content_hash, content_hash),
+                       links = COALESCE(excluded.links, links),
+                       error = excluded.error,
+                       attempts = attempts + excluded.attempts,
+                       updated = excluded.updated""",
+                (source, state, output, content_hash, links_json, error, attempt, time.time()))
+
+    def mark_done(self, source, output=None, failed_images=0):
+        """
+        Record an input as done, with the output file it was written to and that file's hash.
+        An input with images that could not be saved is recorded as images_failed instead,
+        so a resumed run extracts it again and retries the downloads.
+        Args:
+            source (str): Input file path or URL
+            output (str, optional): Output file; None when the caller keeps the content itself
+            failed_images (int): Images of the input with a src that were not saved
+        """
+        content_hash = hash_file(output) if output is not None else None
+        if failed_images:
+            self.record(source, IMAGES_FAILED, output=output, content_hash=content_hash,
+                        error=f"{failed_images} images could not be saved")
+        else:
+            self.record(source, DONE, output=output, content_hash=content_hash)
+
+    def get(self, source):
+        """
+        Return the journal entry of an input.
+        Returns:
+            dict: The stored columns, with links decoded, or None if the input is unknown
+        """
+        with self._lock:
+            row = self._connect().execute("SELECT * FROM items WHERE input = ?", (source,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["links"] = json.loads(entry["links"]) if entry["links"] is not None else None
+        return entry
+
+    def is_complete(self, source, output=None):
+        """
+        Check whether an input was finished by an earlier run and can be skipped.
+        It is complete when it is done and its output file, if it had one, still has the
+        recorded hash, so deleted or truncated outputs are written again.
+        Args:
+            source (str): Input file path or URL
+            output (str, optional): Output file the current run would write; when given,
+                an input that was written elsewhere is not complete
+        Returns:
+            bool: True if the input can be skipped
+        """
+        entry = self.get(source)
+        if entry is None or entry["state"] != DONE:
+            return False
+        if output is not None and entry["output"] != output:
+            return False
+        if entry["output"] is None:
+            return True
+        try:
+            return hash_file(entry["output"]) == entry["content_hash"]
+        except OSError:
+            return False
+
+    def counts(self):
+        """
+        Return the number of inputs in each state.
+        Returns:
+            dict: State -> number of inputs, for the states that occur
+        """
+        with self._lock:
+            rows = self._connect().execute("SELECT state, COUNT(*) FROM items GROUP BY state").fetchall()
+        return {state: count for state, count in rows}
+
+    def close(self):
+        """Close this process's connection; the journal reconnects if it is used again."""
+        with self._lock:
+            if self._connection is not None and self._pid == os.getpid():
+                self._connection.close()
+            self._connection = None
+
+def hash_file(file_path):
+    """Return the hex SHA-256 of a file's contents."""
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+def _after_fork_in_child():
+    for journal in list(_open_journals):
+        journal._after_fork()
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+
+def configure_journal(path):
+    """
+    Enable the journal batch and crawl runs record into.
+    Args:
+        path (str): Journal database file
+    Returns:
+        RunJournal: The default journal
+    """
+    global _default_journal
+    close_journal()
+    _default_journal = RunJournal(path)
+    return _default_journal
+
+def close_journal():
+    """Close and disable the default journal."""
+    global _default_journal
+    if _default_journal is not None:
+        _default_journal.close()
+    _default_journal = None
+
+def get_default_journal():
+    """Return the default journal, or None if no journal is enabled."""
+    return _default_journal
+
+def record(source, state, **fields):
+    """Move an input to a new state in the default journal, if one is enabled; see RunJournal.record()."""
+    journal = _default_journal
+    if journal is not None:
+        journal.record(source, state, **fields)
+
+def mark_done(source, output=None, failed_images=0):
+    """Record an input as done in the default journal, if one is enabled; see RunJournal.mark_done()."""
+    journal = _default_journal
+    if journal is not None:
+        journal.mark_done(source, output, failed_images)
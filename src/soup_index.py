@@ -0,0 +1,66 @@
+from collections import defaultdict
+from bs4 import Tag
+
+class SoupIndex:
+    """
+    One-time index of a parsed document by tag name, class and id.
+    Built with a single walk over the tree; every lookup afterwards is answered from
+    the index instead of a full-document find() scan. Node lists are kept in document
+    order, so find() returns the same element soup.find() would.
+    """
+
+    def __init__(self, soup):
+        """
+        Args:
+            soup: BeautifulSoup document (or element) to index
+        """
+        self.by_name = defaultdict(list)
+        self.by_class = defaultdict(list)
+        self.by_id = defaultdict(list)
+        for node in soup.descendants:
+            if not isinstance(node, Tag):
+                continue
+            self.by_name[node.name].append(node)
+            for class_name in node.get('class', []):
+                self.by_class[class_name].append(node)
+            node_id = node.get('id')
+            if node_id:
+                self.by_id[node_id].append(node)
+
+    def find(self, name, class_=None, id=None):
+        """
+        Return the first element in document order matching the tag name, class and id.
+        Args:
+            name (str): Tag name
+            class_ (str, optional): A class the element must have
+            id (str, optional): The id the element must have
+        Returns:
+            Tag: The first matching element, or None
+        """
+        for node in self.find_all(name, class_, id):
+            return node
+        return None
+
+    def find_all(self, name, class_=None, id=None):
+        """
+        Yield every element in document order matching the tag name, class and id.
+        The most selective index (id, then class, then name) supplies the candidates.
+        Args:
+            name (str): Tag name
+            class_ (str, optional): A class the element must have
+            id (str, optional): The id the element must have
+        """
+        if id is not None:
+            candidates = self.by_id.get(id, [])
+        elif class_ is not None:
+            candidates = self.by_class.get(class_, [])
+        else:
+            candidates = self.by_name.get(name, [])
+        for node in candidates:
+            if node.name != name:
+                continue
+            if class_ is not None and class_ not in node.get('class', []):
+                continue
+            if id is not None and node.get('id') != id:
+                continue
+            yield node
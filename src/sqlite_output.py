@@ -0,0 +1,285 @@
+import os
+import json
+import time
+import sqlite3
+import logging
+import src.metrics as metrics
+
+# Pages written per transaction; a commit is the expensive part of a small write
+DEFAULT_BATCH_SIZE = 100
+SEARCH_LIMIT = 50
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    source TEXT UNIQUE,
+    title TEXT,
+    written REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    position INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    level INTEGER,
+    language TEXT,
+    list_type TEXT,
+    text TEXT NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS items_page ON items(page_id, position);
+CREATE INDEX IF NOT EXISTS items_type ON items(type);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY,
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS questions_page ON questions(page_id, position);
+CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    page_id INTEGER NOT NULL REFERENCES pages(id),
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    src TEXT,
+    alt TEXT,
+    local_path TEXT
+);
+CREATE INDEX IF NOT EXISTS images_page ON images(page_id);
+CREATE INDEX IF NOT EXISTS images_src ON images(src);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(text, content='items', content_rowid='id');
+CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(text, content='questions', content_rowid='id');
+"""
+# Full-text indexes and the tables holding their text
+FTS_TABLES = (("items_fts", "items"), ("questions_fts", "questions"))
+
+logger = logging.getLogger(__name__)
+
+class SQLiteOutput:
+    """
+    Output sink writing extracted pages into a normalized SQLite database with a full-text index.
+    Every page is a row of pages, its top-level content items rows of items, its questions
+    rows of questions and every image it refers to, also inside lists and tables, a row
+    of images. The text of each item and question is indexed by FTS5 with the tables as
+    external content, so a search across the whole corpus is an index lookup instead of
+    a scan of every output file. A page's rows are indexed with one INSERT ... SELECT
+    per index rather than a trigger per row, which loads several times faster. Pages
+    are written in transactions of batch_size pages; writing a page again with the
+    same source replaces it.
+    """
+
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Args:
+            path (str): Database file, created if it does not exist
+            batch_size (int): Pages written per transaction
+        """
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(path, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.pending = 0
+        self.pages_written = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_page(self, content, source=None):
+        """
+        Add a page to the current transaction, committing it once it holds batch_size pages.
+        Args:
+            content (dict): Structured content from LLMStructuredExtractor
+            source (str, optional): Input file path or URL of the page; pages without a
+                source are always added, never replaced
+        Returns:
+            int: Row id of the page
+        """
+        with metrics.timed('store'):
+            if not self.connection.in_transaction:
+                # Take the write lock up front, so the item ids read below stay unused
+                self.connection.execute("BEGIN IMMEDIATE")
+            # A page that fails halfway is undone on its own, keeping the rest of the batch
+            self.connection.execute("SAVEPOINT page")
+            try:
+                page_id = self._insert_page(content, source)
+            except Exception:
+                self.connection.execute("ROLLBACK TO page")
+                raise
+            finally:
+                self.connection.execute("RELEASE page")
+            self.pending += 1
+            self.pages_written += 1
+            if self.pending >= self.batch_size:
+                self.flush()
+        return page_id
+
+    def _insert_page(self, content, source):
+        cursor = self.connection.cursor()
+        if source is not None:
+            self._delete_page(cursor, source)
+        cursor.execute("INSERT INTO pages (source, title, written) VALUES (?, ?, ?)",
+                       (source, content.get("title"), time.time()))
+        page_id = cursor.lastrowid
+        # Item ids are assigned here, so the items go in with one executemany() and the
+        # images can refer to them
+        next_id = cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM items").fetchone()[0]
+        items, images = [], []
+        for position, item in enumerate(content.get("content", [])):
+            item_id = next_id + position
+            item_type = item.get("type", "unknown")
+            nested = item_type in ("list", "table")
+            items.append((item_id, page_id, position, item_type, item.get("level"), item.get("language"),
+                          item.get("list_type"), item_text(item),
+                          json.dumps(item, ensure_ascii=False) if nested else None))
+            images.extend((page_id, item_id, image.get("src"), image.get("alt"), image.get("local_path"))
+                          for image in iter_images(item))
+        cursor.executemany("INSERT INTO items (id, page_id, position, type, level, language, list_type, text, data) "
+                           "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", items)
+        cursor.executemany("INSERT INTO images (page_id, item_id, src, alt, local_path) VALUES (?, ?, ?, ?, ?)",
+                           images)
+        cursor.executemany("INSERT INTO questions (page_id, position, text) VALUES (?, ?, ?)",
+                           [(page_id, position, question)
+                            for position, question in enumerate(content.get("questions", []))])
+        for fts_table, table in FTS_TABLES:
+            cursor.execute(f"INSERT INTO {fts_table} (rowid, text) SELECT id, text FROM {table} WHERE page_id = ?",
+                           (page_id,))
+        return page_id
+
+    @staticmethod
+    def _delete_page(cursor, source):
+        """Delete an earlier copy of a page and remove its text from the full-text indexes."""
+        row = cursor.execute("SELECT id FROM pages WHERE source = ?", (source,)).fetchone()
+        if row is None:
+            return
+        # An external content index is told the exact text to remove, so this comes first
+        for fts_table, table in FTS_TABLES:
+            cursor.execute(f"INSERT INTO {fts_table} ({fts_table}, rowid, text) "
+                           f"SELECT 'delete', id, text FROM {table} WHERE page_id = ?", row)
+        for table in ("images", "items", "questions"):
+            cursor.execute(f"DELETE FROM {table} WHERE page_id = ?", row)
+        cursor.execute("DELETE FROM pages WHERE id = ?", row)
+
+    def flush(self):
+        """Commit the pages written since the last commit."""
+        if self.connection.in_transaction:
+            self.connection.execute("COMMIT")
+            logger.debug("Committed %d pages to %s", self.pending, self.path)
+        self.pending = 0
+
+    def search(self, query, item_type=None, limit=SEARCH_LIMIT):
+        """
+        Search the text of the content items, best matches first.
+        Args:
+            query (str): FTS5 query, e.g. 'nmap', '"net view"' or 'splunk AND NOT sysmon'
+            item_type (str, optional): Only return items of this type, e.g. 'code'
+            limit (int): Maximum number of results
+        Returns:
+            list: Dicts with the page source and title, the item's position, type and text,
+                and a snippet with the matches in [brackets]
+        """
+        self.flush()
+        sql = ("SELECT pages.source, pages.title, items.position, items.type, items.text, "
+               "snippet(items_fts, 0, '[', ']', '...', 12) "
+               "FROM items_fts JOIN items ON items.id = items_fts.rowid JOIN pages ON pages.id = items.page_id "
+               "WHERE items_fts MATCH ?")
+        parameters = [query]
+        if item_type is not None:
+            sql += " AND items.type = ?"
+            parameters.append(item_type)
+        sql += " ORDER BY items_fts.rank LIMIT ?"
+        parameters.append(limit)
+        keys = ("source", "title", "position", "type", "text", "snippet")
+        return [dict(zip(keys, row)) for row in self.connection.execute(sql, parameters)]
+
+    def search_questions(self, query, limit=SEARCH_LIMIT):
+        """
+        Search the questions, best matches first.
+        Args:
+            query (str): FTS5 query
+            limit (int): Maximum number of results
+        Returns:
+            list: Dicts with the page source and title, the question's position and text
+        """
+        self.flush()
+        rows = self.connection.execute(
+            "SELECT pages.source, pages.title, questions.position, questions.text "
+            "FROM questions_fts JOIN questions ON questions.id = questions_fts.rowid "
+            "JOIN pages ON pages.id = questions.page_id "
+            "WHERE questions_fts MATCH ? ORDER BY questions_fts.rank LIMIT ?", (query, limit))
+        return [dict(zip(("source", "title", "position", "text"), row)) for row in rows]
+
+    def close(self):
+        """Commit the pending pages and close the database."""
+        if self.connection is None:
+            return
+        self.flush()
+        self.connection.close()
+        self.connection = None
+        logger.info("Wrote %d pages to %s", self.pages_written, self.path)
+
+def store_page(sink, content, source=None):
+    """
+    Write a page to a sink, logging a database error instead of raising it.
+    Used by every mode, so one failing page never ends a batch run or a crawl.
+    Args:
+        sink (SQLiteOutput): Database to write to, or None when there is none
+        content (dict): Structured content from LLMStructuredExtractor
+        source (str, optional): Input file path or URL of the page
+    Returns:
+        bool: True if the page was written
+    """
+    if sink is None:
+        return False
+    try:
+        sink.write_page(content, source)
+    except sqlite3.Error as e:
+        logger.warning("Failed to store %s in %s: %s", source, sink.path, e)
+        return False
+    return True
+
+def item_text(item):
+    """
+    Return the searchable text of a content item.
+    List items are put on separate lines, table rows too with their cells separated by
+    ' | ', and images contribute their alt text.
+    Args:
+        item (dict): Content item from LLMStructuredExtractor
+    Returns:
+        str: The item's text
+    """
+    item_type = item.get("type")
+    if item_type == "list":
+        return "\n".join(element_text(list_item) for list_item in item.get("items", []))
+    if item_type == "table":
+        return "\n".join(" | ".join(element_text(cell) for cell in row) for row in item.get("rows", []))
+    if item_type == "image":
+        return item.get("alt") or ""
+    return item.get("text") or ""
+
+def element_text(elements):
+    """Join the text and image alt text of the elements of a list item or table cell."""
+    parts = []
+    for element in elements:
+        if element.get("type") == "text":
+            parts.append(element.get("content", ""))
+        elif element.get("type") == "image":
+            parts.append(element.get("alt") or "")
+    return " ".join(part for part in parts if part)
+
+def iter_images(item):
+    """Yield the image elements of a content item, including those inside list items and table cells."""
+    if item.get("type") == "image":
+        yield item
+        return
+    for elements in item.get("items", []):
+        yield from (element for element in elements if element.get("type") == "image")
+    for row in item.get("rows", []):
+        for cell in row:
+            yield from (element for element in cell if element.get("type") == "image")
@@ -0,0 +1,213 @@
+from bs4.element import NavigableString, CData, Tag
+
+# String types included in a tag's get_text(), matched exactly like BeautifulSoup does
+TEXT_STRING_TYPES = (NavigableString, CData)
+
+# Roles of the nodes that get a frame on the stack; every other node is read in one
+# pass over its descendants, which only records its strings and, inside a list item
+# or table cell, processes its images
+WALK = 'walk'            # Container whose children are dispatched in order
+LIST = 'list'            # ul/ol turned into a list item
+TABLE = 'table'          # table turned into a table item
+ROW = 'row'              # tr of a table item
+
+class TextElement:
+    """
+    Stand-in for an element that carries its precomputed text.
+    The element processors only read name, text and attributes, so handing them this
+    object lets them reuse the text collected by the traversal instead of walking the
+    element's subtree again with get_text().
+    """
+    __slots__ = ('element', 'name', 'text')
+
+    def __init__(self, element, text):
+        self.element = element
+        self.name = element.name
+        self.text = text
+
+    def get(self, key, default=None):
+        return self.element.get(key, default)
+
+class Frame:
+    """State of one open node on the traversal stack."""
+    __slots__ = ('node', 'children', 'role', 'depth', 'text_start', 'slot', 'parts', 'parent')
+
+    def __init__(self, node, role, depth, text_start, parent):
+        self.node = node
+        self.children = iter(node.contents)
+        self.role = role
+        self.depth = depth
+        self.text_start = text_start
+        self.slot = None
+        self.parts = None
+        self.parent = parent
+
+class SinglePassTraversal:
+    """
+    Linear-time traversal producing the same content items as the recursive walk of
+    LLMStructuredExtractor.
+    Every node below the container is visited exactly once: walked containers, lists,
+    tables and rows with an explicit stack, everything else in one pass over its
+    descendants. Strings are appended to one document-order list as they are reached, so the text of
+    any element is the slice of that list between entering and leaving it; the text of
+    a list item, table cell, paragraph or alert is joined once from its slice instead of
+    re-walking the subtree with get_text(). Images are processed when they are reached
+    and collected into their list item or table cell, so no find_all('img') is needed.
+    Items are reserved in document order when an element is entered and filled in when
+    it is left, which keeps a paragraph ahead of the images found inside it.
+    """
+
+    def __init__(self, extractor):
+        """
+        Args:
+            extractor (LLMStructuredExtractor): Supplies the element processors, image
+                processing, the depth policy and the container tags that are walked into
+        """
+        self.extractor = extractor
+        self.processors = extractor.element_processors
+        self.container_tags = extractor.WALKED_CONTAINER_TAGS
+
+    def run(self, container):
+        """
+        Process a content container.
+        Args:
+            container: BeautifulSoup element containing the content to process
+        Returns:
+            list: Content items, identical to the recursive walk's output
+        """
+        if self.extractor._should_stop_recursion(0):
+            return []
+        self.items = []
+        self.strings = []
+        root = self._open(container, None, WALK, 0)
+        stack = [root]
+        while stack:
+            frame = stack[-1]
+            child = next(frame.children, None)
+            if child is None:
+                stack.pop()
+                self._close(frame)
+            elif isinstance(child, Tag):
+                child_frame = self._enter(child, frame)
+                if child_frame is not None:
+                    stack.append(child_frame)
+            elif type(child) in TEXT_STRING_TYPES:
+                self.strings.append(child)
+        return [item for item in self.items if item]
+
+    def _open(self, node, parent, role, depth):
+        """Create the frame of a node whose role in the walk is known."""
+        if role == WALK and node.name in ('ul', 'ol'):
+            role = LIST
+        elif role == WALK and node.name == 'table':
+            role = TABLE
+        frame = Frame(node, role, depth, len(self.strings), parent)
+        if role in (LIST, TABLE):
+            frame.slot = self._reserve()
+            frame.parts = []
+        elif role == ROW:
+            frame.parts = []
+        return frame
+
+    def _enter(self, node, parent):
+        """Decide what a child element does in the walk and return its frame, if it needs one."""
+        role = parent.role
+        name = node.name
+        if role == WALK:
+            return self._enter_walked_child(node, parent)
+        if role == TABLE and name == 'tr':
+            return self._open(node, parent, ROW, parent.depth)
+        if (role == LIST and name == 'li') or (role == ROW and name in ('td', 'th')):
+            self._read_collector(node, parent)
+        else:
+            self._read_subtree(node, None)
+        return None
+
+    def _enter_walked_child(self, node, parent):
+        """Dispatch a direct child of a walked container, like _process_elements_in_order()."""
+        name = node.name
+        depth = parent.depth + 1
+        if name in ('ul', 'ol', 'table'):
+            if self.extractor._should_stop_recursion(depth):
+                self._read_subtree(node, None)
+                return None
+            return self._open(node, parent, WALK, depth)
+        if name == 'img':
+            self.items.append(self.extractor.process_image(node))
+            self._read_subtree(node, None)
+            return None
+        produces_item = self._produces_item(node)
+        if name in self.container_tags and not self.extractor._should_stop_recursion(depth):
+            frame = self._open(node, parent, WALK, depth)
+            if produces_item:
+                frame.slot = self._reserve()
+            return frame
+        if produces_item:
+            slot = self._reserve()
+            text_start = len(self.strings)
+            self._read_subtree(node, None)
+            self.items[slot] = self._process_with_text(node, text_start)
+        else:
+            self._read_subtree(node, None)
+        return None
+
+    def _close(self, frame):
+        """Finish a node once all of its descendants have been visited."""
+        role = frame.role
+        if role == LIST:
+            if frame.parts:
+                self.items[frame.slot] = {
+                    "type": "list",
+                    "list_type": "ordered" if frame.node.name == "ol" else "unordered",
+                    "items": frame.parts
+                }
+        elif role == TABLE:
+            if frame.parts:
+                self.items[frame.slot] = {"type": "table", "rows": frame.parts}
+        elif role == ROW:
+            if frame.parts:
+                frame.parent.parts.append(frame.parts)
+        elif frame.slot is not None:
+            self.items[frame.slot] = self._process_with_text(frame.node, frame.text_start)
+
+    def _read_subtree(self, node, images):
+        """
+        Visit every descendant of a node that is not walked into: record its strings and,
+        when images is a list, process its images into it.
+        """
+        strings = self.strings
+        for descendant in node.descendants:
+            if isinstance(descendant, Tag):
+                if images is not None and descendant.name == 'img':
+                    processed_image = self.extractor.process_image(descendant)
+                    if processed_image:
+                        images.append(processed_image)
+            elif type(descendant) in TEXT_STRING_TYPES:
+                strings.append(descendant)
+
+    def _read_collector(self, node, parent):
+        """Read a list item into its list or a table cell into its row."""
+        images = []
+        text_start = len(self.strings)
+        self._read_subtree(node, images)
+        content = []
+        text = "".join(self.strings[text_start:]).strip()
+        if text:
+            content.append({"type": "text", "content": text})
+        content.extend(images)
+        if content or node.name != 'li':
+            parent.parts.append(content)
+
+    def _process_with_text(self, node, text_start):
+        """Run the element's processor on the text recorded since text_start."""
+        element = TextElement(node, "".join(self.strings[text_start:]))
+        return self.extractor.process_single_element(element, self.processors)
+
+    def _produces_item(self, node):
+        """Check whether process_single_element() can return an item for this element."""
+        return node.name in self.processors or (node.name == 'div' and 'card' in node.get('class', []))
+
+    def _reserve(self):
+        """Reserve the position of an item that is filled in when its element is left."""
+        self.items.append(None)
+        return len(self.items) - 1
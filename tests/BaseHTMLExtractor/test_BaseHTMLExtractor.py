@@ -1006,3 +1006,28 @@ def test_process_content_elements_mixed_content_SCP_BHTML175():
     assert result[7]["type"] == "paragraph"
     assert result[7]["text"] == "List item 2"
 
+
+def test_unlimited_depth_walks_deep_documents_SCP_BHTML180():
+    # Create a concrete implementation of BaseHTMLExtractor for testing
+    class TestExtractor(BaseHTMLExtractor):
+        def extract_content(self):
+            pass
+        def find_main_content_container(self):
+            pass
+
+    # Nesting far beyond Python's recursion limit
+    depth = 5000
+    test_html = '<div>' + '<section><p>Level</p>' * depth + '<img src="deep.jpg">' + '</section>' * depth + '</div>'
+    container = BeautifulSoup(test_html, 'html.parser').find('div')
+
+    # max_depth=None walks every level without recursing
+    extractor = TestExtractor("<html></html>", download_images=False, max_depth=None)
+    assert extractor._should_stop_recursion(10 ** 9) == False
+    content_items = extractor.process_content_elements(container)
+    assert len(content_items) == depth + 1
+    assert content_items[-1]["type"] == "image"
+    assert content_items[-1]["src"] == "deep.jpg"
+
+    # A max_depth is still applied as a policy: depths 1 to 3 each hold one section's paragraph
+    extractor_limited = TestExtractor("<html></html>", download_images=False, max_depth=3)
+    assert len(extractor_limited.process_content_elements(container)) == 3
@@ -0,0 +1,51 @@
+import io
+import os
+import src.batch_runner as batch
+
+OPTIONS = {"format": "json", "download_images": False, "image_dir": None}
+
+def test_read_input_lines_SCP_BATCH005():
+    # Blank lines and '#' comments are skipped, entries are stripped
+    stream = io.StringIO("# pages to extract\n\npages/one.html\n   \n  https://academy.hackthebox.com/module/1  \n"
+                         "  # indented comment\npages/two.html\n")
+    assert batch.read_input_lines(stream) == ["pages/one.html", "https://academy.hackthebox.com/module/1",
+                                              "pages/two.html"]
+
+def test_output_names_SCP_BATCH010(tmp_path):
+    # Files keep their base name, URLs use host and path, and duplicate stems are numbered
+    assert batch.build_output_name("pages/module one.html") == "module_one"
+    assert batch.build_output_name("https://academy.hackthebox.com/module/1/section/2") == \
+        "academy.hackthebox.com_module_1_section_2"
+    assert batch.build_output_name("https://academy.hackthebox.com/") == "academy.hackthebox.com"
+
+    output_dir = str(tmp_path)
+    paths = batch.assign_output_paths(["a/page.html", "b/page.html", "https://example.com/x", "c/page.htm"],
+                                      output_dir, "jsonl")
+    assert paths == [os.path.join(output_dir, name) for name in
+                     ("page.jsonl", "page-2.jsonl", "example.com_x.jsonl", "page-3.jsonl")]
+    assert batch.assign_output_paths(["page.html"], output_dir, "text") == [os.path.join(output_dir, "page.txt")]
+
+def test_unreadable_input_fails_SCP_BATCH015(tmp_path):
+    # An input that cannot be read gives a failure record and no output file
+    output_path = str(tmp_path / "missing.json")
+    result = batch.extract_batch_item(str(tmp_path / "missing.html"), output_path, OPTIONS)
+    assert result["status"] == "failed"
+    assert result["error"] == "could not read input"
+    assert result["output"] == output_path and result["seconds"] >= 0
+    assert not os.path.exists(output_path)
+
+def test_batch_summary_totals_SCP_BATCH020():
+    # The summary has one line per page and totals over all of them
+    results = [
+        {"input": "one.html", "output": "out/one.json", "status": "ok", "seconds": 0.5, "error": None,
+         "extract_cache": "hit"},
+        {"input": "two.html", "output": "out/two.json", "status": "failed", "seconds": 0.25,
+         "error": "could not read input", "extract_cache": None},
+        {"input": "three.html", "output": "out/three.json", "status": "ok", "seconds": 1.0, "error": None,
+         "extract_cache": "miss"},
+    ]
+    summary = batch.format_batch_summary(results, 1.2).splitlines()
+    assert "OK" in summary[2] and "one.html -> out/one.json" in summary[2]
+    assert "FAIL" in summary[3] and "two.html: could not read input" in summary[3]
+    assert summary[5] == "3 pages: 2 succeeded, 1 failed in 1.20s (page time 1.75s)"
+    assert summary[6] == "Extraction cache: 1 hits, 1 misses"
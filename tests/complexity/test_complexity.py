@@ -0,0 +1,98 @@
+import os
+import gc
+import math
+import time
+import pytest
+from benchmarks.synthetic_page import generate_page
+from src.BaseHTMLExtractor import BaseHTMLExtractor
+from src.LLMStructuredExtractor import LLMStructuredExtractor
+
+pytestmark = pytest.mark.complexity
+
+# Input sizes are multiplied by this; HTB_COMPLEXITY_SCALE=1 runs the full sizes (e.g. 100k list items)
+SCALE = float(os.environ.get('HTB_COMPLEXITY_SCALE', '0.05'))
+# Highest accepted growth exponent: time ~ n^1 is linear, n^2 quadratic
+MAX_EXPONENT = 1.3
+REPEAT = 3
+
+class ContainerExtractor(BaseHTMLExtractor):
+    """Minimal concrete BaseHTMLExtractor walking the training-module container"""
+    def find_main_content_container(self):
+        return self.soup.find('div', class_='training-module')
+
+    def extract_content(self):
+        return self.process_content_elements(self.find_main_content_container())
+
+def scaled(sizes):
+    return [max(1, int(size * SCALE)) for size in sizes]
+
+def page(body):
+    return f'<html><body><div class="training-module">{body}</div></body></html>'
+
+def deep_lists(depth):
+    return page('<ul><li>item text <img src="a.png">' * depth + '</li></ul>' * depth)
+
+def wide_list(items):
+    return page('<ul>' + '<li><p>item <b>text</b></p></li>' * items + '</ul>')
+
+def wide_table(cells):
+    row = '<tr>' + '<td>cell <img src="a.png"></td>' * (cells // 4) + '</tr>'
+    return page('<table>' + row * 4 + '</table>')
+
+def deep_sections(depth):
+    return page('<section><p>paragraph text</p>' * depth + '</section>' * depth)
+
+def synthetic(sections):
+    return generate_page(sections=sections, images=sections)
+
+def fit_growth_exponent(sizes, timings):
+    """Least-squares slope of log(time) against log(size)"""
+    xs = [math.log(size) for size in sizes]
+    ys = [math.log(timing) for timing in timings]
+    mean_x, mean_y = sum(xs) / len(xs), sum(ys) / len(ys)
+    return (sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) /
+            sum((x - mean_x) ** 2 for x in xs))
+
+def time_extraction(extractor_class, html_content, max_depth):
+    """Best time of extract_content() over REPEAT runs; parsing is not timed"""
+    timings = []
+    for _ in range(REPEAT):
+        extractor = extractor_class(html_content, download_images=False, max_depth=max_depth)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            extractor.extract_content()
+            timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return min(timings)
+
+INPUTS = {
+    'deep_lists': (deep_lists, [100, 200, 400, 800], 5),
+    'wide_list': (wide_list, scaled([12500, 25000, 50000, 100000]), 5),
+    'wide_table': (wide_table, scaled([5000, 10000, 20000, 40000]), 5),
+    'deep_sections_unlimited': (deep_sections, [250, 500, 1000, 2000], None),
+    'synthetic_pages': (synthetic, scaled([200, 400, 800, 1600]), 5)
+}
+
+@pytest.mark.parametrize('extractor_class', [ContainerExtractor, LLMStructuredExtractor],
+                         ids=['BaseHTMLExtractor', 'LLMStructuredExtractor'])
+@pytest.mark.parametrize('input_name', list(INPUTS))
+def test_extraction_time_grows_near_linearly_SCP_CPLX005(input_name, extractor_class):
+    # Extraction time on growing pathological inputs must not trend worse than linear
+    build_html, sizes, max_depth = INPUTS[input_name]
+    timings = [time_extraction(extractor_class, build_html(size), max_depth) for size in sizes]
+
+    exponent = fit_growth_exponent(sizes, timings)
+
+    assert exponent <= MAX_EXPONENT, (
+        f"{input_name} grows as n^{exponent:.2f}: " +
+        ", ".join(f"{size}: {timing * 1000:.1f} ms" for size, timing in zip(sizes, timings)))
+
+def test_fit_detects_quadratic_growth_SCP_CPLX010():
+    # The fitted exponent is 1 for linear and 2 for quadratic timings
+    sizes = [100, 200, 400, 800]
+    assert fit_growth_exponent(sizes, [size * 1e-6 for size in sizes]) == pytest.approx(1.0)
+    assert fit_growth_exponent(sizes, [size ** 2 * 1e-9 for size in sizes]) == pytest.approx(2.0)
+    assert fit_growth_exponent(sizes, [size ** 2 * 1e-9 for size in sizes]) > MAX_EXPONENT
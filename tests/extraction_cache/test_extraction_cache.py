@@ -0,0 +1,102 @@
+import json
+import pytest
+import src.LLMStructuredExtractor as llm_extractor
+import src.batch_runner as batch
+from src.extraction_cache import ExtractionCache, configure_extraction_cache, disable_extraction_cache
+from src.LLMStructuredExtractor import extract_structured_content_from_html
+
+EXAMPLE_PAGE = 'tests/examples/example_page.html'
+EXAMPLE_OUTPUT = 'tests/examples/output.json'
+
+@pytest.fixture
+def example_html():
+    with open(EXAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def forbid_parsing(monkeypatch):
+    # Any attempt to build an extractor (and so a soup) fails the test
+    def fail(*args, **kwargs):
+        raise AssertionError("the page was parsed")
+    monkeypatch.setattr(llm_extractor, 'LLMStructuredExtractor', fail)
+
+def test_hit_returns_result_without_parsing_SCP_XCACHE005(tmp_path, monkeypatch, example_html):
+    # A second extraction of the same HTML comes from the cache and never builds a soup
+    cache = ExtractionCache(str(tmp_path))
+    with open(EXAMPLE_OUTPUT, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    first = extract_structured_content_from_html(example_html, base_url=EXAMPLE_PAGE,
+                                                 download_images=False, cache=cache)
+    forbid_parsing(monkeypatch)
+    second = extract_structured_content_from_html(example_html, base_url=EXAMPLE_PAGE,
+                                                  download_images=False, cache=cache)
+
+    assert first == second == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_key_depends_on_html_version_and_options_SCP_XCACHE010():
+    # Changing the HTML, the extractor version or any option gives a different key
+    options = {'base_url': 'https://example.com/a', 'download_images': False, 'image_output_dir': 'images'}
+    key = ExtractionCache.make_key('<p>a</p>', '1', options)
+
+    assert key == ExtractionCache.make_key('<p>a</p>', '1', dict(reversed(list(options.items()))))
+    assert key != ExtractionCache.make_key('<p>b</p>', '1', options)
+    assert key != ExtractionCache.make_key('<p>a</p>', '2', options)
+    assert key != ExtractionCache.make_key('<p>a</p>', '1', dict(options, image_output_dir='other'))
+
+def test_missing_image_invalidates_entry_SCP_XCACHE015(tmp_path):
+    # A cached result whose downloaded image was deleted is not reused
+    image = tmp_path / 'image.png'
+    image.write_bytes(b'png')
+    cache = ExtractionCache(str(tmp_path / 'cache'))
+    content = {"title": "T", "content": [{"type": "list", "list_type": "unordered", "items": [[
+        {"type": "image", "src": "image.png", "alt": "", "local_path": str(image)}]]}]}
+    cache.save('key', content, '1')
+
+    assert cache.lookup('key', check_images=True) == content
+    image.unlink()
+    assert cache.lookup('key', check_images=True) is None
+    assert cache.lookup('key') == content
+
+def test_failed_image_download_is_retried_SCP_XCACHE025(tmp_path):
+    # A result with an image that could not be saved is not cached, so the next run tries it again
+    page = tmp_path / 'page' / 'page.html'
+    page.parent.mkdir()
+    html_content = '<html><body><div class="training-module"><p>Diagram</p><img src="./diagram.png" alt="D"></div></body></html>'
+    page.write_text(html_content, encoding='utf-8')
+    cache = ExtractionCache(str(tmp_path / 'cache'))
+
+    def extract():
+        content = extract_structured_content_from_html(html_content, base_url=str(page), download_images=True,
+                                                       image_output_dir=str(tmp_path / 'images'), cache=cache)
+        return content["content"][1]["local_path"]
+
+    assert extract() is None
+    assert extract() is None
+    assert (cache.hits, cache.misses) == (0, 2)
+    (page.parent / 'diagram.png').write_bytes(b'png')
+    local_path = extract()
+    assert local_path is not None
+    assert extract() == local_path
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # Entries stored with a failed image, e.g. by an earlier version, are not used either
+    cache.save('old', {"title": "T", "content": [{"type": "image", "src": "x.png", "alt": "", "local_path": None}]}, '1')
+    assert cache.lookup('old', check_images=True) is None
+    assert cache.lookup('old') is not None
+
+def test_batch_summary_reports_hits_and_misses_SCP_XCACHE020(tmp_path, example_html):
+    # A repeated batch run is served from the cache and the summary says so
+    for name in ('a.html', 'b.html'):
+        (tmp_path / name).write_text(example_html, encoding='utf-8')
+    inputs = [str(tmp_path / 'a.html'), str(tmp_path / 'b.html')]
+    options = {"format": "text", "download_images": False, "image_dir": None}
+    configure_extraction_cache(str(tmp_path / 'cache'))
+    try:
+        first = batch.run_batch(inputs, str(tmp_path / 'out'), options)
+        second = batch.run_batch(inputs, str(tmp_path / 'out'), options)
+    finally:
+        disable_extraction_cache()
+
+    assert [r["extract_cache"] for r in first] == ["miss", "miss"]
+    assert [r["extract_cache"] for r in second] == ["hit", "hit"]
+    assert "Extraction cache: 2 hits, 0 misses" in batch.format_batch_summary(second, 0.1)
@@ -0,0 +1,59 @@
+import io
+import json
+import types
+import tracemalloc
+from src.format_for_llm_structured import (format_for_llm_structured, write_llm_structured,
+                                           format_content_items)
+
+EXAMPLE_OUTPUT_JSON = 'tests/examples/output.json'
+EXAMPLE_OUTPUT_TEXT = 'tests/examples/output.txt'
+
+class CountingStream:
+    """Text stream that only counts what is written to it"""
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+def build_large_content(paragraphs):
+    return {
+        "title": "Large Module",
+        "content": [{"type": "paragraph", "text": f"Paragraph {i} " + "x" * 200} for i in range(paragraphs)],
+        "questions": ["What is the answer?"]
+    }
+
+def test_streamed_output_matches_joined_output_SCP_FMT005():
+    # Writing to a stream must produce the golden text byte for byte
+    with open(EXAMPLE_OUTPUT_JSON, 'r', encoding='utf-8') as f:
+        content = json.load(f)
+    with open(EXAMPLE_OUTPUT_TEXT, 'r', encoding='utf-8') as f:
+        expected = f.read()
+
+    stream = io.StringIO()
+    write_llm_structured(content, stream)
+
+    assert stream.getvalue() == expected
+    assert format_for_llm_structured(content) == expected
+
+def test_content_items_are_formatted_lazily_SCP_FMT010():
+    # Items are only formatted when their lines are consumed
+    lines = format_content_items([{"type": "paragraph", "text": "first"}, {"type": "heading"}])
+
+    assert isinstance(lines, types.GeneratorType)
+    assert next(lines) == "first"
+
+def test_streaming_memory_does_not_grow_with_output_SCP_FMT015():
+    # Peak memory while streaming stays far below the size of the formatted text
+    content = build_large_content(20000)
+    stream = CountingStream()
+
+    tracemalloc.start()
+    try:
+        write_llm_structured(content, stream)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert stream.size > 4 * 1024 * 1024
+    assert peak < stream.size // 20
@@ -0,0 +1,79 @@
+import json
+import logging
+import pytest
+import src.html_parsing as html_parsing
+from src.html_parsing import resolve_parser_backend, is_parser_available
+from src.LLMStructuredExtractor import extract_structured_content_from_html, LLMStructuredExtractor
+
+EXAMPLE_PAGE = 'tests/examples/example_page.html'
+EXAMPLE_OUTPUT = 'tests/examples/output.json'
+
+@pytest.mark.parametrize('parse_mode', ['full', 'targeted'])
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml', 'html5lib'])
+def test_example_output_identical_across_backends_SCP_PARSE005(parser, parse_mode):
+    # Every installed backend must reproduce the golden JSON output exactly
+    if not is_parser_available(parser):
+        pytest.skip(f"{parser} is not installed")
+    with open(EXAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    with open(EXAMPLE_OUTPUT, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+
+    result = extract_structured_content_from_html(html_content, base_url=EXAMPLE_PAGE,
+                                                  download_images=False, parser=parser, parse_mode=parse_mode)
+
+    assert result == expected
+
+def test_auto_prefers_lxml_SCP_PARSE010(monkeypatch):
+    # auto picks lxml when it is installed and html.parser otherwise
+    monkeypatch.setattr(html_parsing, 'is_parser_available', lambda parser: True)
+    assert resolve_parser_backend('auto') == 'lxml'
+    monkeypatch.setattr(html_parsing, 'is_parser_available', lambda parser: False)
+    assert resolve_parser_backend('auto') == 'html.parser'
+
+def test_missing_backend_falls_back_SCP_PARSE015(monkeypatch):
+    # A requested backend that is not installed falls back to html.parser
+    monkeypatch.setattr(html_parsing, 'is_parser_available', lambda parser: parser == 'html.parser')
+    assert resolve_parser_backend('lxml') == 'html.parser'
+    assert resolve_parser_backend('html5lib') == 'html.parser'
+    assert resolve_parser_backend('html.parser') == 'html.parser'
+
+def test_targeted_parse_drops_other_regions_SCP_PARSE020():
+    # Only the container, questions and title are built; navigation and scripts are not
+    html_content = """
+        <html><head><title>Page</title><script>var x = 1;</script></head><body>
+        <nav><a href="/">Home</a></nav>
+        <div class="training-module"><h1>Module</h1><p>Body text</p></div>
+        <div id="questionsDiv"><label class="module-question">What?</label></div>
+        <footer>Footer</footer>
+        </body></html>
+    """
+    extractor = LLMStructuredExtractor(html_content, download_images=False, parse_mode='targeted')
+    assert extractor.soup.find('nav') is None
+    assert extractor.soup.find('script') is None
+    assert extractor.soup.find('footer') is None
+    assert extractor.extract_content() == LLMStructuredExtractor(html_content, download_images=False).extract_content()
+
+def test_targeted_parse_falls_back_to_full_SCP_PARSE025():
+    # Without an HTB container the whole document is parsed and the usual fallbacks apply
+    html_content = "<html><body><div class='content'><p>Generic page</p></div></body></html>"
+    extractor = LLMStructuredExtractor(html_content, download_images=False, parse_mode='targeted')
+    assert extractor.soup.find('body') is not None
+    assert extractor.extract_content()["content"] == [{"type": "paragraph", "text": "Generic page"}]
+
+def test_targeted_parse_needs_bs4_4_13_SCP_PARSE030(monkeypatch, caplog):
+    # Before bs4 4.13 the filter hooks are never called, so the page is parsed in full with a warning
+    html_content = "<html><body><nav>Menu</nav><div class='training-module'><p>Body</p></div></body></html>"
+    monkeypatch.setattr(html_parsing, '_warned_old_bs4', False)
+    monkeypatch.setattr(html_parsing.bs4, '__version__', '4.12.3')
+    assert html_parsing.bs4_version() == (4, 12, 3)
+    with caplog.at_level(logging.WARNING, logger='src.html_parsing'):
+        extractor = LLMStructuredExtractor(html_content, download_images=False, parse_mode='targeted')
+        LLMStructuredExtractor(html_content, download_images=False, parse_mode='targeted')
+    assert extractor.soup.find('nav') is not None
+    assert [record.getMessage() for record in caplog.records] == \
+        ["Targeted parsing needs beautifulsoup4 >= 4.13, found 4.12.3; parsing pages in full"]
+
+    monkeypatch.setattr(html_parsing.bs4, '__version__', '4.13.0b2')
+    assert html_parsing.bs4_version() == (4, 13, 0)
+    assert html_parsing.supports_targeted_parse()
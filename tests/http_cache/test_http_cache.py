@@ -0,0 +1,109 @@
+import pytest
+from benchmarks.local_server import StandInServer, StandInHandler
+from src.fetch_html_from_url import fetch_html_from_url
+from src.http_cache import HTTPCache, parse_cache_control
+
+PAGE = b"<html><body><p>cached page</p></body></html>"
+ETAG = '"v1"'
+
+class ValidatingHandler(StandInHandler):
+    """Serves the routes with an ETag and Cache-Control and answers If-None-Match with 304"""
+
+    def do_GET(self):
+        route = self.server.routes.get(self.path)
+        if route is None or self.headers.get('If-None-Match') != ETAG:
+            self.server.record('full')
+            return super().do_GET()
+        self.server.record('requests')
+        self.server.record('not_modified')
+        self.send_response(304)
+        self.send_header('ETag', ETAG)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def send_header(self, keyword, value):
+        super().send_header(keyword, value)
+        if keyword == 'Content-Type':
+            super().send_header('ETag', ETAG)
+            super().send_header('Cache-Control', self.server.cache_control)
+
+@pytest.fixture
+def server():
+    server = StandInServer({'/page': (PAGE, 'text/html')}, handler_class=ValidatingHandler)
+    server.counters.update({'full': 0, 'not_modified': 0})
+    server.cache_control = 'max-age=0'
+    server.start()
+    yield server
+    server.stop()
+
+def test_parse_cache_control_SCP_HTTPC005():
+    # Directives are case-insensitive, max-age becomes an int and flags become True
+    directives = parse_cache_control('Public, MAX-AGE=300, no-cache')
+    assert directives == {'public': True, 'max-age': 300, 'no-cache': True}
+    assert parse_cache_control('max-age=abc')['max-age'] is None
+    assert parse_cache_control('') == {}
+
+def test_stale_entry_is_revalidated_with_etag_SCP_HTTPC010(server, tmp_path):
+    # A stale entry sends If-None-Match and reuses the cached body on 304
+    cache = HTTPCache(str(tmp_path / "cache"))
+    url = f"{server.base_url}/page"
+
+    assert fetch_html_from_url(url, cache=cache) == PAGE.decode()
+    assert fetch_html_from_url(url, cache=cache) == PAGE.decode()
+
+    assert server.counters['full'] == 1
+    assert server.counters['not_modified'] == 1
+
+def test_fresh_entry_makes_no_request_SCP_HTTPC015(server, tmp_path):
+    # Within max-age the page is served from disk without contacting the server
+    server.cache_control = 'max-age=3600'
+    url = f"{server.base_url}/page"
+    fetch_html_from_url(url, cache=HTTPCache(str(tmp_path / "cache")))
+
+    # A new cache object on the same directory models a later run
+    assert fetch_html_from_url(url, cache=HTTPCache(str(tmp_path / "cache"))) == PAGE.decode()
+    assert server.counters['requests'] == 1
+
+def test_no_store_is_not_cached_SCP_HTTPC020(server, tmp_path):
+    # Responses marked no-store are never written to the cache
+    server.cache_control = 'no-store'
+    cache = HTTPCache(str(tmp_path / "cache"))
+    fetch_html_from_url(f"{server.base_url}/page", cache=cache)
+    assert cache.lookup(f"{server.base_url}/page") is None
+
+def test_size_cap_evicts_least_recently_used_SCP_HTTPC025(tmp_path):
+    # Writing past the size cap removes the entries that were used longest ago
+    cache = HTTPCache(str(tmp_path / "cache"), max_bytes=250)
+    store = cache.store
+    for i in range(3):
+        store.put(store.make_key(f"url{i}"), {'stored_at': 0}, b"x" * 100)
+        # Reading url0 again makes url1 the least recently used entry
+        store.get(store.make_key("url0"))
+    assert store.get(store.make_key("url0")) is not None
+    assert store.get(store.make_key("url1")) is None
+    assert store.get(store.make_key("url2")) is not None
+    assert store.total_size() <= 250
+
+def test_clear_keeps_foreign_files_SCP_HTTPC030(tmp_path):
+    # Clearing a cache that shares its directory with other files only removes the cache's own files
+    shared = tmp_path / "shared"
+    (shared / "docs").mkdir(parents=True)
+    (shared / "notes.txt").write_text("keep me", encoding='utf-8')
+    (shared / "docs" / "page.html").write_text("keep me too", encoding='utf-8')
+    store = HTTPCache(str(shared)).store
+    keys = [store.make_key(f"url{i}") for i in range(5)]
+    for key in keys:
+        store.put(key, {'stored_at': 0}, b"body")
+
+    store.clear()
+    assert all(store.get(key) is None for key in keys)
+    assert store.total_size() == 0
+    assert sorted(path.name for path in shared.iterdir()) == ["docs", "notes.txt"]
+    assert (shared / "notes.txt").read_text(encoding='utf-8') == "keep me"
+    assert (shared / "docs" / "page.html").exists()
+
+    # A directory holding nothing but the cache is removed with it
+    own = HTTPCache(str(tmp_path / "own")).store
+    own.put(own.make_key("url"), {'stored_at': 0}, b"body")
+    own.clear()
+    assert not (tmp_path / "own").exists()
@@ -0,0 +1,41 @@
+import threading
+import pytest
+from src.http_transport import configure_transport, get_session, close_transport, DEFAULT_POOL_SIZE
+
+@pytest.fixture(autouse=True)
+def restore_transport():
+    yield
+    configure_transport(DEFAULT_POOL_SIZE)
+
+def test_pool_size_is_mounted_SCP_HTTPT005():
+    # Both schemes get an adapter whose pool keeps pool_size connections per host
+    configure_transport(3)
+    session = get_session()
+    for scheme in ('http://', 'https://'):
+        assert session.get_adapter(scheme + 'academy.hackthebox.com').poolmanager.connection_pool_kw['maxsize'] == 3
+
+    configure_transport(7)
+    reconfigured = get_session()
+    assert reconfigured is not session
+    assert reconfigured.get_adapter('https://academy.hackthebox.com').poolmanager.connection_pool_kw['maxsize'] == 7
+
+def test_session_is_shared_SCP_HTTPT010():
+    # Every call and every thread gets the same session until the transport is closed
+    configure_transport(4)
+    barrier = threading.Barrier(8)
+    sessions = []
+
+    def fetch_session():
+        barrier.wait()
+        sessions.append(get_session())
+
+    threads = [threading.Thread(target=fetch_session) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(sessions) == 8
+    assert all(session is get_session() for session in sessions)
+
+    close_transport()
+    assert get_session() is not sessions[0]
@@ -0,0 +1,118 @@
+import os
+import hashlib
+from bs4 import BeautifulSoup
+from benchmarks.local_server import StandInServer
+from src.image_handler import process_image_element, download_image, ImageDownloadStage
+from src.image_store import ImageStore
+from src.LLMStructuredExtractor import LLMStructuredExtractor
+
+def make_image_files(directory, count):
+    """Create small local image files to copy"""
+    paths = []
+    for i in range(count):
+        path = os.path.join(directory, f"shot_{i}.png")
+        with open(path, 'wb') as f:
+            f.write(bytes([i]) * 64)
+        paths.append(path)
+    return paths
+
+def test_download_stage_fills_local_paths_in_order_SCP_IMGH005(tmp_path):
+    # Queue local copies on a bounded pool and check every item is filled in, in document order
+    source_dir = tmp_path / "source"
+    source_dir.mkdir()
+    paths = make_image_files(str(source_dir), 12)
+    html = "".join(f'<img src="{path}" alt="Shot {i}">' for i, path in enumerate(paths))
+    output_dir = str(tmp_path / "images")
+
+    stage = ImageDownloadStage(output_dir=output_dir, max_workers=4)
+    items = [process_image_element(img, download=True, output_dir=output_dir, download_stage=stage)
+             for img in BeautifulSoup(html, 'html.parser').find_all('img')]
+
+    # Nothing is filled in until the stage is drained
+    stage.wait()
+
+    assert [item["alt"] for item in items] == [f"Shot {i}" for i in range(12)]
+    for item, path in zip(items, paths):
+        assert item["local_path"] is not None
+        with open(item["local_path"], 'rb') as copied, open(path, 'rb') as original:
+            assert copied.read() == original.read()
+
+def test_download_stage_failed_image_SCP_IMGH010(tmp_path):
+    # A missing image leaves local_path as None without failing the other downloads
+    paths = make_image_files(str(tmp_path), 1)
+    html = f'<img src="{paths[0]}"><img src="{tmp_path}/missing/nothing.png">'
+    output_dir = str(tmp_path / "images")
+
+    stage = ImageDownloadStage(output_dir=output_dir, max_workers=2)
+    items = [process_image_element(img, download=True, output_dir=output_dir, download_stage=stage)
+             for img in BeautifulSoup(html, 'html.parser').find_all('img')]
+    stage.wait()
+
+    assert items[0]["local_path"] is not None
+    assert items[1]["local_path"] is None
+
+def test_same_name_images_do_not_overwrite_SCP_IMGH015(tmp_path):
+    # Two different images both called image.png are stored as two files
+    for folder, content in (("a", b"first image"), ("b", b"second image")):
+        (tmp_path / folder).mkdir()
+        (tmp_path / folder / "image.png").write_bytes(content)
+    output_dir = str(tmp_path / "images")
+
+    first = download_image(str(tmp_path / "a" / "image.png"), output_dir=output_dir)
+    second = download_image(str(tmp_path / "b" / "image.png"), output_dir=output_dir)
+
+    assert first != second
+    assert open(first, 'rb').read() == b"first image"
+    assert open(second, 'rb').read() == b"second image"
+
+def test_identical_images_are_stored_once_SCP_IMGH020(tmp_path):
+    # The same content under two names is kept as one content-addressed file
+    for name in ("logo.png", "logo-copy.png"):
+        (tmp_path / name).write_bytes(b"same logo")
+    output_dir = str(tmp_path / "images")
+
+    first = download_image(str(tmp_path / "logo.png"), output_dir=output_dir)
+    second = download_image(str(tmp_path / "logo-copy.png"), output_dir=output_dir)
+
+    assert first == second
+    assert os.path.basename(first) == hashlib.sha256(b"same logo").hexdigest() + ".png"
+
+def test_stored_url_is_served_without_request_SCP_IMGH025(tmp_path):
+    # A URL already in the index is not downloaded again, even by a new store (a later run)
+    server = StandInServer({'/img/logo.png': (b"remote logo", 'image/png')}).start()
+    try:
+        url = f"{server.base_url}/img/logo.png"
+        output_dir = str(tmp_path / "images")
+        first = download_image(url, output_dir=output_dir)
+        second = ImageStore(output_dir).lookup(url)
+        third = download_image(url, output_dir=output_dir)
+    finally:
+        server.stop()
+
+    assert first == second == third
+    assert open(first, 'rb').read() == b"remote logo"
+    assert server.counters['requests'] == 1
+
+def test_repeated_images_are_fetched_once_per_document_SCP_IMGH030(tmp_path):
+    # The same image in a list, a table and a paragraph is downloaded once and the memo counts the repeats
+    server = StandInServer({'/img/logo.png': (b"logo", 'image/png')}).start()
+    html = f"""
+        <div class="training-module">
+            <ul><li>Item <img src="/img/logo.png" alt="Logo"></li></ul>
+            <table><tr><td>Cell <img src="/img/logo.png"></td></tr></table>
+            <p><img src="{server.base_url}/img/logo.png"></p>
+        </div>
+    """
+    try:
+        for workers in (1, 4):
+            extractor = LLMStructuredExtractor(html, base_url=server.base_url + "/module/1", image_workers=workers,
+                                               image_output_dir=str(tmp_path / f"images{workers}"))
+            content = extractor.extract_content()["content"]
+            paths = [content[0]["items"][0][1]["local_path"], content[1]["rows"][0][0][1]["local_path"],
+                     content[2]["local_path"]]
+            assert extractor.image_memo_hits == 2
+            assert paths[0] is not None and paths.count(paths[0]) == 3
+    finally:
+        server.stop()
+
+    assert server.counters['requests'] == 2
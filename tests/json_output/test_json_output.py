@@ -0,0 +1,52 @@
+import io
+import json
+import pytest
+import src.json_output as json_output
+from src.json_output import iter_jsonl_records, write_jsonl, write_json, encode_record
+
+EXAMPLE_OUTPUT = 'tests/examples/output.json'
+
+@pytest.fixture
+def example_content():
+    with open(EXAMPLE_OUTPUT, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_item_records_rebuild_the_page_SCP_JSON005(example_content):
+    # Every item and question becomes one line, and the page can be rebuilt from the lines
+    stream = io.StringIO()
+    count = write_jsonl(example_content, stream, source='page.html')
+
+    lines = stream.getvalue().splitlines()
+    records = [json.loads(line) for line in lines]
+    items = [{k: v for k, v in r.items() if k not in ('title', 'source', 'index')}
+             for r in records if r['type'] != 'question']
+    questions = [r['text'] for r in records if r['type'] == 'question']
+
+    assert count == len(lines) == len(example_content['content']) + len(example_content['questions'])
+    assert stream.getvalue().endswith("\n")
+    assert all(r['title'] == example_content['title'] and r['source'] == 'page.html' for r in records)
+    assert items == example_content['content']
+    assert questions == example_content['questions']
+
+def test_page_granularity_writes_one_record_SCP_JSON010(example_content):
+    # With page granularity the whole page is a single line
+    stream = io.StringIO()
+    write_jsonl(example_content, stream, granularity='page')
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1
+    assert json.loads(lines[0]) == example_content
+
+def test_encoders_produce_identical_lines_SCP_JSON015(example_content):
+    # orjson and the standard library encoder must write the same text
+    if json_output.orjson is None:
+        pytest.skip("orjson is not installed")
+    record = {"title": "Ünïcode — test", "text": "tab\there \"quoted\" </script>", "n": [1, None, True]}
+    for item in [record] + list(iter_jsonl_records(example_content)):
+        assert encode_record(item, 'orjson') == encode_record(item, 'json')
+
+def test_streamed_json_matches_dumps_SCP_JSON020(example_content):
+    # The json format written to a stream is the same as json.dumps with indent=2
+    stream = io.StringIO()
+    write_json(example_content, stream)
+    assert stream.getvalue() == json.dumps(example_content, indent=2)
@@ -0,0 +1,80 @@
+import io
+import sys
+import logging
+import pytest
+import src.htb_scraper_utils as su
+from src.log_config import configure_logging, verbosity_level
+from src.image_handler import process_image_element
+from src.LLMStructuredExtractor import extract_structured_content_from_html
+
+EXAMPLE_PAGE = 'tests/examples/example_page.html'
+
+class CountingStr(str):
+    """String that counts how often it is formatted into a message"""
+    formatted = 0
+
+    def __str__(self):
+        CountingStr.formatted += 1
+        return str.__str__(self)
+
+@pytest.fixture
+def log_stream():
+    root = logging.getLogger()
+    previous_level = root.level
+    stream = io.StringIO()
+    handler = None
+
+    def configure(level):
+        nonlocal handler
+        handler = configure_logging(level, stream)
+        return stream
+
+    yield configure
+    root.removeHandler(handler)
+    root.setLevel(previous_level)
+
+def test_extraction_logs_to_stream_not_stdout_SCP_LOG005(log_stream, capsys, tmp_path):
+    # Per-image details go to the log stream; nothing is written to stdout
+    stream = log_stream(logging.DEBUG)
+    with open(EXAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    extract_structured_content_from_html(html_content, base_url=EXAMPLE_PAGE, download_images=True,
+                                         image_output_dir=str(tmp_path), cache=None)
+
+    captured = capsys.readouterr()
+    assert captured.out == ''
+    log = stream.getvalue()
+    assert 'DEBUG   src.image_handler: Processing image:' in log
+    assert 'Trying path:' in log
+
+def test_verbosity_options_SCP_LOG010(log_stream, monkeypatch):
+    # --quiet and --verbose select the level and cannot be combined
+    assert verbosity_level() == logging.INFO
+    assert verbosity_level(quiet=True) == logging.WARNING
+    assert verbosity_level(verbose=True) == logging.DEBUG
+
+    stream = log_stream(verbosity_level(quiet=True))
+    logger = logging.getLogger('src.test')
+    logger.info("hidden")
+    logger.warning("shown %d", 1)
+    assert stream.getvalue().count('\n') == 1 and 'WARNING src.test: shown 1' in stream.getvalue()
+
+    monkeypatch.setattr(sys, 'argv', ['htb_scraper.py', '-f', 'page.html', '-v'])
+    assert su.parse_arguments().verbose
+    monkeypatch.setattr(sys, 'argv', ['htb_scraper.py', '-f', 'page.html', '--quiet', '--verbose'])
+    with pytest.raises(SystemExit):
+        su.parse_arguments()
+
+def test_disabled_levels_do_not_format_SCP_LOG015(log_stream):
+    # Arguments of disabled debug messages on the image path are never formatted
+    element = {'src': CountingStr('./missing.png'), 'alt': ''}
+    log_stream(logging.WARNING)
+    CountingStr.formatted = 0
+    for _ in range(100):
+        process_image_element(element, download=False)
+    assert CountingStr.formatted == 0
+
+    stream = log_stream(logging.DEBUG)
+    process_image_element(element, download=False)
+    assert CountingStr.formatted > 0
+    assert "Processing image: src='./missing.png'" in stream.getvalue()
@@ -0,0 +1,114 @@
+import json
+import pytest
+import src.metrics as metrics
+import src.batch_runner as batch
+from src.metrics import Metrics, configure_metrics, disable_metrics, get_default_metrics
+from src.LLMStructuredExtractor import extract_structured_content_from_html
+
+PAGE = """<html><body><div class="training-module">
+<h1>Title</h1><p>First</p><p>Second <img src="./pics/a.png" alt="A"></p>
+<ul><li>item <img src="./pics/missing.png"></li></ul>
+</div></body></html>"""
+
+@pytest.fixture
+def registry():
+    previous = get_default_metrics()
+    yield configure_metrics()
+    if previous is None:
+        disable_metrics()
+    else:
+        configure_metrics(previous)
+
+def write_page(tmp_path, name="page.html"):
+    (tmp_path / "pics").mkdir(exist_ok=True)
+    (tmp_path / "pics" / "a.png").write_bytes(b"image bytes")
+    path = tmp_path / name
+    path.write_text(PAGE, encoding='utf-8')
+    return str(path)
+
+def test_prometheus_text_format_SCP_MET005():
+    # Counters, gauges and cumulative histogram buckets in the text exposition format
+    registry = Metrics(buckets=(0.1, 1.0))
+    registry.inc(metrics.PAGES_TOTAL, status='ok')
+    registry.inc(metrics.PAGES_TOTAL, 2, status='ok')
+    registry.inc(metrics.IMAGES_TOTAL, result='say "hi"\n')
+    registry.set(metrics.RUN_SECONDS, 1.5)
+    for seconds in (0.05, 0.5, 5.0):
+        registry.observe(metrics.STAGE_SECONDS, seconds, stage='walk')
+
+    assert registry.to_prometheus() == "\n".join([
+        "# HELP htb_scraper_images_total Images handled, by result (downloaded, copied, reused, failed)",
+        "# TYPE htb_scraper_images_total counter",
+        'htb_scraper_images_total{result="say \\"hi\\"\\n"} 1',
+        "# HELP htb_scraper_pages_total Pages processed, by status",
+        "# TYPE htb_scraper_pages_total counter",
+        'htb_scraper_pages_total{status="ok"} 3',
+        "# HELP htb_scraper_run_duration_seconds Wall clock time of the last run",
+        "# TYPE htb_scraper_run_duration_seconds gauge",
+        "htb_scraper_run_duration_seconds 1.5",
+        "# HELP htb_scraper_stage_duration_seconds Time spent in each pipeline stage",
+        "# TYPE htb_scraper_stage_duration_seconds histogram",
+        'htb_scraper_stage_duration_seconds_bucket{stage="walk",le="0.1"} 1',
+        'htb_scraper_stage_duration_seconds_bucket{stage="walk",le="1"} 2',
+        'htb_scraper_stage_duration_seconds_bucket{stage="walk",le="+Inf"} 3',
+        'htb_scraper_stage_duration_seconds_sum{stage="walk"} 5.55',
+        'htb_scraper_stage_duration_seconds_count{stage="walk"} 3',
+    ]) + "\n"
+
+def test_snapshot_merge_round_trip_SCP_MET010(tmp_path):
+    # Worker snapshots survive JSON and add up in the parent registry
+    worker = Metrics()
+    worker.inc(metrics.ELEMENTS_TOTAL, 4, type='paragraph')
+    worker.observe(metrics.STAGE_SECONDS, 0.02, stage='parse')
+    parent = Metrics()
+    parent.inc(metrics.ELEMENTS_TOTAL, 1, type='paragraph')
+    parent.merge(json.loads(json.dumps(worker.snapshot())))
+    parent.merge(worker.snapshot())
+
+    assert parent.value(metrics.ELEMENTS_TOTAL, type='paragraph') == 9
+    assert parent.snapshot()["histograms"][0]["count"] == 2
+
+    path = tmp_path / "run.json"
+    parent.write(str(path), 'json')
+    assert json.loads(path.read_text()) == parent.snapshot()
+    with pytest.raises(ValueError):
+        Metrics(buckets=(1.0,)).merge(worker.snapshot())
+
+def test_extraction_records_metrics_SCP_MET015(registry, tmp_path):
+    # Elements, image results and stage latencies are recorded while a page is extracted
+    page_path = write_page(tmp_path)
+    with open(page_path, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    content = extract_structured_content_from_html(html_content, base_url=page_path,
+                                                   image_output_dir=str(tmp_path / "images"), cache=None)
+
+    for item_type in ("heading", "paragraph", "image", "list"):
+        expected = sum(1 for item in content["content"] if item["type"] == item_type)
+        assert registry.value(metrics.ELEMENTS_TOTAL, type=item_type) == expected
+    assert registry.value(metrics.IMAGES_TOTAL, result='copied') == 1
+    assert registry.value(metrics.IMAGES_TOTAL, result='failed') == 1
+    stages = {series["labels"]["stage"]: series["count"] for series in registry.snapshot()["histograms"]}
+    assert stages == {"parse": 1, "walk": 1, "image": 2}
+
+def test_disabled_metrics_record_nothing_SCP_MET020(tmp_path):
+    # Without configure_metrics() the instrumentation is a no-op
+    disable_metrics()
+    page_path = write_page(tmp_path)
+    with open(page_path, 'r', encoding='utf-8') as f:
+        extract_structured_content_from_html(f.read(), base_url=page_path,
+                                             image_output_dir=str(tmp_path / "images"), cache=None)
+    assert get_default_metrics() is None
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_workers_merge_into_parent_SCP_MET025(registry, tmp_path, workers):
+    # Each page's metrics come back with its result and are merged into the parent registry
+    inputs = [write_page(tmp_path, f"page-{i}.html") for i in range(3)]
+    options = {"format": "json", "download_images": False, "image_dir": str(tmp_path / "images"),
+               "metrics": True}
+    results = batch.run_batch(inputs, str(tmp_path / "out"), options, workers=workers)
+
+    assert all(result["status"] == "ok" for result in results)
+    assert registry.value(metrics.PAGES_TOTAL, status='ok') == 3
+    assert registry.value(metrics.ELEMENTS_TOTAL, type='heading') == 3
+    stages = {series["labels"]["stage"]: series["count"] for series in registry.snapshot()["histograms"]}
+    assert stages["parse"] == 3 and stages["walk"] == 3 and stages["format"] == 3
@@ -0,0 +1,173 @@
+import sys
+import time
+import logging
+import threading
+import pytest
+from benchmarks.local_server import StandInServer, StandInHandler
+from src.module_crawler import ModuleCrawler, CrawlScope, normalize_url
+import src.htb_scraper_utils as su
+import src.batch_runner as batch
+import htb_scraper
+
+EXAMPLE_PAGE = 'tests/examples/example_page.html'
+SITE = 'https://academy.hackthebox.com'
+# Sections of module 218 linked from the example page
+SECTIONS = ['2356', '2357', '2358', '2388', '2389', '2390']
+
+class TrackingHandler(StandInHandler):
+    """Serves the routes slowly and records when each request starts and how many overlap"""
+    def do_GET(self):
+        server = self.server
+        with server.tracking_lock:
+            server.starts.append(time.monotonic())
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.response_delay)
+            super().do_GET()
+        finally:
+            with server.tracking_lock:
+                server.in_flight -= 1
+
+def start_site(routes=None, response_delay=0.0):
+    server = StandInServer({}, handler_class=TrackingHandler)
+    server.tracking_lock = threading.Lock()
+    server.starts = []
+    server.in_flight = server.max_in_flight = 0
+    server.response_delay = response_delay
+    server.routes.update(routes or module_routes(server.base_url))
+    return server.start()
+
+def module_routes(base_url):
+    """The example page served as every section of module 218, with its links pointing at the stand-in site"""
+    with open(EXAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        body = f.read().replace(SITE, base_url).encode('utf-8')
+    return {f"/module/218/section/{section}": (body, 'text/html') for section in SECTIONS}
+
+def chain_page(title, *links):
+    anchors = "".join(f'<a href="{link}">link</a>' for link in links)
+    return (f'<html><body><div class="training-module"><h1>{title}</h1><p>{title} text</p>'
+            f'{anchors}</div></body></html>').encode('utf-8'), 'text/html'
+
+def crawl(server, entry_path, **options):
+    pages = {}
+    crawler = ModuleCrawler(**dict({'delay': 0, 'download_images': False}, **options))
+    records = crawler.crawl(server.base_url + entry_path, on_page=lambda record, content: pages.update(
+        {record["input"]: content}))
+    return records, pages
+
+def test_crawls_every_section_of_the_module_SCP_CRAWL005():
+    # Every section linked from the entry page is fetched once and extracted
+    server = start_site()
+    try:
+        records, pages = crawl(server, '/module/218/section/2356', depth=2, concurrency=3)
+    finally:
+        server.stop()
+
+    urls = [record["input"] for record in records]
+    assert sorted(urls) == sorted(f"{server.base_url}/module/218/section/{section}" for section in SECTIONS)
+    assert [record["depth"] for record in records] == [0, 1, 1, 1, 1, 1]
+    assert all(record["status"] == "ok" for record in records)
+    assert server.counters['requests'] == len(SECTIONS)
+    assert all(content["title"] and content["content"] for content in pages.values())
+
+def test_depth_limit_scope_and_failures_SCP_CRAWL010():
+    # Links are followed breadth first up to the depth limit and only inside the module
+    routes = {
+        '/module/7/section/1': chain_page('One', '../section/2/', '#top', '/module/7/section/99',
+                                          '/module/8/section/1', 'mailto:someone@example.com'),
+        '/module/7/section/2': chain_page('Two', '/module/7/section/3', '/module/7/section/1'),
+        '/module/7/section/3': chain_page('Three', '/module/7/section/4'),
+        '/module/7/section/4': chain_page('Four'),
+        '/module/8/section/1': chain_page('Other module')
+    }
+    server = start_site(routes)
+    try:
+        records, pages = crawl(server, '/module/7/section/1', depth=2)
+    finally:
+        server.stop()
+
+    summary = [(record["input"][len(server.base_url):], record["depth"], record["status"]) for record in records]
+    assert summary == [('/module/7/section/1', 0, 'ok'), ('/module/7/section/2', 1, 'ok'),
+                       ('/module/7/section/99', 1, 'failed'), ('/module/7/section/3', 2, 'ok')]
+    assert pages[f"{server.base_url}/module/7/section/99"] is None
+    assert pages[f"{server.base_url}/module/7/section/3"]["title"] == 'Three'
+
+def test_concurrency_limit_SCP_CRAWL015():
+    # No more pages than the concurrency limit are fetched at once
+    server = start_site(response_delay=0.1)
+    try:
+        records, _ = crawl(server, '/module/218/section/2356', depth=1, concurrency=2)
+    finally:
+        server.stop()
+
+    assert len(records) == len(SECTIONS)
+    assert server.max_in_flight == 2
+
+def test_politeness_delay_per_host_SCP_CRAWL020():
+    # Requests to one host start at least the politeness delay apart, whatever the concurrency
+    delay = 0.1
+    server = start_site()
+    try:
+        crawl(server, '/module/218/section/2356', depth=1, concurrency=4, delay=delay)
+    finally:
+        server.stop()
+
+    starts = sorted(server.starts)
+    assert len(starts) == len(SECTIONS)
+    # The entry page starts the first slot, then the five sections one slot each
+    assert starts[-1] - starts[0] >= (len(SECTIONS) - 1) * delay * 0.9
+
+def test_normalize_url_SCP_CRAWL025():
+    # Equivalent spellings of a link normalize to one URL; non-http links are dropped
+    base = 'https://academy.hackthebox.com/module/218/section/2356'
+    for link in ('2389', './2389/', '2389#questionsDiv', 'HTTPS://Academy.HackTheBox.com:443/module/218/section/2389',
+                 '/module/218/section/../section/2389'):
+        assert normalize_url(link, base) == 'https://academy.hackthebox.com/module/218/section/2389'
+    assert normalize_url('?page=2', base) == base + '?page=2'
+    assert normalize_url('http://host:8080/a/', None) == 'http://host:8080/a'
+    assert normalize_url('javascript: void(0);', base) is None
+    assert normalize_url('mailto:a@b.c', base) is None
+
+    scope = CrawlScope('https://academy.hackthebox.com/module/details/218')
+    assert scope.contains('https://academy.hackthebox.com/module/218/section/2390')
+    assert not scope.contains('https://academy.hackthebox.com/module/cheatsheet/218')
+    assert not scope.contains('https://academy.hackthebox.com/module/2180/section/1')
+    assert not scope.contains('https://example.com/module/218/section/2390')
+    with pytest.raises(ValueError):
+        ModuleCrawler().crawl('academy.hackthebox.com/module/218')
+
+def test_targeted_parse_warns_in_crawl_mode_SCP_CRAWL030(tmp_path, monkeypatch, caplog):
+    # Crawl pages are always fully parsed, so --targeted-parse is reported as ignored
+    server = start_site({'/module/7/section/1': chain_page('One')})
+    try:
+        monkeypatch.setattr(sys, 'argv', ['htb_scraper.py', '--crawl', server.base_url + '/module/7/section/1',
+                                          '--crawl-depth', '0', '--crawl-delay', '0', '--targeted-parse',
+                                          '--output-dir', str(tmp_path / 'out'), '--image-dir', str(tmp_path / 'img')])
+        with caplog.at_level(logging.WARNING, logger='htb_scraper'):
+            htb_scraper.run_crawl_mode(su.parse_arguments())
+    finally:
+        server.stop()
+
+    assert any("--targeted-parse is ignored in crawl mode" in record.getMessage() for record in caplog.records)
+    outputs = [path.name for path in (tmp_path / 'out').iterdir()]
+    assert len(outputs) == 1 and outputs[0].endswith('_module_7_section_1.json')
+
+def test_unwritable_output_fails_the_page_SCP_CRAWL035(tmp_path, monkeypatch, capsys):
+    # A page whose output file cannot be written is reported as failed, not succeeded
+    server = start_site({'/module/7/section/1': chain_page('One', '/module/7/section/2'),
+                         '/module/7/section/2': chain_page('Two')})
+    try:
+        blocked = tmp_path / 'out' / (batch.build_output_name(server.base_url + '/module/7/section/1') + '.json')
+        blocked.mkdir(parents=True)
+        monkeypatch.setattr(sys, 'argv', ['htb_scraper.py', '--crawl', server.base_url + '/module/7/section/1',
+                                          '--crawl-depth', '1', '--crawl-delay', '0',
+                                          '--output-dir', str(tmp_path / 'out'), '--image-dir', str(tmp_path / 'img')])
+        htb_scraper.run_crawl_mode(su.parse_arguments())
+    finally:
+        server.stop()
+
+    summary = capsys.readouterr().out
+    assert "FAIL" in summary and "Is a directory" in summary
+    assert "2 pages: 1 succeeded, 1 failed" in summary
+    assert (tmp_path / 'out' / (batch.build_output_name(server.base_url + '/module/7/section/2') + '.json')).is_file()
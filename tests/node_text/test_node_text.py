@@ -0,0 +1,59 @@
+import random
+from bs4 import BeautifulSoup
+from src.node_text import NodeTextCache, use_text_cache, stripped_text, normalized_text
+
+FIXTURES = ['tests/examples/example_page.html', 'tests/test_complex.html', 'tests/test_image.html',
+            'tests/test_order.html']
+TEST_HTML = """
+<div class="card"><div class="card-body">
+    <p>Alert   <b>bold</b>
+    text<!-- comment --></p>
+    <script>var hidden = 1;</script><template><p>template</p></template>
+    <ul><li>First <code>item</code></li><li><![CDATA[data]]> second</li></ul>
+</div></div>
+"""
+
+def test_text_matches_get_text_SCP_NTEXT005():
+    # Whatever order elements are read in, every text equals get_text()
+    for path in FIXTURES:
+        with open(path, 'r', encoding='utf-8') as f:
+            soup = BeautifulSoup(f.read(), 'html.parser')
+        elements = soup.find_all(True)
+        for order in ['document', 'reversed', 'shuffled']:
+            if order == 'reversed':
+                elements = elements[::-1]
+            elif order == 'shuffled':
+                random.Random(0).shuffle(elements)
+            cache = NodeTextCache()
+            for element in elements:
+                assert cache.text(element) == element.get_text(), (path, order, element.name)
+                assert cache.stripped(element) == element.get_text().strip()
+
+def test_reads_are_shared_SCP_NTEXT010():
+    # A repeated read, an ancestor of read elements and a descendant of a read element walk nothing again
+    soup = BeautifulSoup(TEST_HTML, 'html.parser')
+    cache = NodeTextCache()
+    first_item = soup.find('li')
+    assert cache.stripped(first_item) == "First item"
+    assert cache.stripped(first_item) == "First item"
+    assert (cache.built, cache.reused) == (1, 1)
+
+    card = soup.find('div', class_='card')
+    assert cache.normalized(card) == "Alert bold text First itemdata second"
+    assert cache.reused == 2  # the first list item was spliced in
+    paragraph = soup.find('p')
+    assert cache.normalized(paragraph) == "Alert bold text"
+    assert cache.reused == 3  # joined from its span of the card's text
+    assert cache.built == 3
+
+def test_module_helpers_use_active_cache_SCP_NTEXT015():
+    # Without an active cache the helpers read the element; inside use_text_cache() they go through it
+    soup = BeautifulSoup(TEST_HTML, 'html.parser')
+    paragraph = soup.find('p')
+    assert normalized_text(paragraph) == "Alert bold text"
+    cache = NodeTextCache()
+    with use_text_cache(cache):
+        assert normalized_text(paragraph) == "Alert bold text"
+        assert stripped_text(soup.find('script')) == "var hidden = 1;"
+    assert cache.built == 1
+    assert stripped_text(paragraph) == paragraph.get_text().strip()
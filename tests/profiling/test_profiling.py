@@ -0,0 +1,75 @@
+import io
+import sys
+import time
+import pstats
+import threading
+from src.profiling import StackSampler, collapse_stack, profile_run
+
+def busy_extraction(seconds):
+    # Stand-in for a pipeline stage: burns CPU long enough to be sampled
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(1000))
+    return total
+
+def read_collapsed(path):
+    stacks = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            stack, count = line.rstrip('\n').rsplit(' ', 1)
+            stacks[stack] = int(count)
+    return stacks
+
+def test_profile_run_writes_prof_and_collapsed_SCP_PROF005(tmp_path):
+    # The .prof file is readable by pstats and the collapsed file holds the profiled function's stacks
+    prefix = str(tmp_path / 'profiles' / 'run')
+    report = io.StringIO()
+    with profile_run(prefix, stream=report):
+        busy_extraction(0.2)
+
+    stats = pstats.Stats(f"{prefix}.prof")
+    assert any(function == 'busy_extraction' for _, _, function in stats.stats)
+
+    stacks = read_collapsed(f"{prefix}.collapsed")
+    assert stacks and all(count > 0 for count in stacks.values())
+    sampled = [stack for stack in stacks if 'busy_extraction (test_profiling.py:' in stack]
+    assert sampled
+    assert all(stack.startswith('MainThread;') for stack in sampled)
+    assert all('test_profile_run_writes_prof_and_collapsed_SCP_PROF005' in stack for stack in sampled)
+
+    output = report.getvalue()
+    assert f"{prefix}.prof" in output and f"{prefix}.collapsed" in output
+    assert 'busy_extraction' in output
+
+def test_sampler_sees_other_threads_SCP_PROF010(tmp_path):
+    # Worker threads, which cProfile does not record, appear under their own name
+    sampler = StackSampler(0.001)
+    worker = threading.Thread(target=busy_extraction, args=(0.2,), name='image-download-0')
+    sampler.start()
+    worker.start()
+    worker.join()
+    sampler.stop()
+
+    assert sampler.samples > 0
+    assert any(stack.startswith('image-download-0;') and
+               stack.rsplit(';', 1)[-1].startswith('busy_extraction (test_profiling.py:')
+               for stack in sampler.stacks)
+    assert not any(stack.startswith('htb-stack-sampler') for stack in sampler.stacks)
+
+    path = tmp_path / 'out.collapsed'
+    sampler.write_collapsed(str(path))
+    assert read_collapsed(str(path)) == dict(sampler.stacks)
+
+def test_collapse_stack_escapes_separators_SCP_PROF015():
+    # Frames are ordered outermost first and semicolons cannot split a frame
+    def inner():
+        return collapse_stack('main;thread', sys._getframe())
+
+    def outer():
+        return inner()
+
+    frames = outer().split(';')
+    assert frames[0] == 'main:thread'
+    assert frames[-2].startswith('outer (test_profiling.py:')
+    assert frames[-1].startswith('inner (test_profiling.py:')
@@ -0,0 +1,131 @@
+import email.utils
+import time
+import socket
+import pytest
+import requests
+import src.request_scheduler as request_scheduler
+from benchmarks.local_server import StandInServer, StandInHandler
+from src.request_scheduler import RequestScheduler, TokenBucket, parse_retry_after
+from src.fetch_html_from_url import fetch_html_from_url
+from src.image_handler import download_image
+
+class FlakyHandler(StandInHandler):
+    """Answers the first requests to each path with the server's failure status, then serves the route"""
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?')[0]
+        failures = server.failures_left.get(path, 0)
+        if failures:
+            server.failures_left[path] = failures - 1
+            server.record('requests')
+            self.send_response(server.failure_status)
+            for name, value in server.failure_headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        super().do_GET()
+
+def start_flaky(routes, failures, status=503, headers=None):
+    server = StandInServer(routes, handler_class=FlakyHandler)
+    server.failures_left = dict(failures)
+    server.failure_status = status
+    server.failure_headers = headers or {}
+    return server.start()
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def sleeps():
+    """Install a shared scheduler that records its waits instead of sleeping"""
+    waits = []
+    request_scheduler.configure_scheduler(sleep=waits.append)
+    yield waits
+    request_scheduler.configure_scheduler()
+
+def test_token_bucket_hands_out_consecutive_slots_SCP_RSCH005():
+    # A burst starts at once, then every request waits one slot longer; pauses hold everything back
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock)
+    assert [bucket.reserve() for _ in range(5)] == [0, 0, 0.5, 1.0, 1.5]
+    clock.now += 10
+    assert bucket.reserve() == 0
+    bucket.pause(3)
+    assert bucket.reserve() == 3
+    assert TokenBucket(rate=None, clock=clock).reserve() == 0
+
+def test_retries_transient_statuses_SCP_RSCH010(sleeps):
+    # Two 503s are retried with growing backoff and the page is fetched on the third attempt
+    server = start_flaky({'/page': (b"<html>ok</html>", 'text/html')}, {'/page': 2})
+    try:
+        assert fetch_html_from_url(f"{server.base_url}/page", cache=None) == "<html>ok</html>"
+    finally:
+        server.stop()
+    assert server.counters['requests'] == 3
+    assert len(sleeps) == 2
+    assert 0 <= sleeps[0] <= 0.5 and 0 <= sleeps[1] <= 1.0
+
+def test_retry_after_is_honored_SCP_RSCH015(sleeps):
+    # A 429 with Retry-After waits at least that long and pauses the host for other requests
+    server = start_flaky({'/img/a.png': (b"image", 'image/png')}, {'/img/a.png': 1}, status=429,
+                         headers={'Retry-After': '7'})
+    try:
+        scheduler = request_scheduler.get_scheduler()
+        response = scheduler.get(f"{server.base_url}/img/a.png")
+        host_bucket = scheduler.bucket(server.base_url.split('//')[1])
+    finally:
+        server.stop()
+    assert response.status_code == 200 and response.content == b"image"
+    assert sleeps == [pytest.approx(7.0, abs=0.5)]
+    assert host_bucket.paused_until > time.monotonic() + 6
+
+def test_gives_up_after_max_retries_SCP_RSCH020(tmp_path):
+    # The last failure is returned or raised; 404s and long Retry-After values are not retried
+    waits = []
+    server = start_flaky({'/page': (b"ok", 'text/html')}, {'/page': 10}, status=502)
+    try:
+        scheduler = RequestScheduler(max_retries=2, sleep=waits.append)
+        assert scheduler.get(f"{server.base_url}/page").status_code == 502
+        assert server.counters['requests'] == 3
+        server.reset_counters()
+        assert scheduler.get(f"{server.base_url}/missing").status_code == 404
+        assert server.counters['requests'] == 1
+        server.failure_headers = {'Retry-After': '3600'}
+        server.reset_counters()
+        assert scheduler.get(f"{server.base_url}/page").status_code == 502
+        assert server.counters['requests'] == 1
+    finally:
+        server.stop()
+
+    # A port nobody listens on fails to connect on every attempt
+    with socket.socket() as unused:
+        unused.bind(('127.0.0.1', 0))
+        port = unused.getsockname()[1]
+    waits.clear()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        RequestScheduler(max_retries=2, sleep=waits.append).get(f"http://127.0.0.1:{port}/page", timeout=1)
+    assert len(waits) == 2
+
+def test_image_download_retries_SCP_RSCH025(sleeps, tmp_path):
+    # Image downloads go through the scheduler too
+    server = start_flaky({'/img/logo.png': (b"logo", 'image/png')}, {'/img/logo.png': 1})
+    try:
+        path = download_image(f"{server.base_url}/img/logo.png", output_dir=str(tmp_path))
+    finally:
+        server.stop()
+    assert open(path, 'rb').read() == b"logo"
+    assert len(sleeps) == 1
+
+def test_parse_retry_after_SCP_RSCH030():
+    # Seconds and HTTP dates are accepted; anything else is ignored
+    assert parse_retry_after('120') == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('soon') is None
+    future = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= parse_retry_after(future) <= 30
+    assert parse_retry_after(email.utils.formatdate(time.time() - 30, usegmt=True)) == 0
@@ -0,0 +1,152 @@
+import os
+import sqlite3
+import pytest
+import src.batch_runner as batch
+import src.run_journal as run_journal
+from src.run_journal import RunJournal, configure_journal, close_journal
+from src.module_crawler import ModuleCrawler
+from benchmarks.local_server import StandInServer
+
+PAGE = """<html><body><div class="training-module">
+<h1>{title}</h1><p>{title} text</p>
+</div></body></html>"""
+
+OPTIONS = {"format": "json", "download_images": False, "image_dir": None}
+
+@pytest.fixture
+def journal(tmp_path):
+    yield configure_journal(str(tmp_path / "journal.db"))
+    close_journal()
+
+def write_pages(tmp_path, names):
+    paths = []
+    for name in names:
+        path = tmp_path / f"{name}.html"
+        path.write_text(PAGE.format(title=name), encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+def test_states_hashes_and_wal_SCP_JRNL005(tmp_path):
+    # States move forward, unset fields are kept, and a changed output is no longer complete
+    journal = RunJournal(str(tmp_path / "journal.db"))
+    output = tmp_path / "a.json"
+    output.write_text("{}", encoding='utf-8')
+    journal.add(["a", "b"])
+    journal.record("a", run_journal.FETCHED)
+    journal.record("a", run_journal.EXTRACTED, links=["x", "y"])
+    journal.mark_done("a", str(output))
+    journal.record("b", run_journal.FAILED, error="boom")
+    journal.add(["a", "b", "c"])
+
+    entry = journal.get("a")
+    assert entry["state"] == "done" and entry["links"] == ["x", "y"] and entry["attempts"] == 1
+    assert entry["output"] == str(output) and entry["content_hash"] == run_journal.hash_file(str(output))
+    assert journal.get("b")["error"] == "boom"
+    assert journal.get("missing") is None
+    assert journal.counts() == {"done": 1, "failed": 1, "pending": 1}
+    assert journal.is_complete("a") and journal.is_complete("a", str(output))
+    assert not journal.is_complete("a", str(tmp_path / "elsewhere.json"))
+    assert not journal.is_complete("b") and not journal.is_complete("c")
+    output.write_text("{", encoding='utf-8')
+    assert not journal.is_complete("a")
+    output.unlink()
+    assert not journal.is_complete("a")
+    with pytest.raises(ValueError):
+        journal.record("a", "images")
+    journal.close()
+
+    # The journal is in WAL mode and readable by any SQLite client
+    with sqlite3.connect(str(tmp_path / "journal.db")) as connection:
+        assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert connection.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 3
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_resumed_batch_skips_finished_inputs_SCP_JRNL010(tmp_path, journal, workers):
+    # A rerun only redoes failed inputs and inputs whose output went missing
+    inputs = write_pages(tmp_path, ["one", "two", "three"])
+    os.rename(inputs[1], inputs[1] + ".away")
+    first = batch.run_batch(inputs, str(tmp_path / "out"), OPTIONS, workers=workers)
+    assert [result["status"] for result in first] == ["ok", "failed", "ok"]
+    assert journal.get(inputs[1])["state"] == "failed"
+    assert journal.get(inputs[0])["state"] == "done"
+
+    os.rename(inputs[1] + ".away", inputs[1])
+    os.remove(first[2]["output"])
+    second = batch.run_batch(inputs, str(tmp_path / "out"), OPTIONS, workers=workers)
+    assert [result["status"] for result in second] == ["skipped", "ok", "ok"]
+    assert [result["output"] for result in second] == [result["output"] for result in first]
+    assert journal.get(inputs[1])["attempts"] == 2
+    assert journal.counts() == {"done": 3}
+    assert "3 pages: 2 succeeded, 0 failed, 1 skipped" in batch.format_batch_summary(second, 0.1)
+
+    third = batch.run_batch(inputs, str(tmp_path / "out"), OPTIONS, workers=workers)
+    assert [result["status"] for result in third] == ["skipped"] * 3
+
+    # A page whose image could not be saved is written, but retried until the image is saved too
+    image_page = tmp_path / "four.html"
+    image_page.write_text(PAGE.format(title="four").replace("</div>", '<img src="./four.png" alt="Four"></div>'),
+                          encoding='utf-8')
+    inputs.append(str(image_page))
+    image_options = dict(OPTIONS, download_images=True, image_dir=str(tmp_path / "images"))
+    statuses = []
+    for _ in range(2):
+        results = batch.run_batch(inputs, str(tmp_path / "out"), image_options, workers=workers)
+        statuses.append([result["status"] for result in results])
+    assert statuses == [["skipped"] * 3 + ["ok"]] * 2
+    entry = journal.get(inputs[3])
+    assert entry["state"] == "images_failed" and entry["attempts"] == 2
+    assert entry["error"] == "1 images could not be saved"
+    (tmp_path / "four.png").write_bytes(b"png")
+    batch.run_batch(inputs, str(tmp_path / "out"), image_options, workers=workers)
+    assert journal.counts() == {"done": 4}
+    last = batch.run_batch(inputs, str(tmp_path / "out"), image_options, workers=workers)
+    assert [result["status"] for result in last] == ["skipped"] * 4
+
+def test_resumed_crawl_follows_stored_links_SCP_JRNL015(tmp_path, journal):
+    # Finished pages are not fetched again, but the crawl still reaches the pages behind them
+    def page(title, *links):
+        anchors = "".join(f'<a href="{link}">link</a>' for link in links)
+        return PAGE.format(title=title).replace("</div>", anchors + "</div>").encode('utf-8'), 'text/html'
+    server = StandInServer({
+        '/module/7/section/1': page('One', '/module/7/section/2'),
+        '/module/7/section/2': page('Two', '/module/7/section/3'),
+    }).start()
+    try:
+        crawler = ModuleCrawler(depth=2, concurrency=2, delay=0, download_images=False)
+        first = crawler.crawl(server.base_url + '/module/7/section/1')
+        server.routes['/module/7/section/3'] = page('Three')
+        server.reset_counters()
+        second = crawler.crawl(server.base_url + '/module/7/section/1')
+    finally:
+        server.stop()
+
+    assert [record["status"] for record in first] == ["ok", "ok", "failed"]
+    assert [record["status"] for record in second] == ["skipped", "skipped", "ok"]
+    assert [record["links"] for record in second] == [1, 1, 0]
+    assert server.counters['requests'] == 1
+    assert journal.counts() == {"done": 3}
+
+def test_failed_crawl_write_is_retried_SCP_JRNL020(tmp_path, journal):
+    # A page whose output was not written is recorded as failed and written by the next run
+    server = StandInServer({'/module/7/section/1': (PAGE.format(title='One').encode('utf-8'), 'text/html')}).start()
+    url = server.base_url + '/module/7/section/1'
+    blocked = tmp_path / "blocked.json"
+    blocked.mkdir()
+
+    def claim_output(record, content):
+        # Reports an output like a writer that swallowed its error and left nothing usable behind
+        record["output"] = str(blocked)
+    try:
+        crawler = ModuleCrawler(depth=0, delay=0, download_images=False)
+        first = crawler.crawl(url, on_page=claim_output)
+        blocked.rmdir()
+        blocked.write_text("{}", encoding='utf-8')
+        second = crawler.crawl(url, on_page=lambda record, content: record.update(output=str(blocked)))
+        third = crawler.crawl(url)
+    finally:
+        server.stop()
+
+    assert first[0]["status"] == "failed" and "Is a directory" in first[0]["error"]
+    assert [second[0]["status"], third[0]["status"]] == ["ok", "skipped"]
+    assert journal.get(url)["attempts"] == 2
+    assert journal.counts() == {"done": 1}
@@ -0,0 +1,40 @@
+from bs4 import BeautifulSoup
+from src.soup_index import SoupIndex
+
+TEST_HTML = """
+<html><head><title>Page</title></head>
+<body>
+    <div class="nav content">Navigation</div>
+    <div id="main" class="page-content">
+        <h1>First heading</h1>
+        <div class="training-module"><h1 class="page-title">Module</h1></div>
+    </div>
+    <div id="questionsDiv"><label class="module-question">Q1</label></div>
+</body></html>
+"""
+
+def test_index_matches_soup_find_SCP_INDEX005():
+    # Every lookup the extractors make returns the same element as soup.find()
+    soup = BeautifulSoup(TEST_HTML, 'html.parser')
+    index = SoupIndex(soup)
+    lookups = [
+        ('h4', 'page-title', None), ('h1', 'page-title', None), ('h1', None, None), ('title', None, None),
+        ('div', 'training-module', None), ('div', 'page-content', None), ('div', 'content', None),
+        ('article', None, None), ('main', None, None), ('body', None, None), ('div', None, 'questionsDiv')
+    ]
+    for name, class_name, element_id in lookups:
+        kwargs = {}
+        if class_name:
+            kwargs['class_'] = class_name
+        if element_id:
+            kwargs['id'] = element_id
+        assert index.find(name, class_name, element_id) is soup.find(name, **kwargs), (name, class_name, element_id)
+
+def test_find_all_in_document_order_SCP_INDEX010():
+    # find_all yields matches in document order and filters on every given criterion
+    soup = BeautifulSoup(TEST_HTML, 'html.parser')
+    index = SoupIndex(soup)
+    assert [h1.text for h1 in index.find_all('h1')] == ["First heading", "Module"]
+    assert list(index.find_all('h1', class_='content')) == []
+    assert index.find('div', class_='page-content', id='main') is not None
+    assert index.find('div', class_='page-content', id='other') is None
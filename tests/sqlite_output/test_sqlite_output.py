@@ -0,0 +1,161 @@
+import sys
+import json
+import logging
+import sqlite3
+import pytest
+import htb_scraper
+import src.htb_scraper_utils as su
+import src.batch_runner as batch
+from src.sqlite_output import SQLiteOutput, item_text, iter_images, store_page
+from benchmarks.local_server import StandInServer
+
+EXAMPLE_OUTPUT = 'tests/examples/output.json'
+
+PAGE = """<html><body><div class="training-module">
+<h1>{title}</h1><p>Scan the target with nmap first.</p>
+<pre><code class="language-bash">nmap -sV {title}.htb</code></pre>
+<pre><code class="language-bash">gobuster dir -u http://{title}.htb</code></pre>
+</div></body></html>"""
+
+@pytest.fixture
+def example_content():
+    with open(EXAMPLE_OUTPUT, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def count(connection, sql, *parameters):
+    return connection.execute(sql, parameters).fetchone()[0]
+
+def test_page_is_normalized_SCP_SQL005(tmp_path, example_content):
+    # Items, questions and every image, also inside lists, get their own rows
+    path = str(tmp_path / "corpus.db")
+    with SQLiteOutput(path) as sink:
+        page_id = sink.write_page(example_content, "example.html")
+
+    items = example_content["content"]
+    images = [image for item in items for image in iter_images(item)]
+    with sqlite3.connect(path) as connection:
+        assert connection.execute("SELECT source, title FROM pages WHERE id = ?", (page_id,)).fetchone() == \
+            ("example.html", example_content["title"])
+        rows = connection.execute("SELECT position, type, text, data FROM items ORDER BY position").fetchall()
+        assert [(row[0], row[1]) for row in rows] == [(i, item["type"]) for i, item in enumerate(items)]
+        assert [row[2] for row in rows] == [item_text(item) for item in items]
+        lists = [(row[3], items[row[0]]) for row in rows if row[1] == "list"]
+        assert lists and all(json.loads(data) == item for data, item in lists)
+        assert count(connection, "SELECT COUNT(*) FROM images") == len(images) > 0
+        assert count(connection, "SELECT COUNT(*) FROM images JOIN items ON items.id = images.item_id "
+                                 "WHERE items.type = 'list'") > 0
+        assert [row[0] for row in connection.execute("SELECT text FROM questions ORDER BY position")] == \
+            example_content["questions"]
+
+def test_item_text_SCP_SQL010():
+    # Lists and tables are flattened to lines of text, with image alt text
+    image = {"type": "image", "src": "a.png", "alt": "Diagram", "local_path": None}
+    listing = {"type": "list", "list_type": "ordered", "items": [
+        [{"type": "text", "content": "first"}, image], [{"type": "text", "content": "second"}]]}
+    table = {"type": "table", "rows": [[[{"type": "text", "content": "a"}], [image]], [[], [{"type": "text",
+                                                                                           "content": "b"}]]]}
+    assert item_text(listing) == "first Diagram\nsecond"
+    assert item_text(table) == "a | Diagram\n | b"
+    assert item_text({"type": "code", "language": "bash", "text": "ls"}) == "ls"
+    assert item_text(image) == "Diagram"
+    assert list(iter_images(listing)) == [image]
+    assert list(iter_images(table)) == [image]
+
+def test_full_text_search_SCP_SQL015(tmp_path):
+    # Searches can be limited to one item type and rewritten pages leave nothing stale in the index
+    with SQLiteOutput(str(tmp_path / "corpus.db")) as sink:
+        sink.write_page({"title": "Alpha", "content": [
+            {"type": "paragraph", "text": "Scan the target with nmap first."},
+            {"type": "code", "language": "bash", "text": "nmap -sV alpha.htb"}],
+            "questions": ["Which port does nmap report as open?"]}, "alpha")
+        sink.write_page({"title": "Beta", "content": [
+            {"type": "code", "language": "bash", "text": "gobuster dir -u http://beta.htb"}]}, "beta")
+
+        assert {(hit["source"], hit["type"]) for hit in sink.search("nmap")} == {("alpha", "paragraph"),
+                                                                                ("alpha", "code")}
+        hits = sink.search("nmap", item_type="code")
+        assert [(hit["source"], hit["position"], hit["text"]) for hit in hits] == [("alpha", 1, "nmap -sV alpha.htb")]
+        assert "[nmap]" in hits[0]["snippet"]
+        assert sink.search('"alpha htb"')[0]["source"] == "alpha"
+        assert [hit["source"] for hit in sink.search_questions("port")] == ["alpha"]
+
+        sink.write_page({"title": "Alpha", "content": [{"type": "code", "language": "bash",
+                                                         "text": "masscan alpha.htb"}]}, "alpha")
+        assert sink.search("nmap") == []
+        assert sink.search_questions("port") == []
+        assert [hit["source"] for hit in sink.search("masscan")] == ["alpha"]
+        assert count(sink.connection, "SELECT COUNT(*) FROM pages") == 2
+
+def test_batched_transactions_SCP_SQL020(tmp_path):
+    # Pages become visible to readers a batch at a time; a failing page is undone on its own
+    path = str(tmp_path / "corpus.db")
+    sink = SQLiteOutput(path, batch_size=2)
+    reader = sqlite3.connect(path)
+    try:
+        sink.write_page({"title": "One", "content": []}, "one")
+        assert count(reader, "SELECT COUNT(*) FROM pages") == 0
+        with pytest.raises(sqlite3.Error):
+            sink.write_page({"title": "Bad", "content": [], "questions": [{"not": "text"}]}, "bad")
+        sink.write_page({"title": "Two", "content": []}, "two")
+        assert count(reader, "SELECT COUNT(*) FROM pages") == 2
+        sink.write_page({"title": "Three", "content": []}, "three")
+        sink.close()
+        assert [row[0] for row in reader.execute("SELECT source FROM pages ORDER BY id")] == ["one", "two", "three"]
+    finally:
+        reader.close()
+        sink.close()
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_batch_writes_every_page_SCP_SQL025(tmp_path, workers):
+    # Worker processes send their pages back and the parent writes them to the database
+    inputs = []
+    for name in ("lame", "legacy", "blue"):
+        path = tmp_path / f"{name}.html"
+        path.write_text(PAGE.format(title=name), encoding='utf-8')
+        inputs.append(str(path))
+    options = {"format": "json", "download_images": False, "image_dir": None}
+    with SQLiteOutput(str(tmp_path / "corpus.db")) as sink:
+        results = batch.run_batch(inputs, str(tmp_path / "out"), options, workers=workers, sink=sink)
+        hits = sink.search("nmap", item_type="code")
+
+    assert all(result["status"] == "ok" and "content" not in result for result in results)
+    assert sorted(hit["text"] for hit in hits) == sorted(f"nmap -sV {name}.htb" for name in ("lame", "legacy", "blue"))
+    assert all(hit["type"] == "code" for hit in hits)
+
+def test_database_errors_do_not_end_the_run_SCP_SQL030(tmp_path, monkeypatch, caplog, capsys):
+    # A page the database rejects is logged and skipped in crawl and single mode alike
+    with SQLiteOutput(str(tmp_path / "corpus.db")) as sink:
+        write_page = sink.write_page
+
+        def reject_lame(content, source=None):
+            if "lame" in source:
+                raise sqlite3.OperationalError("database is locked")
+            return write_page(content, source)
+        monkeypatch.setattr(sink, 'write_page', reject_lame)
+        assert store_page(None, {"title": "T", "content": []}, "none") is False
+
+        server = StandInServer({
+            '/module/7/section/lame': (PAGE.format(title='lame').replace('</div>', '<a href="blue">next</a></div>')
+                                       .encode('utf-8'), 'text/html'),
+            '/module/7/section/blue': (PAGE.format(title='blue').encode('utf-8'), 'text/html')}).start()
+        try:
+            monkeypatch.setattr(sys, 'argv', ['htb_scraper.py', '--crawl', server.base_url + '/module/7/section/lame',
+                                              '--crawl-depth', '1', '--crawl-delay', '0', '--image-dir', str(tmp_path / 'img'),
+                                              '--output-dir', str(tmp_path / 'out')])
+            with caplog.at_level(logging.WARNING, logger='src.sqlite_output'):
+                htb_scraper.run_crawl_mode(su.parse_arguments(), sink)
+        finally:
+            server.stop()
+        assert "2 pages: 2 succeeded, 0 failed" in capsys.readouterr().out
+
+        single = tmp_path / "lame-legacy.html"
+        single.write_text(PAGE.format(title='lame legacy'), encoding='utf-8')
+        monkeypatch.setattr(sys, 'argv', ['htb_scraper.py', '--file', str(single), '--image-dir', str(tmp_path / 'img'),
+                                          '--output', str(tmp_path / 'legacy.json')])
+        with caplog.at_level(logging.WARNING, logger='src.sqlite_output'):
+            htb_scraper.run_single_mode(su.parse_arguments(), sink)
+        assert (tmp_path / 'legacy.json').is_file()
+
+        hits = sink.search("nmap", item_type="code")
+    assert [hit["text"] for hit in hits] == ["nmap -sV blue.htb"]
+    assert len([record for record in caplog.records if "database is locked" in record.getMessage()]) == 2
@@ -0,0 +1,21 @@
+from benchmarks.synthetic_page import generate_page
+from src.LLMStructuredExtractor import extract_structured_content_from_html
+
+def test_same_seed_gives_same_page_SCP_SYNTH005():
+    # Generation is deterministic for a seed and changes with it
+    assert generate_page(seed=3, sections=5) == generate_page(seed=3, sections=5)
+    assert generate_page(seed=3, sections=5) != generate_page(seed=4, sections=5)
+
+def test_page_has_htb_structure_SCP_SYNTH010():
+    # The extractor finds every kind of content item, the images and the questions
+    html_content = generate_page(sections=6, list_depth=3, table_rows=2, table_cols=2, images=12, questions=4)
+
+    content = extract_structured_content_from_html(html_content, download_images=False)
+    types = {item["type"] for item in content["content"]}
+    images = html_content.count("<img")
+
+    assert content["title"] == "Synthetic Module"
+    assert {"heading", "paragraph", "alert", "code", "list", "table", "image"} <= types
+    assert images == 12
+    assert len(content["questions"]) == 4
+    assert sum(1 for item in content["content"] if item["type"] == "heading" and item["level"] == 2) == 6
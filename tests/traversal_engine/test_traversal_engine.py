@@ -0,0 +1,108 @@
+import json
+import random
+import pytest
+from bs4.element import Tag
+from src.html_parsing import is_parser_available
+from src.LLMStructuredExtractor import LLMStructuredExtractor
+from benchmarks.synthetic_page import generate_page
+
+EXAMPLE_PAGE = 'tests/examples/example_page.html'
+EXAMPLE_OUTPUT = 'tests/examples/output.json'
+FIXTURES = [EXAMPLE_PAGE, 'tests/test_complex.html', 'tests/test_image.html', 'tests/test_order.html']
+RANDOM_TAGS = ['div', 'p', 'ul', 'ol', 'li', 'table', 'tbody', 'tr', 'td', 'th', 'span', 'h2', 'pre',
+               'img', 'section', 'figure', 'script', 'template', 'b', 'code']
+RANDOM_TEXT = ['foo ', ' bar\n', '<!-- comment -->', '<![CDATA[data]]>', '  ', '&amp; é']
+
+class RecordingExtractor(LLMStructuredExtractor):
+    """Records the position of every image passed to process_image()"""
+    def process_image(self, element):
+        self.image_calls.append(self.positions[id(element)])
+        return super().process_image(element)
+
+def walk(html_content, traversal, parser='html.parser', max_depth=5):
+    """Return the content items of the training-module container and the image call order"""
+    extractor = RecordingExtractor(html_content, EXAMPLE_PAGE, download_images=False, parser=parser,
+                                   max_depth=max_depth, traversal=traversal)
+    extractor.image_calls = []
+    extractor.positions = {id(tag): i for i, tag in enumerate(extractor.soup.find_all(True))}
+    container = extractor.find_main_content_container()
+    return extractor.process_content_elements(container), extractor.image_calls
+
+def random_markup(rng, depth=0):
+    """Return random nested markup mixing every construct the walk handles"""
+    parts = []
+    for _ in range(rng.randint(0, 4)):
+        if depth > 6 or rng.random() < 0.3:
+            parts.append(rng.choice(RANDOM_TEXT))
+            continue
+        tag = rng.choice(RANDOM_TAGS)
+        if tag == 'img':
+            parts.append(f'<img src="image_{rng.randint(0, 3)}.png" alt="a">' if rng.random() < 0.8 else '<img>')
+            continue
+        attrs = ' class="card"' if tag == 'div' and rng.random() < 0.3 else ''
+        attrs = ' class="language-python"' if tag == 'pre' else attrs
+        parts.append(f'<{tag}{attrs}>{random_markup(rng, depth + 1)}</{tag}>')
+    return ''.join(parts)
+
+def test_example_output_matches_golden_SCP_TRAV005():
+    # The single-pass traversal reproduces the golden JSON output exactly
+    with open(EXAMPLE_PAGE, 'r', encoding='utf-8') as f:
+        html_content = f.read()
+    with open(EXAMPLE_OUTPUT, 'r', encoding='utf-8') as f:
+        expected = json.load(f)
+    extractor = LLMStructuredExtractor(html_content, EXAMPLE_PAGE, download_images=False,
+                                       traversal='single-pass')
+    assert extractor.extract_content() == expected
+
+@pytest.mark.parametrize('parser', ['html.parser', 'lxml', 'html5lib'])
+def test_fixtures_match_recursive_walk_SCP_TRAV010(parser):
+    # Both traversals give the same items and process the same images in the same order
+    if not is_parser_available(parser):
+        pytest.skip(f"{parser} is not installed")
+    for path in FIXTURES:
+        with open(path, 'r', encoding='utf-8') as f:
+            html_content = f.read()
+        for max_depth in [0, 2, 5, None]:
+            assert walk(html_content, 'single-pass', parser, max_depth) == \
+                walk(html_content, 'recursive', parser, max_depth), (path, max_depth)
+
+def test_random_markup_matches_recursive_walk_SCP_TRAV015():
+    # Comments, CDATA, scripts, templates, tbody, nested lists/tables, cards and depth limits
+    for seed in range(100):
+        rng = random.Random(seed)
+        html_content = f'<html><body><div class="training-module">{random_markup(rng)}</div></body></html>'
+        for max_depth in [0, 1, 3, 5]:
+            assert walk(html_content, 'single-pass', max_depth=max_depth) == \
+                walk(html_content, 'recursive', max_depth=max_depth), (seed, max_depth)
+    html_content = generate_page(sections=5, list_depth=4, images=30)
+    assert walk(html_content, 'single-pass') == walk(html_content, 'recursive')
+
+def test_no_subtree_rewalks_SCP_TRAV020(monkeypatch):
+    # The single-pass traversal never re-reads a subtree with get_text() or find_all()
+    html_content = generate_page(sections=3, list_depth=3, images=10)
+    extractor = LLMStructuredExtractor(html_content, download_images=False, traversal='single-pass')
+    container = extractor.find_main_content_container()
+
+    def fail(*args, **kwargs):
+        raise AssertionError("subtree walked again")
+    monkeypatch.setattr(Tag, 'get_text', fail)
+    monkeypatch.setattr(Tag, 'find_all', fail)
+    items = extractor.process_content_elements(container)
+    assert any(item["type"] == "list" for item in items)
+    assert any(item["type"] == "table" for item in items)
+
+def test_unknown_traversal_rejected_SCP_TRAV025():
+    with pytest.raises(ValueError):
+        LLMStructuredExtractor('<p>text</p>', traversal='breadth-first')
+
+@pytest.mark.parametrize('traversal', ['single-pass', 'recursive'])
+def test_unlimited_depth_SCP_TRAV030(traversal):
+    # With max_depth=None both traversals walk nesting far beyond the recursion limit
+    depth = 5000
+    html_content = ('<html><body><div class="training-module">' + '<section><p>Level</p>' * depth +
+                    '<ul><li>Innermost</li></ul>' + '</section>' * depth + '</div></body></html>')
+    extractor = LLMStructuredExtractor(html_content, download_images=False, max_depth=None,
+                                       traversal=traversal)
+    content = extractor.extract_content()["content"]
+    assert len(content) == depth + 1
+    assert content[-1] == {"type": "list", "list_type": "unordered", "items": [[{"type": "text", "content": "Innermost"}]]}